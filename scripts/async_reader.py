@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Concurrent file reads for slow or networked filesystems.
+
+On a mounted volume every read waits on the network far longer than the
+file takes to parse, so reading one file at a time leaves the CPU idle.
+read_pipeline() keeps many reads in flight on a bounded thread pool and
+hands each result to the consumer as soon as it arrives. A queue limit caps
+how many results are read but not yet consumed, so memory stays bounded
+however far the reads get ahead of the parser.
+
+MAKEPAD_READ_LATENCY (milliseconds) adds an artificial delay to every read,
+standing in for a slow mount when testing locally.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+# Reads in flight at once, and results held waiting for the consumer
+READ_WORKERS = 16
+QUEUE_LIMIT = 64
+
+def env_number(name: str, default, kind=int):
+    """An environment setting parsed with kind, or default (with a warning) when it isn't one."""
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return kind(value)
+    except ValueError:
+        print(f"Warning: ignoring {name}={value!r}, not a valid {kind.__name__}; using {default}", file=sys.stderr)
+        return default
+
+READ_LATENCY = env_number("MAKEPAD_READ_LATENCY", 0.0, float) / 1000
+
+def set_read_latency(ms: float):
+    """Delay every subsequent read by ms milliseconds (0 turns the shim off)."""
+    global READ_LATENCY
+    READ_LATENCY = ms / 1000
+
+def simulate_latency():
+    """Wait as long as a read from the simulated slow mount would; called before every read."""
+    if READ_LATENCY > 0:
+        time.sleep(READ_LATENCY)
+
+@dataclass
+class ReadReport:
+    """How the reads of one pipeline run overlapped.
+
+    Items served without a read (cache hits) are counted in cache_hits only;
+    reads, busy_seconds and the concurrency and latency figures cover real reads.
+    """
+    workers: int
+    queue_limit: int
+    reads: int = 0
+    cache_hits: int = 0
+    seconds: float = 0.0       # wall time from the first read to the last result consumed
+    busy_seconds: float = 0.0  # sum of the time each read took in its thread
+    peak_in_flight: int = 0
+    peak_queued: int = 0
+
+    @property
+    def concurrency(self) -> float:
+        """Average number of reads in progress over the run."""
+        return self.busy_seconds / self.seconds if self.seconds else 0.0
+
+    @property
+    def mean_read_seconds(self) -> float:
+        return self.busy_seconds / self.reads if self.reads else 0.0
+
+    def summary(self) -> str:
+        return summarize(self.to_dict())
+
+    def to_dict(self) -> dict:
+        return {
+            "reads": self.reads,
+            "cache_hits": self.cache_hits,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "seconds": self.seconds,
+            "busy_seconds": self.busy_seconds,
+            "concurrency": self.concurrency,
+            "mean_read_seconds": self.mean_read_seconds,
+            "peak_in_flight": self.peak_in_flight,
+            "peak_queued": self.peak_queued,
+        }
+
+def summarize(report: dict) -> str:
+    """One line describing a ReadReport, from its to_dict() form."""
+    return (f"{report['reads']} reads ({report['cache_hits']} cache hits) on {report['workers']} threads "
+            f"in {report['seconds']:.3f}s: effective concurrency {report['concurrency']:.1f} "
+            f"(peak {report['peak_in_flight']}), {report['mean_read_seconds'] * 1000:.2f} ms per read, "
+            f"queue peak {report['peak_queued']}/{report['queue_limit']}")
+
+def read_pipeline(items, read, consume, workers: int = READ_WORKERS, queue_limit: int = QUEUE_LIMIT,
+                  consumers: int = 1, cached=None) -> ReadReport:
+    """Call read(item) for every item on a thread pool and consume(item, value, seconds) as results arrive.
+
+    seconds is how long the read took. consume runs on the calling thread, in completion order. It may return an
+    awaitable (e.g. a future from a process pool); up to `consumers` of those
+    are awaited at once. At most workers + queue_limit results are held.
+    cached(value), if given, tells whether read() served the item without
+    reading it; those items are reported as cache hits rather than reads.
+    """
+    report = ReadReport(workers=max(1, workers), queue_limit=max(1, queue_limit))
+    asyncio.run(_pipeline(list(items), read, consume, report, max(1, consumers), cached))
+    return report
+
+def peak_overlap(intervals: list) -> int:
+    """Most (start, end) intervals open at any one time."""
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    peak = open_now = 0
+    for _, change in events:
+        open_now += change
+        peak = max(peak, open_now)
+    return peak
+
+async def _pipeline(items: list, read, consume, report: ReadReport, consumers: int, cached):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=report.queue_limit)
+    remaining = iter(items)
+    # (start, end) of every real read; the peak in flight is taken from these at the end
+    intervals = []
+    started = time.perf_counter()
+
+    def timed_read(item):
+        read_started = time.perf_counter()
+        value = read(item)
+        return value, read_started, time.perf_counter()
+
+    async def reader(pool: ThreadPoolExecutor):
+        # Readers share one iterator, so no more than `workers` reads are ever in flight
+        for item in remaining:
+            value, read_started, read_ended = await loop.run_in_executor(pool, timed_read, item)
+            seconds = read_ended - read_started
+            if cached is not None and cached(value):
+                report.cache_hits += 1
+            else:
+                report.reads += 1
+                report.busy_seconds += seconds
+                intervals.append((read_started, read_ended))
+            await queue.put((item, value, seconds))
+            report.peak_queued = max(report.peak_queued, queue.qsize())
+
+    async def produce(pool: ThreadPoolExecutor):
+        await asyncio.gather(*(reader(pool) for _ in range(min(report.workers, len(items)))))
+        for _ in range(consumers):
+            await queue.put(None)
+
+    async def consumer():
+        while (entry := await queue.get()) is not None:
+            result = consume(*entry)
+            if inspect.isawaitable(result):
+                await result
+            else:
+                # Let finished reads hand over their results and start the next ones
+                await asyncio.sleep(0)
+
+    with ThreadPoolExecutor(max_workers=report.workers, thread_name_prefix="read") as pool:
+        await asyncio.gather(produce(pool), *(consumer() for _ in range(consumers)))
+    report.seconds = time.perf_counter() - started
+    report.peak_in_flight = peak_overlap(intervals)
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Benchmark the extraction pipeline against a synthetic Makepad-like tree.
+
+Generates a widget crate at a configurable scale (files, structs per file,
+#[live] fields, doc comment length, module nesting and pathological
+attribute lists) plus the draw crate types the generators look up, then
+times each stage separately and reports throughput and peak memory.
+The peak RSS of indexing the tree and rendering every output is measured in
+a fresh process. With --read-latency every file read is delayed to simulate a
+slow mount, and sequential reads are timed against the async read pipeline. Runs fully offline; results are written as JSON so runs
+from different commits can be compared with --compare.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+DEFAULT_OUTPUT = Path(__file__).parent / ".cache" / "benchmark.json"
+
+# Field types cycled through the generated structs, including deeply nested generics
+FIELD_TYPES = [
+    "f64", "bool", "Walk", "Layout", "Vec4", "DrawQuad", "Option<LiveId>",
+    "Vec<(LiveId, Vec<f32>)>", "HashMap<LiveId, Option<Box<dyn Fn(&mut Cx, f64) -> Vec<u8>>>>",
+]
+FIELD_DEFAULTS = ["1.0", "true", "vec4(0.5, 0.5, 0.5, 1.0)", "Size::Fit", "Flow::Down", "(0, 0)"]
+FIELD_ATTRS = ["#[rust]", "#[redraw]", "#[animator]", "#[walk]", "#[layout]"]
+
+# A derive list and attribute nesting that stress the bracket matcher
+PATHOLOGICAL_ATTRS = [
+    '#[cfg_attr(feature = "nightly", derive(Debug, Clone), allow(dead_code, unused_variables))]',
+    '#[doc = "attribute with [brackets] and (parens) and {braces} inside a string"]',
+    '#[live_ignore(if cfg!(target_os = "macos") { [1, 2, [3, [4, [5]]]] } else { ((((0)))) })]',
+]
+
+def generate_struct(rng: random.Random, name: str, fields: int, doc_lines: int, pathological: bool) -> str:
+    """Render one Live/Widget struct with its impl block."""
+    out = []
+    for line in range(doc_lines):
+        out.append(f"/// {name} documentation line {line}: "
+                   f"lays out children with `Walk` and `Layout`, see [`View`] and {{braces}} in prose.")
+    if pathological:
+        out.extend(PATHOLOGICAL_ATTRS)
+    out.append("#[derive(Live, LiveHook, Widget)]")
+    out.append(f"pub struct {name} {{")
+    for i in range(fields):
+        out.append(f"    /// Field {i} of {name}")
+        kind = rng.random()
+        if kind < 0.4:
+            out.append(f"    #[live({rng.choice(FIELD_DEFAULTS)})]")
+        elif kind < 0.8:
+            out.append("    #[live]")
+        else:
+            out.append(f"    {rng.choice(FIELD_ATTRS)}")
+        out.append(f"    pub field_{i}: {rng.choice(FIELD_TYPES)},")
+    out.append("}")
+    out.append("")
+    out.append(f"impl Widget for {name} {{")
+    out.append("    fn draw_walk(&mut self, cx: &mut Cx2d, scope: &mut Scope, walk: Walk) -> DrawStep {")
+    out.append("        let label = r#\"struct Fake { } \"#; // braces in a raw string")
+    out.append("        let c = '{'; let life: &'static str = \"}\";")
+    out.append("        self.items.iter().for_each(|item| { if item.visible { cx.draw(item); } });")
+    out.append("        DrawStep::done()")
+    out.append("    }")
+    out.append("}")
+    out.append("")
+    return "\n".join(out)
+
+def generate_file(rng: random.Random, index: int, structs: int, fields: int, doc_lines: int,
+                  nesting: int, pathological: bool) -> str:
+    """Render one source file, wrapping its structs in `nesting` levels of modules."""
+    out = ["use crate::{makepad_draw::*, widget::*};", "",
+           "/* block comment /* nested */ with a struct Hidden { } inside */", ""]
+    for level in range(nesting):
+        out.append(f"{'    ' * level}pub mod level_{level} {{")
+    for s in range(structs):
+        out.append(generate_struct(rng, f"Widget{index}x{s}", fields, doc_lines, pathological))
+    for level in reversed(range(nesting)):
+        out.append(f"{'    ' * level}}}")
+    out.append("")
+    out.append(f"#[derive(Live, LiveHook, Clone, Copy)]\n#[live_ignore]\npub enum Mode{index} {{\n"
+               f"    #[pick] Normal,\n    Compact,\n    Expanded {{ depth: u32 }},\n}}\n")
+    return "\n".join(out)
+
+SUPPORT_FILES = {
+    "widgets/src/view.rs": (
+        "/// The base container widget.\n"
+        "#[derive(Live, LiveHook, Widget)]\n"
+        "pub struct View {\n"
+        "    #[walk] walk: Walk,\n"
+        "    #[layout] layout: Layout,\n"
+        "    #[live] pub show_bg: bool,\n"
+        "    #[live(true)] pub visible: bool,\n"
+        "    #[live] pub draw_bg: DrawColor,\n"
+        "}\n"
+    ),
+    "draw/src/turtle.rs": (
+        "#[derive(Copy, Clone, Debug, Live, LiveHook)]\n"
+        "pub struct Walk {\n"
+        "    #[live] pub abs_pos: Option<DVec2>,\n"
+        "    #[live] pub margin: Margin,\n"
+        "    #[live] pub width: Size,\n"
+        "    #[live] pub height: Size,\n"
+        "}\n\n"
+        "#[derive(Copy, Clone, Debug, Live, LiveHook)]\n"
+        "pub struct Layout {\n"
+        "    #[live] pub padding: Padding,\n"
+        "    #[live] pub spacing: f64,\n"
+        "    #[live] pub flow: Flow,\n"
+        "}\n"
+    ),
+}
+
+def generate_corpus(root: Path, files: int, structs: int, fields: int, doc_lines: int,
+                    nesting: int, pathological: bool, seed: int = 0) -> dict:
+    """Write a synthetic Makepad tree under root and describe what was generated."""
+    rng = random.Random(seed)
+    total_bytes = 0
+    for rel, content in SUPPORT_FILES.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        total_bytes += len(content.encode())
+
+    widgets_src = root / "widgets" / "src"
+    for i in range(files):
+        # Spread files over nested directories, `nesting` levels deep
+        parts = [f"group_{(i >> (2 * level)) % 4}" for level in range(nesting)]
+        path = widgets_src.joinpath(*parts, f"widget_{i}.rs")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = generate_file(rng, i, structs, fields, doc_lines, nesting, pathological)
+        path.write_text(content)
+        total_bytes += len(content.encode())
+
+    return {
+        "files": files + len(SUPPORT_FILES),
+        "bytes": total_bytes,
+        "widgets": files * structs + 1,
+        "structs_per_file": structs,
+        "fields_per_struct": fields,
+        "doc_lines": doc_lines,
+        "nesting": nesting,
+        "pathological_attrs": pathological,
+        "seed": seed,
+    }
+
+def measure(func, repeat: int) -> dict:
+    """Best wall time over repeat runs, then one traced run for peak memory."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak, "result": result}
+
+def run_benchmarks(corpus: dict, repeat: int, jobs: int, read_latency: float = 0.0, io_workers: int = 16) -> dict:
+    """Time each extraction stage against the corpus under MAKEPAD_PATH."""
+    # Imported here so the parent stays small until output_peak_rss() has forked its child
+    from async_reader import set_read_latency, summarize
+    from makepad_index import build_index, extract_doc_comment, extract_properties, list_sources
+    from rust_lexer import LineIndex, lex_file
+    from extract_widgets import extract_widgets
+    from generate_locations import find_property_locations, find_widget_locations
+
+    sources = list_sources()
+    contents = [Path(source.path).read_text() for source in sources]
+    lexed = [(lex_file(content), LineIndex(content)) for content in contents]
+    index = build_index(jobs=1)
+
+    def properties():
+        return sum(len(extract_properties(struct, lines)) for lexed_file, lines in lexed
+                   for struct in lexed_file.structs)
+
+    def docs():
+        return sum(len(extract_doc_comment(item)) for lexed_file, _ in lexed
+                   for item in lexed_file.structs + lexed_file.enums)
+
+    stages = {
+        "extract_widgets": lambda: len(extract_widgets(jobs=jobs)),
+        "build_index[str]": lambda: len(build_index(jobs=jobs, backend="str").widgets),
+        "build_index[mmap]": lambda: len(build_index(jobs=jobs, backend="mmap").widgets),
+        "lex_file": lambda: sum(len(lex_file(content).structs) for content in contents),
+        "extract_properties": properties,
+        "extract_doc_comment": docs,
+        "find_widget_locations": lambda: len(find_widget_locations(index)),
+        "find_property_locations": lambda: len(find_property_locations(index)),
+    }
+
+    def record(name: str, m: dict) -> dict:
+        seconds = m["seconds"]
+        result = {
+            "seconds": seconds,
+            "files_per_second": corpus["files"] / seconds if seconds else None,
+            "mb_per_second": corpus["bytes"] / 1e6 / seconds if seconds else None,
+            "peak_bytes": m["peak_bytes"],
+            "result": m["result"],
+        }
+        print(f"  {name:<24} {seconds * 1000:9.2f} ms  {result['files_per_second'] or 0:10.0f} files/s  "
+              f"{result['mb_per_second'] or 0:8.2f} MB/s  peak {m['peak_bytes'] / 1e6:7.2f} MB  "
+              f"(result {m['result']})")
+        return result
+
+    results = {}
+    for name, func in stages.items():
+        results[name] = record(name, measure(func, repeat))
+
+    if read_latency:
+        # Only these stages read through the simulated slow mount
+        set_read_latency(read_latency)
+        slow_stages = {
+            "sequential reads": lambda: len(build_index(jobs=jobs, io_workers=0).widgets),
+            "async reads": lambda: len(build_index(jobs=jobs, io_workers=io_workers).widgets),
+        }
+        for name, func in slow_stages.items():
+            results[name] = record(name, measure(func, repeat))
+        print(f"  {'':<24} {summarize(build_index(jobs=jobs, io_workers=io_workers).stats['reads'])}")
+        set_read_latency(0)
+
+    if results["extract_widgets"]["result"] != corpus["widgets"]:
+        print(f"Warning: extracted {results['extract_widgets']['result']} widgets, generated {corpus['widgets']}")
+    if build_index(jobs=jobs, backend="str").files == build_index(jobs=jobs, backend="mmap").files:
+        print("The str and mmap backends built identical indexes")
+    else:
+        print("Warning: the str and mmap backends built different indexes")
+    return results
+
+class NullWriter:
+    """File-like sink; outputs are rendered in full but nothing is kept."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+def render_outputs():
+    """Index MAKEPAD_PATH and render every output to a NullWriter, then print the peak RSS.
+
+    Runs in the child process started by output_peak_rss().
+    """
+    import resource
+    from makepad_index import build_index
+    from extract_widgets import build_snippets, render_documentation
+    from generate_locations import build_locations
+    from compact_index import build_compact_index
+    from completion_tables import build_completion_tables
+    from outputs import stream_json, write_compact
+
+    index = build_index(jobs=1)
+    resolved = index.resolved_widgets
+    sink = NullWriter()
+    json.dump(build_snippets(index.widgets, resolved), sink, indent=2)
+    for chunk in render_documentation(index.widgets, resolved):
+        sink.write(chunk)
+    stream_json(sink, build_locations(index))
+    write_compact(sink, build_compact_index(index))
+    write_compact(sink, build_completion_tables(index))
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"peak_rss_bytes": peak if sys.platform == "darwin" else peak * 1024}))
+
+def output_peak_rss() -> int:
+    """Peak RSS of a fresh process that indexes the corpus and renders every output."""
+    child = subprocess.run([sys.executable, "-c", "import benchmark; benchmark.render_outputs()"],
+                           cwd=Path(__file__).parent, capture_output=True, text=True, check=True)
+    return json.loads(child.stdout.strip().splitlines()[-1])["peak_rss_bytes"]
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def compare(previous: dict, current: dict):
+    """Print the change in time for every stage present in both runs."""
+    print(f"\nCompared with {previous.get('revision') or 'previous run'}:")
+    for name, result in current["stages"].items():
+        before = previous.get("stages", {}).get(name)
+        if not before or not before["seconds"]:
+            continue
+        change = (result["seconds"] - before["seconds"]) / before["seconds"] * 100
+        print(f"  {name:<24} {before['seconds'] * 1000:9.2f} ms -> {result['seconds'] * 1000:9.2f} ms  ({change:+.1f}%)")
+    if previous.get("peak_rss_bytes") and current.get("peak_rss_bytes"):
+        before, after = previous["peak_rss_bytes"], current["peak_rss_bytes"]
+        print(f"  {'peak RSS (all outputs)':<24} {before / 1e6:9.1f} MB -> {after / 1e6:9.1f} MB  "
+              f"({(after - before) / before * 100:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark widget extraction on a synthetic Makepad tree.")
+    parser.add_argument("--files", type=int, default=200, help="number of generated widget files")
+    parser.add_argument("--structs", type=int, default=5, help="widget structs per file")
+    parser.add_argument("--fields", type=int, default=20, help="fields per struct")
+    parser.add_argument("--doc-lines", type=int, default=8, help="/// lines above each struct")
+    parser.add_argument("--nesting", type=int, default=3, help="directory and module nesting depth")
+    parser.add_argument("--no-pathological", action="store_true", help="omit the pathological attribute lists")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the generated corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is reported)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="parser processes for extract_widgets()")
+    parser.add_argument("--read-latency", type=float, default=0.0, metavar="MS",
+                        help="also time sequential vs async reads with MS milliseconds added to every read")
+    parser.add_argument("--io-workers", type=int, default=16, metavar="N", help="reads in flight for the async stage")
+    parser.add_argument("--keep", type=Path, metavar="DIR", help="generate the corpus in DIR and keep it")
+    parser.add_argument("--output", "-o", type=Path, default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    parser.add_argument("--compare", type=Path, metavar="JSON", help="results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    root = args.keep or Path(tempfile.mkdtemp(prefix="makepad-bench-"))
+    try:
+        corpus = generate_corpus(root, args.files, args.structs, args.fields, args.doc_lines,
+                                 args.nesting, not args.no_pathological, args.seed)
+        os.environ["MAKEPAD_PATH"] = str(root)
+        os.environ["MAKEPAD_CRATES"] = "widgets,draw"
+        print(f"Generated {corpus['files']} files ({corpus['bytes'] / 1e6:.1f} MB, {corpus['widgets']} widgets) in {root}")
+        # Measured first: on Linux a child's ru_maxrss starts from the parent's at fork time
+        peak_rss = output_peak_rss()
+        print(f"  {'peak RSS (all outputs)':<24} {peak_rss / 1e6:9.1f} MB")
+        stages = run_benchmarks(corpus, args.repeat, args.jobs, args.read_latency, args.io_workers)
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": corpus,
+        "stages": stages,
+        "peak_rss_bytes": peak_rss,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), results)
+
+if __name__ == "__main__":
+    main()
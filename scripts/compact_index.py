@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Write the prebuilt index the VS Code extension loads at activation.
+
+The index is a single compact JSON document: a header carrying the format
+version and a fingerprint of the indexed sources, then positional arrays for
+structs, properties and enum variants with file paths and type names interned
+into tables. The extension reads it in one go and only falls back to scanning
+Makepad source itself when the fingerprint no longer matches.
+"""
+
+import json
+import time
+import argparse
+from pathlib import Path
+
+from makepad_index import MakepadIndex, add_index_arguments, index_from_args, widgets_src_dir
+from outputs import atomic_write, write_compact
+
+OUTPUT_PATH = Path(__file__).parent.parent / "src" / "makepad_index.json"
+
+INDEX_FORMAT = "makepad-index"
+INDEX_VERSION = 2
+
+# Variant flags
+PICK = 1
+DEFAULT = 2
+
+class StringTable:
+    """Interns repeated strings (types, defaults) as indexes into one list."""
+
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+
+    def add(self, value: str) -> int:
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+def build_compact_index(index: MakepadIndex) -> dict:
+    """Flatten the index into the compact positional layout.
+
+    structs:    [name, file, line, column, is_widget, doc, properties]
+    properties: [name, type, default, line, column]  (type/default are string ids, default -1 if none)
+    enums:      [name, file, line, column, doc, variants]
+    variants:   [name, line, column, flags, doc, value]  (flags: PICK | DEFAULT; value is a string id or -1)
+    """
+    files = index.relative_paths
+    strings = StringTable()
+    widgets = index.widgets
+
+    structs = []
+    enums = []
+    for file_id, file_index in enumerate(index.files):
+        for struct in file_index.structs:
+            properties = [
+                [p.name, strings.add(p.prop_type), strings.add(p.default) if p.default is not None else -1,
+                 p.line, p.column]
+                for p in struct.properties
+            ]
+            is_widget = 1 if widgets.get(struct.name) is struct else 0
+            structs.append([struct.name, file_id, struct.line, struct.column, is_widget, struct.doc, properties])
+        for enum in file_index.enums:
+            variants = [
+                [v.name, v.line, v.column, (PICK if v.pick else 0) | (DEFAULT if v.is_default else 0), v.doc,
+                 strings.add(v.value) if v.value is not None else -1]
+                for v in enum.variants
+            ]
+            enums.append([enum.name, file_id, enum.line, enum.column, enum.doc, variants])
+
+    return {
+        "header": {
+            "format": INDEX_FORMAT,
+            "version": INDEX_VERSION,
+            "root": str(index.root),
+            "widgets_src": str(widgets_src_dir(index.source_root)),
+            "fingerprint": index.fingerprint,
+        },
+        "files": files,
+        "strings": strings.strings,
+        "structs": structs,
+        "enums": enums,
+    }
+
+def build_verbose_index(index: MakepadIndex) -> dict:
+    """The same records with named keys, the way locations.json is laid out."""
+    files = []
+    for file_index in index.files:
+        files.append({
+            "file": file_index.path,
+            "structs": [
+                {
+                    "name": struct.name,
+                    "line": struct.line,
+                    "column": struct.column,
+                    "doc": struct.doc,
+                    "properties": [
+                        {"name": p.name, "type": p.prop_type, "default": p.default, "line": p.line, "column": p.column}
+                        for p in struct.properties
+                    ],
+                }
+                for struct in file_index.structs
+            ],
+            "enums": [
+                {
+                    "name": enum.name,
+                    "line": enum.line,
+                    "column": enum.column,
+                    "doc": enum.doc,
+                    "default": enum.default,
+                    "variants": [
+                        {"name": v.name, "line": v.line, "column": v.column, "doc": v.doc,
+                         "pick": v.pick, "is_default": v.is_default, "value": v.value}
+                        for v in enum.variants
+                    ],
+                }
+                for enum in file_index.enums
+            ],
+        })
+    return {"fingerprint": index.fingerprint, "files": files}
+
+def dump_compact(data: dict) -> str:
+    return json.dumps(data, separators=(',', ':'))
+
+def write_compact_index(data: dict, path: Path = OUTPUT_PATH):
+    """Write the compact index."""
+    with atomic_write(path) as f:
+        write_compact(f, data)
+
+    print(f"Index {'written to' if f.rewritten else 'unchanged:'} {path}")
+
+def compare_formats(index: MakepadIndex, repeat: int = 5):
+    """Print size and parse time of the compact index against indent=2 JSON."""
+    encodings = [
+        ("compact", dump_compact(build_compact_index(index))),
+        ("indent=2", json.dumps(build_verbose_index(index), indent=2)),
+    ]
+    for label, text in encodings:
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            json.loads(text)
+            best = min(best, time.perf_counter() - started)
+        print(f"  {label:>8}: {len(text.encode()) / 1024:8.1f} KB, load {best * 1000:7.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the prebuilt index loaded by the VS Code extension.")
+    add_index_arguments(parser)
+    parser.add_argument("--compare", action="store_true",
+                        help="report size and load time against pretty-printed JSON")
+    args = parser.parse_args()
+
+    index = index_from_args(args)
+    write_compact_index(build_compact_index(index))
+
+    if args.compare:
+        print("Format comparison:")
+        compare_formats(index)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Write the precomputed completion tables the VS Code extension answers
+completions from.
+
+Widget names, properties and per-property value lists are emitted as arrays
+sorted by lower-cased name, so the extension finds every entry starting with
+the typed prefix with two binary searches instead of rebuilding and filtering
+completion lists on each keystroke. Per-widget property sets are lists of
+indexes into the shared property table. Enum-typed properties are linked to
+their Live enum, whose variants, docs and #[pick] default are included, so
+value completion and hover need no lookups in Makepad source.
+"""
+
+import time
+import random
+import string
+import argparse
+from bisect import bisect_left
+from pathlib import Path
+
+from makepad_index import MakepadIndex, add_index_arguments, enum_of, index_from_args, value_type
+from outputs import atomic_write, write_compact
+
+OUTPUT_PATH = Path(__file__).parent.parent / "src" / "completions.json"
+
+TABLES_FORMAT = "makepad-completions"
+TABLES_VERSION = 3
+
+def sort_key(name: str) -> tuple:
+    return (name.lower(), name)
+
+def prefix_range(keys: list, prefix: str) -> range:
+    """Indexes of the sorted lower-cased keys that start with prefix."""
+    prefix = prefix.lower()
+    lo = bisect_left(keys, prefix)
+    hi = bisect_left(keys, prefix + '\uffff', lo)
+    return range(lo, hi)
+
+def property_values(prop_type: str, enums: dict) -> list:
+    """Values a property of this type can be set to, if they're enumerable."""
+    if value_type(prop_type) == 'bool':
+        return ['true', 'false']
+    enum = enum_of(prop_type, enums)
+    return [v.name for v in enum.variants] if enum else []
+
+def build_completion_tables(index: MakepadIndex) -> dict:
+    """Build the sorted widget, property and value tables.
+
+    widgets:           [[name, doc], ...] sorted by lower-cased name
+    properties:        [[name, type, doc], ...] sorted by lower-cased name, first definition wins
+    widget_properties: {widget: [property index, ...]} of its effective (inherited) set, in table order
+    values:            {property: [value, ...]} for bool and Live enum typed properties
+    property_enums:    {property: enum} for Live enum typed properties
+    enums:             {enum: {doc, default, variants: [[name, doc], ...]}} for the enums properties take
+    """
+    widgets = index.widgets
+    resolved = index.resolved_widgets
+    enums = index.enums
+
+    properties = {}
+    for name in sorted(widgets):
+        for prop in resolved[name]:
+            properties.setdefault(prop.property.name, prop.property)
+    property_names = sorted(properties, key=sort_key)
+    property_ids = {name: i for i, name in enumerate(property_names)}
+
+    values = {}
+    property_enums = {}
+    for name in property_names:
+        prop_values = property_values(properties[name].prop_type, enums)
+        if prop_values:
+            values[name] = prop_values
+        enum = enum_of(properties[name].prop_type, enums)
+        if enum:
+            property_enums[name] = enum.name
+
+    return {
+        "header": {"format": TABLES_FORMAT, "version": TABLES_VERSION, **index.source_header()},
+        "widgets": [[name, widgets[name].doc] for name in sorted(widgets, key=sort_key)],
+        "properties": [[name, properties[name].prop_type, properties[name].doc] for name in property_names],
+        "widget_properties": {
+            name: sorted({property_ids[prop.property.name] for prop in resolved[name]})
+            for name in sorted(widgets)
+        },
+        "values": values,
+        "property_enums": property_enums,
+        "enums": {
+            name: {
+                "doc": enums[name].doc,
+                "default": enums[name].default,
+                "variants": [[variant.name, variant.doc] for variant in enums[name].variants],
+            }
+            for name in sorted(set(property_enums.values()))
+        },
+    }
+
+def write_completion_tables(tables: dict, path: Path = OUTPUT_PATH):
+    """Write the completion tables."""
+    with atomic_write(path) as f:
+        write_compact(f, tables)
+
+    print(f"Completion tables {'written to' if f.rewritten else 'unchanged:'} {path}")
+
+def benchmark(symbols: int, lookups: int = 10_000, seed: int = 0):
+    """Compare sorted-array prefix lookup with filtering the full list."""
+    rng = random.Random(seed)
+    names = sorted({
+        rng.choice(string.ascii_uppercase) + ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 14)))
+        for _ in range(symbols)
+    }, key=sort_key)
+    started = time.perf_counter()
+    keys = [name.lower() for name in names]
+    built = time.perf_counter() - started
+    prefixes = [rng.choice(names)[:rng.randint(1, 4)] for _ in range(lookups)]
+
+    started = time.perf_counter()
+    found = sum(len(prefix_range(keys, prefix)) for prefix in prefixes)
+    sorted_seconds = time.perf_counter() - started
+
+    # Filtering the whole list is what the extension used to do; a sample is enough to time it
+    sample = prefixes[:max(1, lookups // 50)]
+    started = time.perf_counter()
+    scanned = [sum(1 for name in names if name.lower().startswith(prefix.lower())) for prefix in sample]
+    scan_seconds = (time.perf_counter() - started) / len(sample)
+
+    assert scanned == [len(prefix_range(keys, prefix)) for prefix in sample]
+    sorted_seconds /= lookups
+    print(f"{len(names)} symbols, {lookups} prefix lookups ({found / lookups:.1f} matches each):")
+    print(f"  sorted array: {sorted_seconds * 1e6:8.2f} us/lookup (keys built in {built * 1000:.2f} ms)")
+    print(f"  linear scan:  {scan_seconds * 1e6:8.2f} us/lookup ({scan_seconds / sorted_seconds:.0f}x slower)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the completion tables loaded by the VS Code extension.")
+    add_index_arguments(parser)
+    parser.add_argument("--benchmark", type=int, metavar="SYMBOLS",
+                        help="benchmark prefix lookup on this many synthetic symbols instead of writing tables")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+
+    tables = build_completion_tables(index_from_args(args))
+    write_completion_tables(tables)
+    print(f"{len(tables['widgets'])} widgets, {len(tables['properties'])} properties, "
+          f"{len(tables['values'])} value lists, {len(tables['enums'])} enums")
+
+if __name__ == "__main__":
+    main()
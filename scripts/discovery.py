@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Find the Makepad source the generators should index.
+
+Searches the same places as the extension's findMakepadWidgetsPath(), in the
+same order: MAKEPAD_PATH, a workspace sibling or the workspace itself, the
+Cargo registry, Cargo git checkouts, then common development paths. Registry
+versions are compared as semver (0.10.0 is newer than 0.9.0), and directory
+listings are bounded to the depth each layout needs.
+
+Walking the registry is the expensive step, so its result is cached together
+with the mtimes of the directories that were listed. Adding or removing a
+crate or checkout changes those mtimes; as long as they match, later runs
+reuse the cached answer without listing anything.
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from outputs import atomic_write
+
+CACHE_PATH = Path(__file__).parent / ".cache" / "discovery.json"
+CACHE_VERSION = 1
+
+# Crates unpacked into the Cargo registry live side by side as makepad-<crate>-<version>
+REGISTRY_CRATE_RE = re.compile(r'^makepad-([a-z_-]+?)-(\d+\.\d+\.\d+\S*)$')
+SEMVER_RE = re.compile(r'^(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$')
+
+COMMON_DIRS = ["makepad", "projects/makepad", "dev/makepad", "code/makepad", "Work/makepad", "src/makepad"]
+
+def cargo_home() -> Path:
+    return Path(os.environ["CARGO_HOME"]) if os.environ.get("CARGO_HOME") else Path.home() / ".cargo"
+
+def semver_key(version: str) -> tuple:
+    """Sort key implementing semver precedence; build metadata is ignored.
+
+    A pre-release sorts before its release, and numeric identifiers compare
+    numerically and before alphanumeric ones. Unparseable versions sort first.
+    """
+    match = SEMVER_RE.match(version)
+    if not match:
+        return (-1, -1, -1, 0, ())
+    major, minor, patch, pre = match.groups()
+    if pre is None:
+        return (int(major), int(minor), int(patch), 1, ())
+    identifiers = tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in pre.split('.'))
+    return (int(major), int(minor), int(patch), 0, identifiers)
+
+def list_dirs(path: Path) -> list:
+    """Names of the subdirectories of path (one scandir, no recursion)."""
+    try:
+        with os.scandir(path) as entries:
+            return [entry.name for entry in entries if entry.is_dir()]
+    except OSError:
+        return []
+
+def has_widgets(root: Path) -> bool:
+    return (root / "widgets" / "src").is_dir()
+
+def registry_versions(scanned: dict) -> list:
+    """(version, crate dir) of every makepad-widgets crate in the Cargo registry, oldest first.
+
+    Lists registry/src and each index directory below it (depth 2), recording
+    the mtime of every listed directory in scanned.
+    """
+    registry = cargo_home() / "registry" / "src"
+    found = []
+    for index_dir in [registry / name for name in sorted(list_dirs(registry))]:
+        record_mtime(scanned, index_dir)
+        for name in list_dirs(index_dir):
+            match = REGISTRY_CRATE_RE.match(name)
+            if match and match.group(1) == "widgets" and (index_dir / name / "src").is_dir():
+                found.append((match.group(2), index_dir / name))
+    record_mtime(scanned, registry)
+    return sorted(found, key=lambda item: (semver_key(item[0]), str(item[1])))
+
+def git_checkouts(scanned: dict) -> list:
+    """(name, checkout root) of every Makepad git checkout, least recently updated first.
+
+    Lists git/checkouts and each makepad-* directory below it (depth 2).
+    Revisions are hashes, so they are ordered by modification time.
+    """
+    checkouts = cargo_home() / "git" / "checkouts"
+    found = []
+    for name in sorted(list_dirs(checkouts)):
+        if 'makepad' not in name.lower():
+            continue
+        checkout = checkouts / name
+        record_mtime(scanned, checkout)
+        for rev in list_dirs(checkout):
+            root = checkout / rev
+            if has_widgets(root):
+                found.append((f"git:{name}/{rev}", root, root.stat().st_mtime_ns))
+    record_mtime(scanned, checkouts)
+    return [(version, root) for version, root, _ in sorted(found, key=lambda item: item[2])]
+
+def record_mtime(scanned: dict, path: Path):
+    try:
+        scanned[str(path)] = path.stat().st_mtime_ns
+    except OSError:
+        scanned[str(path)] = None
+
+def fingerprint_matches(scanned: dict) -> bool:
+    """True if every directory listed last time still has the same mtime."""
+    current = {}
+    for path in scanned:
+        record_mtime(current, Path(path))
+    return current == scanned
+
+def scan_cargo(use_cache: bool = True, cache_path: Path = CACHE_PATH) -> Optional[tuple]:
+    """(source, root) of the newest registry crate, else the newest git checkout.
+
+    Served from the cache while the listed directories are unchanged.
+    """
+    if use_cache:
+        try:
+            cached = json.loads(cache_path.read_text())
+            if (cached.get("version") == CACHE_VERSION and cached.get("cargo_home") == str(cargo_home())
+                    and fingerprint_matches(cached["scanned"])
+                    and (cached["result"] is None or Path(cached["result"][1]).is_dir())):
+                return tuple(cached["result"]) if cached["result"] else None
+        except (OSError, ValueError, KeyError):
+            pass
+
+    scanned = {}
+    result = None
+    versions = registry_versions(scanned)
+    if versions:
+        result = ("registry", str(versions[-1][1]))
+    else:
+        checkouts = git_checkouts(scanned)
+        if checkouts:
+            result = ("git", str(checkouts[-1][1]))
+
+    if use_cache:
+        with atomic_write(cache_path, track=False) as f:
+            json.dump({"version": CACHE_VERSION, "cargo_home": str(cargo_home()), "scanned": scanned,
+                       "result": result}, f)
+    return result
+
+def find_makepad_root(workspace: Optional[Path] = None, use_cache: bool = True) -> tuple:
+    """Return (source, root) of the Makepad source to index, or (None, None).
+
+    root is a checkout containing widgets/src, or a makepad-widgets-X.Y.Z
+    registry crate (makepad_index resolves its sibling crates).
+    """
+    if os.environ.get("MAKEPAD_PATH"):
+        return "MAKEPAD_PATH", Path(os.environ["MAKEPAD_PATH"])
+
+    workspace = Path(workspace or os.getcwd())
+    if has_widgets(workspace.parent / "makepad"):
+        return "workspace sibling", workspace.parent / "makepad"
+    if has_widgets(workspace):
+        return "workspace", workspace
+
+    cargo = scan_cargo(use_cache)
+    if cargo:
+        return cargo[0], Path(cargo[1])
+
+    for rel in COMMON_DIRS:
+        root = Path.home() / rel
+        if has_widgets(root):
+            return "common path", root
+    return None, None
+
+def discover_versions() -> list:
+    """(version, root) of every Makepad version installed by Cargo, registry crates first."""
+    scanned = {}
+    return registry_versions(scanned) + git_checkouts(scanned)
+
+def main():
+    parser = argparse.ArgumentParser(description="Show which Makepad source the generators will index.")
+    parser.add_argument("--list", action="store_true", help="list every registry crate and git checkout found")
+    parser.add_argument("--no-cache", action="store_true", help="scan the Cargo directories even if the cache is valid")
+    args = parser.parse_args()
+
+    if args.list:
+        for version, root in discover_versions():
+            print(f"{version:>24}  {root}")
+        return
+
+    started = time.perf_counter()
+    source, root = find_makepad_root(use_cache=not args.no_cache)
+    elapsed = (time.perf_counter() - started) * 1000
+    if root is None:
+        print(f"Makepad source not found ({elapsed:.2f} ms); set MAKEPAD_PATH")
+    else:
+        print(f"{root} (from {source}, {elapsed:.2f} ms)")
+
+if __name__ == "__main__":
+    main()
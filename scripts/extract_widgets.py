@@ -7,116 +7,44 @@ This script parses the Makepad widgets source to create:
 3. Documentation for hover tooltips
 """
 
-import os
-import re
 import json
+import argparse
+from itertools import chain
 from pathlib import Path
-from dataclasses import dataclass, field
 from typing import Optional
 
-# Default path - override with MAKEPAD_PATH environment variable
-MAKEPAD_WIDGETS_PATH = Path(os.environ.get("MAKEPAD_PATH", "")).joinpath("widgets/src") if os.environ.get("MAKEPAD_PATH") else Path.home() / "makepad" / "widgets" / "src"
+from makepad_index import (ExtractionCache, ResolvedProperty, Widget, add_index_arguments, build_index,
+                           index_from_args)
+from metrics import add_profile_arguments, metrics_from_args
+from completion_tables import build_completion_tables, write_completion_tables
+from outputs import atomic_write, remove_stale, write_summary
 
-@dataclass
-class WidgetProperty:
-    name: str
-    prop_type: str
-    default: Optional[str] = None
-    doc: str = ""
+OUTPUT_PATH = Path(__file__).parent.parent / "snippets" / "makepad.json"
+METRICS_PATH = OUTPUT_PATH.with_suffix(".metrics.json")
+DOCS_PATH = Path(__file__).parent.parent / "docs" / "WIDGETS.md"
+DOCS_PAGES_PATH = DOCS_PATH.parent / "widgets"
 
-@dataclass 
-class Widget:
-    name: str
-    file: str
-    properties: list = field(default_factory=list)
-    doc: str = ""
-    is_usable: bool = True  # Some are internal/Draw* types
+# First line of every page written to DOCS_PAGES_PATH; only pages carrying it are ever deleted
+DOCS_PAGE_MARKER = "<!-- Generated by scripts/extract_widgets.py from Makepad source; do not edit. -->\n"
 
-def extract_widgets():
-    """Extract all widget definitions from Makepad source."""
-    widgets = {}
-    
-    for rs_file in MAKEPAD_WIDGETS_PATH.glob("*.rs"):
-        content = rs_file.read_text()
-        
-        # Find structs with #[derive(...Live...Widget...)]
-        # Pattern: #[derive(...)] ... pub struct Name { ... }
-        struct_pattern = r'#\[derive\([^\]]*(?:Live|Widget)[^\]]*\)\]\s*(?:#\[[^\]]*\]\s*)*pub struct (\w+)\s*\{'
-        
-        for match in re.finditer(struct_pattern, content):
-            name = match.group(1)
-            
-            # Skip internal types
-            if name.startswith('Draw') or name.endswith('Ref') or name.endswith('Set'):
-                continue
-            if name in ['WidgetAction', 'WidgetActionData', 'WidgetUid', 'WidgetRegistry']:
-                continue
-                
-            # Extract properties
-            struct_start = match.end()
-            brace_count = 1
-            struct_end = struct_start
-            
-            for i, char in enumerate(content[struct_start:]):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        struct_end = struct_start + i
-                        break
-            
-            struct_body = content[struct_start:struct_end]
-            properties = extract_properties(struct_body)
-            
-            # Get doc comment
-            doc = extract_doc_comment(content, match.start())
-            
-            widgets[name] = Widget(
-                name=name,
-                file=rs_file.name,
-                properties=properties,
-                doc=doc
-            )
-    
-    return widgets
+# Properties put into generated snippet bodies, in order, when a widget accepts them
+SNIPPET_PROPERTIES = {
+    'width': "${%d|Fill,Fit,100|}",
+    'height': "${%d|Fill,Fit,100|}",
+    'flow': "${%d|Down,Right,Overlay,RightWrap|}",
+    'text': '"${%d:Text}"',
+}
 
-def extract_properties(struct_body: str) -> list:
-    """Extract #[live] properties from struct body."""
-    properties = []
-    
-    # Pattern for #[live] or #[live(default)] followed by field: Type
-    live_pattern = r'#\[live(?:\(([^)]*)\))?\]\s*(?:pub\s+)?(\w+):\s*([^,\n]+)'
-    
-    for match in re.finditer(live_pattern, struct_body):
-        default = match.group(1)
-        name = match.group(2)
-        prop_type = match.group(3).strip().rstrip(',')
-        
-        properties.append(WidgetProperty(
-            name=name,
-            prop_type=prop_type,
-            default=default
-        ))
-    
-    return properties
+def extract_widgets(cache: Optional[ExtractionCache] = None, jobs: int = 1):
+    """Extract all widget definitions from Makepad source."""
+    return build_index(cache, jobs=jobs).widgets
 
-def extract_doc_comment(content: str, pos: int) -> str:
-    """Extract /// doc comments before a struct."""
-    lines = content[:pos].split('\n')
-    doc_lines = []
-    
-    for line in reversed(lines[-10:]):
-        stripped = line.strip()
-        if stripped.startswith('///'):
-            doc_lines.insert(0, stripped[3:].strip())
-        elif stripped and not stripped.startswith('#'):
-            break
-    
-    return ' '.join(doc_lines)
+def own_properties(widget: Widget) -> list:
+    """A widget's own properties as a property set, for when inheritance isn't resolved."""
+    return [ResolvedProperty(prop, widget.name) for prop in widget.properties]
 
-def generate_snippets(widgets: dict) -> dict:
-    """Generate VS Code snippets from widgets."""
+def generate_snippets(widgets: dict, resolved: Optional[dict] = None) -> dict:
+    """Generate VS Code snippets from widgets and their effective property sets."""
     snippets = {}
     
     # Common widgets that should have detailed snippets
@@ -130,13 +58,19 @@ def generate_snippets(widgets: dict) -> dict:
     
     for name, widget in widgets.items():
         if name in common_widgets:
-            snippet = generate_widget_snippet(widget)
+            snippet = generate_widget_snippet(widget, resolved[name] if resolved else None)
             snippets[f"{name} Widget"] = snippet
     
     return snippets
 
-def generate_widget_snippet(widget: Widget) -> dict:
-    """Generate a single widget snippet."""
+def generate_widget_snippet(widget: Widget, properties: Optional[list] = None) -> dict:
+    """Generate a single widget snippet.
+    
+    Widgets without a hand-written body get tab stops for whichever of
+    SNIPPET_PROPERTIES their effective property set contains.
+    """
+    if properties is None:
+        properties = own_properties(widget)
     prefix = f"mp{widget.name.lower()}"
     
     # Build body
@@ -201,6 +135,10 @@ def generate_widget_snippet(widget: Widget) -> dict:
             "    }"
         ])
     else:
+        accepted = {resolved.property.name for resolved in properties}
+        stops = [name for name in SNIPPET_PROPERTIES if name in accepted]
+        for n, name in enumerate(stops, start=2):
+            body_lines.append(f"    {name}: {SNIPPET_PROPERTIES[name] % n}")
         body_lines.append("    $0")
     
     body_lines.append("}")
@@ -525,16 +463,12 @@ def generate_layout_snippets() -> dict:
         }
     }
 
-def main():
-    print("Extracting widgets from Makepad source...")
-    widgets = extract_widgets()
-    print(f"Found {len(widgets)} widgets")
-    
-    # Generate all snippets
+def build_snippets(widgets: dict, resolved: Optional[dict] = None) -> dict:
+    """Generate every snippet group, reporting counts as we go."""
     all_snippets = {}
     
     # Widget snippets
-    widget_snippets = generate_snippets(widgets)
+    widget_snippets = generate_snippets(widgets, resolved)
     all_snippets.update(widget_snippets)
     print(f"Generated {len(widget_snippets)} widget snippets")
     
@@ -554,57 +488,145 @@ def main():
     print(f"Generated {len(layout_snippets)} layout snippets")
     
     print(f"\nTotal: {len(all_snippets)} snippets")
+    return all_snippets
+
+def write_snippets(snippets: dict):
+    """Write snippets/makepad.json."""
+    with atomic_write(OUTPUT_PATH) as f:
+        json.dump(snippets, f, indent=2)
     
-    # Write to file
-    output_path = Path(__file__).parent.parent / "snippets" / "makepad.json"
-    with open(output_path, 'w') as f:
-        json.dump(all_snippets, f, indent=2)
+    print(f"{'Written to' if f.rewritten else 'Unchanged:'} {OUTPUT_PATH}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate snippets and docs from Makepad source.")
+    add_index_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument("--shard-docs", action="store_true",
+                        help="write one docs/widgets/<Name>.md page per widget with WIDGETS.md as an index")
+    args = parser.parse_args()
+    metrics = metrics_from_args(args, "extract_widgets")
     
-    print(f"Written to {output_path}")
+    print("Extracting widgets from Makepad source...")
+    index = index_from_args(args, metrics)
+    widgets = index.widgets
+    print(f"Found {len(widgets)} widgets")
+    with metrics.phase("resolve inheritance"):
+        resolved = index.resolved_widgets
+    report_resolution(index)
+    
+    with metrics.phase("render snippets"):
+        snippets = build_snippets(widgets, resolved)
+    with metrics.phase("write snippets"):
+        write_snippets(snippets)
+    with metrics.phase("completion tables"):
+        write_completion_tables(build_completion_tables(index))
     
     # Also generate documentation
-    generate_documentation(widgets)
+    with metrics.phase("docs"):
+        generate_documentation(widgets, shard=args.shard_docs, resolved=resolved)
+    
+    print(write_summary())
+    metrics.finish(METRICS_PATH, args.profile_top)
+
+def report_resolution(index):
+    """Print how many structs inheritance resolution expanded, warning about cycles."""
+    resolver = index.resolver
+    print(f"Resolved inheritance of {len(resolver.resolved)} structs"
+          + (f" ({len(resolver.unresolved)} base types not indexed: {', '.join(sorted(resolver.unresolved))})"
+             if resolver.unresolved else ""))
+    for cycle in resolver.cycles:
+        print(f"Warning: #[deref] cycle {' -> '.join(cycle)}; the closing field was skipped")
+
+def render_widget_doc(name: str, widget: Widget, level: int = 2, properties: Optional[list] = None):
+    """Yield the markdown section for one widget, headed at the given level.
+    
+    properties is the widget's effective property set; inherited entries say
+    which struct declares them and through which fields.
+    """
+    if properties is None:
+        properties = own_properties(widget)
+    heading = "#" * level
+    yield f"{heading} {name}\n\n"
+    yield f"**File:** `{widget.file}`\n\n"
+    
+    if widget.doc:
+        yield f"{widget.doc}\n\n"
+    
+    if properties:
+        yield f"{heading}# Properties\n\n"
+        yield "| Property | Type | Default | From |\n"
+        yield "|----------|------|---------|------|\n"
+        for resolved in properties:
+            prop = resolved.property
+            default = prop.default if prop.default else "-"
+            origin = f"`{resolved.origin}` via `{'.'.join(resolved.via)}`" if resolved.via else "-"
+            yield f"| `{prop.name}` | `{prop.prop_type}` | {default} | {origin} |\n"
+        yield "\n"
+    
+    yield f"{heading}# Example\n\n"
+    yield "```rust\n"
+    yield f"my_{name.lower()} = <{name}> {{\n"
+    yield "    // properties here\n"
+    yield "}\n"
+    yield "```\n\n"
 
-def generate_documentation(widgets: dict):
-    """Generate markdown documentation for widgets."""
-    doc_path = Path(__file__).parent.parent / "docs" / "WIDGETS.md"
-    doc_path.parent.mkdir(exist_ok=True)
+def render_documentation(widgets: dict, resolved: Optional[dict] = None):
+    """Yield the single-file WIDGETS.md, one section per widget."""
+    yield "# Makepad Widgets Reference\n\n"
+    yield "Auto-generated from Makepad source code.\n\n"
+    yield "## Table of Contents\n\n"
+    
+    for name in sorted(widgets.keys()):
+        yield f"- [{name}](#{name.lower()})\n"
+    
+    yield "\n---\n\n"
+    
+    for name, widget in sorted(widgets.items()):
+        yield from render_widget_doc(name, widget, properties=resolved[name] if resolved else None)
+        yield "---\n\n"
+
+def render_documentation_index(widgets: dict):
+    """Yield WIDGETS.md as an index linking to one page per widget."""
+    yield "# Makepad Widgets Reference\n\n"
+    yield "Auto-generated from Makepad source code.\n\n"
+    yield "## Widgets\n\n"
+    
+    for name, widget in sorted(widgets.items()):
+        summary = f" - {widget.doc.split('. ')[0].rstrip('.')}" if widget.doc else ""
+        yield f"- [{name}]({DOCS_PAGES_PATH.name}/{name}.md){summary}\n"
+
+def write_stream(path: Path, chunks) -> bool:
+    """Write rendered chunks to path; returns False if the content was unchanged."""
+    with atomic_write(path) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return f.rewritten
+
+def generate_documentation(widgets: dict, shard: bool = False, resolved: Optional[dict] = None):
+    """Generate markdown documentation for widgets.
+    
+    By default everything goes into docs/WIDGETS.md. With shard=True each
+    widget gets its own page under docs/widgets/ and WIDGETS.md becomes an
+    index. Only files whose content changed are rewritten, and only pages
+    this function generated (see DOCS_PAGE_MARKER) are ever removed.
+    """
+    if not shard:
+        rewritten = write_stream(DOCS_PATH, render_documentation(widgets, resolved))
+        removed = remove_stale(DOCS_PAGES_PATH, set(), "*.md", marker=DOCS_PAGE_MARKER)
+        print(f"Documentation {'written to' if rewritten else 'unchanged:'} {DOCS_PATH}"
+              + (f" ({len(removed)} stale pages removed)" if removed else ""))
+        return
     
-    with open(doc_path, 'w') as f:
-        f.write("# Makepad Widgets Reference\n\n")
-        f.write("Auto-generated from Makepad source code.\n\n")
-        f.write("## Table of Contents\n\n")
-        
-        for name in sorted(widgets.keys()):
-            f.write(f"- [{name}](#{name.lower()})\n")
-        
-        f.write("\n---\n\n")
-        
-        for name, widget in sorted(widgets.items()):
-            f.write(f"## {name}\n\n")
-            f.write(f"**File:** `{widget.file}`\n\n")
-            
-            if widget.doc:
-                f.write(f"{widget.doc}\n\n")
-            
-            if widget.properties:
-                f.write("### Properties\n\n")
-                f.write("| Property | Type | Default |\n")
-                f.write("|----------|------|--------|\n")
-                for prop in widget.properties:
-                    default = prop.default if prop.default else "-"
-                    f.write(f"| `{prop.name}` | `{prop.prop_type}` | {default} |\n")
-                f.write("\n")
-            
-            f.write("### Example\n\n")
-            f.write("```rust\n")
-            f.write(f"my_{name.lower()} = <{name}> {{\n")
-            f.write("    // properties here\n")
-            f.write("}\n")
-            f.write("```\n\n")
-            f.write("---\n\n")
+    rewritten = 0
+    for name, widget in sorted(widgets.items()):
+        rewritten += write_stream(DOCS_PAGES_PATH / f"{name}.md", chain([DOCS_PAGE_MARKER], render_widget_doc(
+            name, widget, level=1, properties=resolved[name] if resolved else None)))
+    rewritten += write_stream(DOCS_PATH, render_documentation_index(widgets))
+    removed = remove_stale(DOCS_PAGES_PATH, {f"{name}.md" for name in widgets}, "*.md", marker=DOCS_PAGE_MARKER)
     
-    print(f"Documentation written to {doc_path}")
+    total = len(widgets) + 1
+    print(f"Documentation written to {DOCS_PATH} and {DOCS_PAGES_PATH}/: "
+          f"{rewritten} rewritten, {total - rewritten} unchanged, {len(removed)} removed")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Fuzzy search over widget, property and Live enum names.
+
+For names that are only half remembered: `PortalLst`, `drawbg` and
+`ScrollYV` find PortalList, draw_bg and ScrollYView. Names are matched
+without case or separators. A trigram index, padded at every word start so
+that short and word-aligned queries hit too, narrows the symbols to the few
+sharing the most trigrams with the query. Postings are held as bitsets
+(Python ints), so counting shared trigrams for every symbol is a handful of
+big-integer ANDs and ORs. Queries that abbreviate every word of a name
+(`drawbg`, `ScrollYV`) share few trigrams with it, so a trie of the names'
+words adds the names whose words each start with the next piece of the
+query. Only these candidates are scored:
+
+- subsequence matches first, ranked by consecutive runs, matches at word
+  starts, gaps and length
+- then near misses: short queries with two letters swapped (`szie`) as if
+  swapped back, other typos by shared trigrams
+
+The table (symbols plus trigram postings) is written by generate_all.py, or
+by this script without queries, next to the snippets as
+snippets/makepad.symbols.json, and ships with them: it holds only names,
+kinds and short details, no paths. Queries load it instead of indexing
+Makepad again. When a Makepad source is found and its fingerprint (from a
+walk, without parsing) no longer matches the table's header, the table is
+rebuilt first; without a source the shipped table is searched as is:
+
+    fuzzy_search.py PortalLst drawbg ScrollYV
+"""
+
+import json
+import time
+import heapq
+import random
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from makepad_index import MakepadIndex, add_index_arguments, fingerprint_from_args, index_from_args
+from outputs import atomic_write, write_compact
+
+OUTPUT_PATH = Path(__file__).parent.parent / "snippets" / "makepad.symbols.json"
+
+SYMBOLS_FORMAT = "makepad-symbols"
+SYMBOLS_VERSION = 1
+
+KINDS = ("widget", "property", "enum", "variant")
+
+# Candidates (by shared trigrams) scored per query, as a multiple of the result limit
+CANDIDATE_FACTOR = 3
+MIN_CANDIDATES = 24
+# A swap of adjacent characters breaks up to four trigrams, most of a short query's, so
+# queries up to this long are also tried with one swap undone, at a cost in score
+SWAP_MAX_LENGTH = 8
+SWAP_PENALTY = 60
+# Long queries are ranked on their rarest trigrams only; counting more costs time, not recall
+MAX_RANKED_GRAMS = 12
+# --benchmark fails when recall@limit of any query style drops below this
+MIN_RECALL = 0.95
+
+# Maps each byte to 1 if it has any bit set, so the next set byte of a bitset is one find()
+NONZERO = bytes([0] + [1] * 255)
+BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+def symbol_key(name: str) -> str:
+    """name as matched: lower-cased, without `_`, `::` or other separators."""
+    return ''.join(ch for ch in name.lower() if ch.isalnum())
+
+def word_starts(name: str) -> tuple:
+    """Positions in symbol_key(name) where a word starts: after a separator, at a camel hump or a digit run."""
+    starts = []
+    position = 0
+    previous = ''
+    for ch in name:
+        if not ch.isalnum():
+            previous = ''
+            continue
+        if (not previous or (ch.isupper() and previous.islower())
+                or (ch.isdigit() and not previous.isdigit())):
+            starts.append(position)
+        position += 1
+        previous = ch
+    return tuple(starts)
+
+def key_trigrams(key: str, starts: tuple) -> set:
+    """Trigrams of a key, plus `^`-padded ones at each word start so short prefixes of any word match."""
+    grams = {key[i:i + 3] for i in range(len(key) - 2)}
+    for start in starts:
+        grams.add('^^' + key[start])
+        if start + 1 < len(key):
+            grams.add('^' + key[start:start + 2])
+    return grams
+
+def query_trigrams(key: str) -> set:
+    """Trigrams of a query, which is expected to start at a word start."""
+    return key_trigrams(key, (0,) if key else ())
+
+def first_sentence(doc: str) -> str:
+    return doc.split('. ')[0].rstrip('.')
+
+def collect_symbols(index: MakepadIndex) -> list:
+    """[name, kind, detail] of every widget, property, Live enum and variant.
+
+    detail is the first sentence of a widget's or enum's doc, a property's
+    type and a variant's enum. A property shared by several widgets is listed once.
+    """
+    symbols = [[name, "widget", first_sentence(widget.doc)] for name, widget in index.widgets.items()]
+    properties = {}
+    for resolved in index.resolved_widgets.values():
+        for entry in resolved:
+            properties.setdefault(entry.property.name, entry.property.prop_type)
+    symbols.extend([name, "property", ty] for name, ty in properties.items())
+    for enum in index.enums.values():
+        symbols.append([enum.name, "enum", first_sentence(enum.doc)])
+        symbols.extend([variant.name, "variant", enum.name] for variant in enum.variants)
+    return symbols
+
+class SymbolIndex:
+    """Symbols ordered by key length, with trigram postings of symbol ids.
+
+    Ids are positions in that order, so among equally good candidates the
+    lower id is the shorter name.
+    """
+
+    def __init__(self, symbols: list, postings: Optional[dict] = None):
+        keyed = [(symbol_key(symbol[0]), symbol) for symbol in symbols]
+        if postings is None:
+            keyed.sort(key=lambda pair: (len(pair[0]), pair[0], pair[1][1], pair[1][0]))
+        self.symbols = [symbol for _, symbol in keyed]
+        self.keys = [key for key, _ in keyed]
+        self.starts = [word_starts(symbol[0]) for symbol in self.symbols]
+        self.marked = [marked_key(key, starts) for key, starts in zip(self.keys, self.starts)]
+        if postings is None:
+            postings = {}
+            for i, (key, starts) in enumerate(zip(self.keys, self.starts)):
+                for gram in key_trigrams(key, starts):
+                    postings.setdefault(gram, []).append(i)
+        self.postings = postings
+        self.size = (len(self.symbols) + 7) // 8
+        self.masks = {gram: ids_mask(ids, self.size) for gram, ids in postings.items()}
+        # Symbols containing each character: any subsequence (or transposition) match contains all of the query's
+        characters = {}
+        for i, key in enumerate(self.keys):
+            for ch in set(key):
+                characters.setdefault(ch, []).append(i)
+        self.characters = {ch: ids_mask(ids, self.size) for ch, ids in characters.items()}
+        kinds = {}
+        for i, symbol in enumerate(self.symbols):
+            kinds.setdefault(symbol[1], []).append(i)
+        self.kinds = {kind: ids_mask(ids, self.size) for kind, ids in kinds.items()}
+        # Names of two or more words as a trie of their words, children grouped by first letter:
+        # {letter: {word: node}}, with the ids of the names ending at a node under ''
+        self.words = {}
+        for i, (key, starts) in enumerate(zip(self.keys, self.starts)):
+            if len(starts) > 1:
+                node = self.words
+                for start, end in zip(starts, starts[1:] + (len(key),)):
+                    word = key[start:end]
+                    node = node.setdefault(word[0], {}).setdefault(word, {})
+                node.setdefault('', []).append(i)
+
+    def candidates(self, key: str, count: int, kind: Optional[str] = None) -> list:
+        """Ids of up to count symbols to score for key.
+
+        Names key abbreviates word by word (`drawbg`, `ScrollYV`) take up to
+        half; the rest share the most trigrams with key, ties going to the
+        lower id. Symbols containing every character of key come first.
+        """
+        grams = query_trigrams(key)
+        of_kind = self.kinds.get(kind, 0) if kind else -1
+        within = of_kind
+        for ch in set(key):
+            within &= self.characters.get(ch, 0)
+        found = []
+        if within:
+            found = self.abbreviated(key, count // 2, kind)
+            taken = set(found)
+            found.extend(i for i in self.ranked(grams, count, within) if i not in taken)
+        if len(found) < count:
+            taken = set(found)
+            found.extend(i for i in self.ranked(grams, count, of_kind) if i not in taken)
+        return found[:count]
+
+    def abbreviated(self, key: str, count: int, kind: Optional[str] = None) -> list:
+        """Lowest ids, up to count, of names of two or more words whose words each start with the next piece of key.
+
+        Walks the word trie, so only words matching the query at the current
+        position are followed: `seltori` reaches selected_top_right through
+        sel, to and ri.
+        """
+        found = []
+        stack = [(0, self.words, 0)]
+        while stack:
+            position, node, depth = stack.pop()
+            if position == len(key):
+                if depth > 1:
+                    found.extend(node.get('', ()))
+                continue
+            for word, child in node.get(key[position], {}).items():
+                length = 1
+                while True:
+                    stack.append((position + length, child, depth + 1))
+                    if length == len(word) or position + length == len(key) or key[position + length] != word[length]:
+                        break
+                    length += 1
+        if kind:
+            found = [i for i in found if self.symbols[i][1] == kind]
+        return sorted(found)[:count]
+
+    def ranked(self, grams: set, count: int, within: int) -> list:
+        """Ids of up to count symbols set in the mask within (-1 for all) sharing the most of grams."""
+        if within != -1 and within.bit_count() <= count:
+            return lowest_ids(within, count)
+        if len(grams) > MAX_RANKED_GRAMS:
+            grams = sorted(grams, key=lambda gram: (len(self.postings.get(gram, ())), gram))[:MAX_RANKED_GRAMS]
+        # levels[j]: symbols sharing at least j + 1 of the trigrams seen so far
+        levels = []
+        for gram in grams:
+            mask = self.masks.get(gram, 0) & within
+            if mask:
+                levels.append(0)
+                for j in range(len(levels) - 1, 0, -1):
+                    levels[j] |= levels[j - 1] & mask
+                levels[0] |= mask
+        # Everything above the deepest level holding count symbols, then that level's lowest ids
+        deeper = level = 0
+        for level in reversed(levels):
+            if level.bit_count() >= count:
+                break
+            deeper = level
+        found = lowest_ids(deeper, count)
+        found.extend(lowest_ids(level ^ deeper, count - len(found)))
+        return found
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> list:
+        """Best matches for query as [(score, [name, kind, detail]), ...], best first."""
+        key = symbol_key(query)
+        if not key:
+            return []
+        scored = []
+        misses = []
+        for i in self.candidates(key, max(MIN_CANDIDATES, limit * CANDIDATE_FACTOR), kind):
+            if is_subsequence(key, self.keys[i]):
+                scored.append((subsequence_score(key, self.keys[i], self.marked[i]), -i))
+            else:
+                misses.append(i)
+        if len(scored) < limit and misses:
+            # Short queries with two letters swapped (szie) are scored as the swap undone; other
+            # typos rank below every subsequence match, by the query's trigrams they contain
+            grams = [key[i:i + 3] for i in range(len(key) - 2)] or [key]
+            for i in misses:
+                swapped = self.swap_score(key, i) if len(key) <= SWAP_MAX_LENGTH else None
+                if swapped is not None:
+                    scored.append((swapped - SWAP_PENALTY, -i))
+                    continue
+                shared = sum(gram in self.keys[i] for gram in grams)
+                if shared:
+                    scored.append((shared * 100 // len(grams) - 100, -i))
+        return [(score, self.symbols[-i]) for score, i in heapq.nlargest(limit, scored)]
+
+    def swap_score(self, key: str, i: int) -> Optional[int]:
+        """Best subsequence score for symbol i of key with one pair of adjacent characters swapped back.
+
+        Only swaps around the first query character that doesn't match are
+        tried, which is where a transposition makes matching fail.
+        """
+        target = self.keys[i]
+        failed = matched_length(key, target)
+        best = None
+        for j in range(max(0, failed - 2), min(failed + 1, len(key) - 1)):
+            swapped = key[:j] + key[j + 1] + key[j] + key[j + 2:]
+            if key[j] != key[j + 1] and is_subsequence(swapped, target):
+                score = subsequence_score(swapped, target, self.marked[i])
+                best = score if best is None else max(best, score)
+        return best
+
+    def to_table(self, fingerprint: str = "") -> dict:
+        return {
+            "header": {"format": SYMBOLS_FORMAT, "version": SYMBOLS_VERSION, "fingerprint": fingerprint},
+            "symbols": self.symbols,
+            "trigrams": dict(sorted(self.postings.items())),
+        }
+
+def ids_mask(ids: list, size: int) -> int:
+    """Bitset (bit i set for each id i) of a posting list."""
+    bits = bytearray(size)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+def lowest_ids(mask: int, count: int) -> list:
+    """Up to count of the lowest ids set in mask."""
+    ids = []
+    if count <= 0 or not mask:
+        return ids
+    # Only convert as many low bits as hold count ids
+    width = 1024
+    while True:
+        window = mask & ((1 << width) - 1)
+        if window == mask or window.bit_count() >= count:
+            break
+        width <<= 2
+    data = window.to_bytes((window.bit_length() + 7) // 8, 'little')
+    flags = data.translate(NONZERO)
+    offset = flags.find(1)
+    while offset >= 0:
+        ids.extend([offset * 8 + bit for bit in BYTE_BITS[data[offset]]])
+        if len(ids) >= count:
+            return ids[:count]
+        offset = flags.find(1, offset + 1)
+    return ids
+
+def marked_key(key: str, starts: tuple) -> str:
+    """key with the letters that start a word upper-cased, so the next word start holding a letter is one find()."""
+    chars = list(key)
+    for start in starts:
+        chars[start] = chars[start].upper()
+    return ''.join(chars)
+
+def matched_length(query: str, key: str) -> int:
+    """How many leading characters of query match key as a subsequence, leftmost first."""
+    position = -1
+    for n, ch in enumerate(query):
+        position = key.find(ch, position + 1)
+        if position < 0:
+            return n
+    return len(query)
+
+def is_subsequence(query: str, key: str) -> bool:
+    position = -1
+    for ch in query:
+        position = key.find(ch, position + 1)
+        if position < 0:
+            return False
+    return True
+
+def subsequence_score(query: str, key: str, marked: str, prefer_starts: bool = True) -> Optional[int]:
+    """Score of query as a subsequence of key (both from symbol_key), or None if it isn't one.
+
+    Each query character takes the next key character when it continues a
+    run, else the next word start holding it (from marked_key()), else its
+    next occurrence; if preferring word starts strands a later character,
+    plain leftmost matching is tried. Runs and word starts score, skipped
+    characters cost, and exact and prefix matches of short keys come first.
+    """
+    position = -1
+    score = 0
+    run = 0
+    for ch in query:
+        following = position + 1
+        if key.startswith(ch, following):
+            found = following
+        else:
+            found = marked.find(ch.upper(), following) if prefer_starts else -1
+            if found < 0:
+                found = key.find(ch, following)
+                if found < 0:
+                    return subsequence_score(query, key, marked, False) if prefer_starts else None
+        if found == following and position >= 0:
+            run += 1
+            score += 4 + min(run, 4)
+        else:
+            run = 0
+            score += 1 - min(found - following, 4)
+        if marked[found] != ch:
+            score += 8 if found == 0 else 6
+        position = found
+    if len(query) == len(key):
+        score += 50
+    elif run == len(query) - 1 and key.startswith(query[0]):
+        score += 20
+    return score * 4 - (len(key) - len(query))
+
+def build_symbol_table(index: MakepadIndex) -> dict:
+    """The search table shipped next to the snippets.
+
+    symbols:  [[name, kind, detail], ...] ordered by key length, then key; a symbol's id is its position
+    trigrams: {trigram: [symbol id, ...]} ascending, over the separator-free lower-cased names
+    """
+    return SymbolIndex(collect_symbols(index)).to_table(index.fingerprint)
+
+def write_symbol_table(table: dict, path: Path = OUTPUT_PATH):
+    """Write the search table."""
+    with atomic_write(path) as f:
+        write_compact(f, table)
+
+    print(f"Symbol table {'written to' if f.rewritten else 'unchanged:'} {path}")
+
+def load_symbol_table(path: Path = OUTPUT_PATH, fingerprint: Optional[str] = None) -> SymbolIndex:
+    """Search a table written by write_symbol_table() without rebuilding its postings.
+
+    With a fingerprint, raises ValueError unless the table was built from
+    sources with that fingerprint.
+    """
+    table = json.loads(path.read_text())
+    header = table.get("header", {})
+    if header.get("format") != SYMBOLS_FORMAT or header.get("version") != SYMBOLS_VERSION:
+        raise ValueError(f"{path} is not a version {SYMBOLS_VERSION} symbol table")
+    if fingerprint is not None and header.get("fingerprint") != fingerprint:
+        raise ValueError(f"{path} was built from other or older Makepad sources")
+    return SymbolIndex(table["symbols"], table["trigrams"])
+
+WORDS = (
+    "view scroll portal list draw bg text icon button label image flow layout walk align padding margin spacing "
+    "color radius border shadow hover pressed focus selected cursor animator state window dock tab splitter "
+    "slider check box radio dropdown popup menu modal tooltip overlay nav stack page header footer body item "
+    "row column grid cell frame cache optimize texture shader font size width height fill fit abs min max "
+    "x y z wrap clip visible enabled active down right left top bottom start end center scale offset"
+).split()
+
+def generate_symbols(count: int, rng: random.Random) -> list:
+    """count distinct widget-, property- and variant-like names built from Makepad words."""
+    symbols = {}
+    while len(symbols) < count:
+        words = rng.choices(WORDS, k=rng.randint(1, 4))
+        kind = rng.choice(KINDS)
+        if kind == "property":
+            name = '_'.join(words)
+        else:
+            name = ''.join(word.capitalize() for word in words)
+        symbols.setdefault((name, kind), [name, kind, ""])
+    return list(symbols.values())
+
+def mangle(name: str, rng: random.Random) -> tuple:
+    """A half-remembered form of name: (style, query)."""
+    key = symbol_key(name)
+    style = rng.choice(("prefix", "dropped", "words", "typo"))
+    if style == "prefix":
+        return style, name[:rng.randint(min(3, len(name)), len(name))]
+    if style == "dropped" and len(key) > 4:
+        keep = sorted(rng.sample(range(1, len(key)), len(key) - 1 - len(key) // 4))
+        return style, key[0] + ''.join(key[i] for i in keep)
+    if style == "words":
+        starts = word_starts(name) + (len(key),)
+        return style, ''.join(key[s:s + rng.randint(1, 3)][:e - s] for s, e in zip(starts, starts[1:]))
+    if len(key) > 3:
+        i = rng.randrange(1, len(key) - 1)
+        return "typo", key[:i] + key[i + 1] + key[i] + key[i + 2:]
+    return "prefix", name
+
+def benchmark(symbols: int, queries: int = 2000, limit: int = 10, seed: int = 0,
+              min_recall: float = MIN_RECALL) -> bool:
+    """Time indexed top-k search on synthetic symbols and check it against scoring every symbol.
+
+    Returns False if the recall of any query style is below min_recall.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    index = SymbolIndex(generate_symbols(symbols, rng))
+    built = time.perf_counter() - started
+    table = json.dumps(index.to_table(), separators=(",", ":"))
+    started = time.perf_counter()
+    loaded = json.loads(table)
+    index = SymbolIndex(loaded["symbols"], loaded["trigrams"])
+    load_seconds = time.perf_counter() - started
+    print(f"{symbols} symbols, {len(index.postings)} trigrams: built in {built * 1000:.0f} ms, "
+          f"table {len(table) / 1e6:.1f} MB loads in {load_seconds * 1000:.0f} ms")
+
+    cases = [(name, *mangle(name, rng)) for name, _, _ in rng.choices(index.symbols, k=queries)]
+    times = {}
+    found = {}
+    for name, style, query in cases:
+        started = time.perf_counter()
+        results = index.search(query, limit)
+        times.setdefault(style, []).append(time.perf_counter() - started)
+        # A short prefix can't single out one name: a full page of matches scoring at least as well also counts
+        key = symbol_key(name)
+        score = subsequence_score(symbol_key(query), key, marked_key(key, word_starts(name)))
+        found.setdefault(style, []).append(any(symbol[0] == name for _, symbol in results) or (
+            score is not None and len(results) == limit and results[-1][0] >= score))
+
+    print(f"  {'query':<9} {'p50 us':>8} {'p99 us':>8} {'recall@' + str(limit):>10}")
+    times["all"] = [t for values in times.values() for t in values]
+    found["all"] = [hit for hits in found.values() for hit in hits]
+    failed = []
+    for style, values in sorted(times.items(), key=lambda item: (item[0] == "all", item[0])):
+        values.sort()
+        recall = sum(found[style]) / len(found[style])
+        print(f"  {style:<9} {values[len(values) // 2] * 1e6:8.1f} {values[int(len(values) * 0.99)] * 1e6:8.1f} "
+              f"{recall:10.1%}")
+        if recall < min_recall:
+            failed.append(f"{style} {recall:.1%}")
+
+    # Scoring every symbol is what the trigram index avoids; a sample shows what it would cost and miss
+    sample = cases[:max(1, queries // 40)]
+    agree = 0
+    started = time.perf_counter()
+    for _, _, query in sample:
+        key = symbol_key(query)
+        scores = [(subsequence_score(key, k, m), -i) for i, (k, m) in enumerate(zip(index.keys, index.marked))]
+        best = max((entry for entry in scores if entry[0] is not None), default=None)
+        top = index.search(query, 1)
+        agree += best is None or (bool(top) and top[0][0] == best[0])
+    scan_seconds = (time.perf_counter() - started) / len(sample)
+    print(f"  scoring every symbol: {scan_seconds * 1e6:.0f} us/query; "
+          f"indexed top-1 score equals the full scan's for {agree}/{len(sample)} queries")
+    if failed:
+        print(f"Recall@{limit} below {min_recall:.0%}: {', '.join(failed)}")
+    return not failed
+
+def print_results(query: str, results: list):
+    print(f"{query}:")
+    if not results:
+        print("  no matches")
+    for score, (name, kind, detail) in results:
+        print(f"  {score:5d}  {name:<32} {kind:<8} {detail}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fuzzy-search widget, property and enum names, or write the search table.",
+        epilog="Without queries, indexes the Makepad source and writes the table searched by queries; "
+               "queries rebuild it first when it is missing or the source has changed.")
+    add_index_arguments(parser)
+    parser.add_argument("queries", nargs="*", metavar="QUERY", help="half-remembered names to look up")
+    parser.add_argument("--kind", choices=KINDS, help="only return symbols of this kind")
+    parser.add_argument("--limit", "-n", type=int, default=10, help="results per query (default: 10)")
+    parser.add_argument("--table", type=Path, default=OUTPUT_PATH, help=f"search table (default: {OUTPUT_PATH})")
+    parser.add_argument("--benchmark", type=int, metavar="SYMBOLS",
+                        help="benchmark search on this many synthetic symbols instead")
+    parser.add_argument("--min-recall", type=float, default=MIN_RECALL, metavar="FRACTION",
+                        help=f"exit non-zero when a --benchmark query style's recall is below this "
+                             f"(default: {MIN_RECALL})")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        if not benchmark(args.benchmark, limit=args.limit, min_recall=args.min_recall):
+            raise SystemExit(1)
+        return
+
+    index = None
+    if args.queries:
+        try:
+            index = load_symbol_table(args.table, fingerprint_from_args(args))
+        except FileNotFoundError:
+            print(f"No symbol table at {args.table} yet; building it")
+        except ValueError as e:
+            print(f"{e}; rebuilding it")
+    if index is None:
+        table = build_symbol_table(index_from_args(args))
+        write_symbol_table(table, args.table)
+        kinds = Counter(kind for _, kind, _ in table["symbols"])
+        print(f"{len(table['symbols'])} symbols ({', '.join(f'{kind} {kinds[kind]}' for kind in KINDS)}), "
+              f"{len(table['trigrams'])} trigrams")
+        index = SymbolIndex(table["symbols"], table["trigrams"])
+
+    for query in args.queries:
+        print_results(query, index.search(query, args.limit, args.kind))
+
+if __name__ == "__main__":
+    main()
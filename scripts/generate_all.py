@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Regenerate every output from a single scan of the Makepad source:
+snippets/makepad.json, docs/WIDGETS.md, src/locations.json, the completion
+tables src/completions.json and the prebuilt extension index
+src/makepad_index.json.
+
+With --watch, keeps running and regenerates the outputs whenever a scanned
+source file changes, re-parsing only the files that were touched.
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from makepad_index import MakepadIndex, add_index_arguments, index_from_args, list_sources, refresh_index
+from extract_widgets import build_snippets, generate_documentation, report_resolution, write_snippets
+from generate_locations import build_locations, write_locations
+from compact_index import build_compact_index, write_compact_index
+from completion_tables import build_completion_tables, write_completion_tables
+from fuzzy_search import build_symbol_table, write_symbol_table
+from metrics import Metrics, add_profile_arguments, metrics_from_args
+from symbol_store import open_store, version_name, write_version
+import outputs
+
+METRICS_PATH = Path(__file__).parent.parent / "src" / "generate_all.metrics.json"
+
+def write_outputs(index: MakepadIndex, metrics: Optional[Metrics] = None, shard_docs: bool = False,
+                  store: Optional[sqlite3.Connection] = None):
+    """Render and write every output from the index, skipping unchanged files.
+
+    With a symbol store open, the index's version is also written to it.
+    """
+    metrics = metrics or Metrics("generate_all")
+    writes_from = len(outputs.writes)
+    widgets = index.widgets
+    print(f"Found {len(widgets)} widgets")
+    with metrics.phase("resolve inheritance"):
+        resolved = index.resolved_widgets
+    report_resolution(index)
+
+    with metrics.phase("render snippets"):
+        snippets = build_snippets(widgets, resolved)
+    with metrics.phase("write snippets"):
+        write_snippets(snippets)
+    with metrics.phase("completion tables"):
+        write_completion_tables(build_completion_tables(index))
+    with metrics.phase("symbol table"):
+        write_symbol_table(build_symbol_table(index))
+    with metrics.phase("docs"):
+        generate_documentation(widgets, shard=shard_docs, resolved=resolved)
+    with metrics.phase("find locations"):
+        locations = build_locations(index)
+    with metrics.phase("write locations"):
+        write_locations(locations)
+    with metrics.phase("compact index"):
+        write_compact_index(build_compact_index(index))
+    if store is not None:
+        with metrics.phase("symbol store"):
+            result = write_version(store, version_name(index.source_root), index)
+        print(f"Symbol store: {result['written']} files written, {result['removed']} removed")
+    print(outputs.write_summary(writes_from))
+
+def source_state(sources: list) -> dict:
+    """Map each source path to its (size, mtime_ns) for change detection."""
+    return {source.path: (source.size, source.mtime_ns) for source in sources}
+
+def watch(index: MakepadIndex, interval: float, debounce: float, shard_docs: bool = False,
+          store: Optional[sqlite3.Connection] = None):
+    """Poll the index's crates under its source root and regenerate outputs after changes settle."""
+    state = {f.path: (f.size, f.mtime_ns) for f in index.files}
+    print(f"\nWatching {len(state)} files (poll every {interval}s, debounce {debounce}s). Ctrl+C to stop.")
+
+    while True:
+        time.sleep(interval)
+        sources = list_sources(index.crates, index.source_root)
+        if source_state(sources) == state:
+            continue
+        detected = time.time()
+
+        # Wait for a burst of saves to finish before re-indexing
+        while True:
+            time.sleep(debounce)
+            settled = list_sources(index.crates, index.source_root)
+            if source_state(settled) == source_state(sources):
+                break
+            sources = settled
+
+        started = time.perf_counter()
+        changed, removed = refresh_index(index, sources)
+        parsed = time.perf_counter()
+        write_outputs(index, shard_docs=shard_docs, store=store)
+        finished = time.perf_counter()
+        state = source_state(sources)
+
+        # Latency is measured from the newest modification we picked up
+        newest = max((mtime for path, (_, mtime) in state.items() if path in changed), default=None)
+        changed_at = newest / 1e9 if newest is not None else detected
+        names = [os.path.basename(path) for path in changed + removed]
+        print(f"Re-indexed {len(changed)} changed, {len(removed)} removed ({', '.join(names[:5])}"
+              f"{', ...' if len(names) > 5 else ''}): parse {parsed - started:.3f}s, "
+              f"render {finished - parsed:.3f}s, outputs updated {time.time() - changed_at:.3f}s after the change")
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate snippets, docs, locations and the extension index from Makepad source.")
+    add_index_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument("--shard-docs", action="store_true",
+                        help="write one docs/widgets/<Name>.md page per widget with WIDGETS.md as an index")
+    parser.add_argument("--watch", action="store_true", help="keep running and regenerate when source files change")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between polls in --watch mode")
+    parser.add_argument("--debounce", type=float, default=0.3,
+                        help="seconds the tree must stay unchanged before re-indexing in --watch mode")
+    parser.add_argument("--sqlite", type=Path, metavar="PATH",
+                        help="also write the index to this SQLite symbol store (see symbol_store.py)")
+    args = parser.parse_args()
+
+    metrics = metrics_from_args(args, "generate_all")
+
+    try:
+        store = open_store(args.sqlite) if args.sqlite else None
+    except (ValueError, sqlite3.Error) as e:
+        parser.error(str(e))
+
+    print("Indexing Makepad source...")
+    index = index_from_args(args, metrics)
+    write_outputs(index, metrics, shard_docs=args.shard_docs, store=store)
+    metrics.finish(METRICS_PATH, args.profile_top)
+
+    if args.watch:
+        try:
+            watch(index, args.interval, args.debounce, shard_docs=args.shard_docs, store=store)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+
+if __name__ == "__main__":
+    main()
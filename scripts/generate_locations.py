@@ -1,104 +1,179 @@
 #!/usr/bin/env python3
 """
 Generate widget and property locations for Go-to-Definition support.
+
+Properties are an inverted index from field name to every struct that
+declares a field of that name, across all scanned crates, so the extension
+can jump to the declaration the enclosing widget actually inherits instead of
+whichever struct happened to be seen first. Enum values get the same
+treatment: each variant name maps to every Live enum declaring it, so
+`flow: Down` resolves to Flow's Down rather than a file picked by hand.
+
+Declarations are collected as plain tuples and each name's entries are only
+turned into dicts while locations.json is streamed out. The header names the
+source and files the locations were built from, so the extension can ignore
+a file left over from another checkout or an older scan.
 """
 
-import os
-import re
-import json
+import argparse
 from pathlib import Path
+from typing import Optional
+
+from makepad_index import MakepadIndex, add_index_arguments, base_type_name, build_index, enum_of, index_from_args
+from metrics import add_profile_arguments, metrics_from_args
+from outputs import atomic_write, stream_json, write_summary
+
+OUTPUT_PATH = Path(__file__).parent.parent / "src" / "locations.json"
+METRICS_PATH = OUTPUT_PATH.with_suffix(".metrics.json")
 
-# Default path - override with MAKEPAD_PATH environment variable
-MAKEPAD_WIDGETS_PATH = Path(os.environ.get("MAKEPAD_PATH", "")).joinpath("widgets/src") if os.environ.get("MAKEPAD_PATH") else Path.home() / "makepad" / "widgets" / "src"
+LOCATIONS_FORMAT = "makepad-locations"
+LOCATIONS_VERSION = 1
 
-def find_widget_locations():
+def find_widget_locations(index: Optional[MakepadIndex] = None, jobs: int = 1):
     """Find all widget struct definitions and their locations."""
-    locations = {}
+    index = index or build_index(jobs=jobs)
+    widgets = index.widgets
     
-    for rs_file in MAKEPAD_WIDGETS_PATH.glob("*.rs"):
-        content = rs_file.read_text()
-        lines = content.split('\n')
-        
-        for i, line in enumerate(lines):
-            # Match: pub struct WidgetName {
-            match = re.match(r'^pub struct (\w+)\s*\{', line)
-            if match:
-                name = match.group(1)
-                # Skip internal types
-                if name.endswith('Ref') or name.endswith('Set') or name.startswith('Draw'):
-                    continue
-                if name in ['WidgetAction', 'WidgetActionData', 'WidgetUid', 'WidgetRegistry']:
-                    continue
-                    
-                locations[name] = {
-                    'file': str(rs_file),
-                    'line': i + 1  # 1-indexed
-                }
+    # Later definitions win, same as the widget list
+    locations = {}
+    for file_index, struct in index.iter_structs():
+        if widgets.get(struct.name) is struct:
+            locations[struct.name] = {
+                'file': file_index.path,
+                'line': struct.line,
+                'column': struct.column
+            }
     
     return locations
 
-def find_property_locations():
-    """Find common property definitions."""
-    # Properties are typically defined in draw.rs or walk types
-    # For simplicity, we'll point to the View struct which has most properties
-    view_file = MAKEPAD_WIDGETS_PATH / "view.rs"
-    
-    properties = {}
-    content = view_file.read_text()
-    lines = content.split('\n')
-    
-    # Find #[live] properties
-    for i, line in enumerate(lines):
-        match = re.search(r'#\[live.*?\]\s*(?:pub\s+)?(\w+):', line)
-        if match:
-            prop_name = match.group(1)
-            properties[prop_name] = {
-                'file': str(view_file),
-                'line': i + 1
-            }
+def find_property_locations(index: Optional[MakepadIndex] = None):
+    """Map every property and base field name to all of its declarations.
     
-    # Add Walk properties (width, height, margin, etc.) from draw crate
-    makepad_root = Path(os.environ.get("MAKEPAD_PATH", "")) if os.environ.get("MAKEPAD_PATH") else Path.home() / "makepad"
-    walk_file = makepad_root / "draw" / "src" / "cx_2d.rs"
-    if walk_file.exists():
-        content = walk_file.read_text()
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if 'pub struct Walk' in line:
-                # Point width/height to Walk definition
-                properties['width'] = {'file': str(walk_file), 'line': i + 1}
-                properties['height'] = {'file': str(walk_file), 'line': i + 1}
-                break
-    
-    return properties
+    Each name lists {struct, file, line, column, type} entries, most relevant
+    first: declarations that more widgets inherit (Walk's width, View's
+    draw_bg) come before one-off fields, and widgets before support types.
+    """
+    return dict(iter_property_locations(property_declarations(index or build_index())))
 
-def main():
-    print("Finding widget locations...")
-    widgets = find_widget_locations()
+def property_declarations(index: MakepadIndex) -> dict:
+    """Map every property and base field name to its unsorted declaration tuples.
+    
+    Each tuple is (-reach, not a widget, struct, file, line, column, type),
+    so sorting on the first five fields gives the order of the entries.
+    """
+    widgets = index.widgets
+    
+    # How many widgets' effective property sets resolve to each declaration
+    reach = {}
+    for name in widgets:
+        for resolved in index.resolver.resolve(name):
+            reach[id(resolved.property)] = reach.get(id(resolved.property), 0) + 1
+    
+    occurrences = {}
+    for file_index, struct in index.iter_structs():
+        is_widget = widgets.get(struct.name) is struct
+        for decl, ty in [(p, p.prop_type) for p in struct.properties] + [(b, b.base_type) for b in struct.bases]:
+            occurrences.setdefault(decl.name, []).append((
+                -reach.get(id(decl), 0), not is_widget, struct.name, file_index.path, decl.line, decl.column, ty))
+    
+    return occurrences
+
+def iter_property_locations(declarations: dict):
+    """Yield (name, entries) in name order, building each name's entries as it is reached."""
+    for name in sorted(declarations):
+        yield name, [
+            {'struct': struct, 'file': file, 'line': line, 'column': column, 'type': ty}
+            for _, _, struct, file, line, column, ty in sorted(declarations[name], key=lambda e: e[:5])
+        ]
+
+def find_struct_bases(index: MakepadIndex) -> dict:
+    """Map each struct with #[deref]/#[walk]/#[layout] fields to its base types, in field order."""
+    return {
+        struct.name: [base_type_name(base.base_type) for base in struct.bases]
+        for _, struct in index.iter_structs() if struct.bases
+    }
+
+def find_variant_locations(index: MakepadIndex) -> dict:
+    """Map every Live enum variant name to its declarations.
+    
+    Each name lists {enum, file, line, column} entries, most relevant first:
+    enums that more widget properties take (Size before ImageFit) come first.
+    """
+    enums = index.enums
+    usage = {}
+    for resolved in index.resolved_widgets.values():
+        for entry in resolved:
+            enum = enum_of(entry.property.prop_type, enums)
+            if enum:
+                usage[enum.name] = usage.get(enum.name, 0) + 1
+    
+    declarations = {}
+    for file_index in index.files:
+        for enum in file_index.enums:
+            for variant in enum.variants:
+                declarations.setdefault(variant.name, []).append(
+                    (-usage.get(enum.name, 0), enum.name, file_index.path, variant.line, variant.column))
+    
+    return {
+        name: [{'enum': enum, 'file': file, 'line': line, 'column': column}
+               for _, enum, file, line, column in sorted(declarations[name])]
+        for name in sorted(declarations)
+    }
+
+def build_locations(index: MakepadIndex) -> dict:
+    """Collect widget and property locations from the index.
+    
+    properties is a generator that renders its entries while it is written,
+    so the result can be written once.
+    """
+    widgets = find_widget_locations(index)
     print(f"Found {len(widgets)} widgets")
     
-    print("Finding property locations...")
-    properties = find_property_locations()
-    print(f"Found {len(properties)} properties")
+    declarations = property_declarations(index)
+    print(f"Found {len(declarations)} property names "
+          f"({sum(len(entries) for entries in declarations.values())} declarations)")
+    
+    variants = find_variant_locations(index)
+    print(f"Found {len(variants)} enum values")
     
-    # Output as TypeScript
-    output = {
+    return {
+        'header': {'format': LOCATIONS_FORMAT, 'version': LOCATIONS_VERSION, **index.source_header()},
         'widgets': widgets,
-        'properties': properties
+        'properties': iter_property_locations(declarations),
+        'bases': find_struct_bases(index),
+        'variants': variants
     }
+
+def write_locations(output: dict):
+    """Stream src/locations.json."""
+    with atomic_write(OUTPUT_PATH) as f:
+        stream_json(f, output)
     
-    output_path = Path(__file__).parent.parent / "src" / "locations.json"
-    with open(output_path, 'w') as f:
-        json.dump(output, f, indent=2)
+    print(f"{'Written to' if f.rewritten else 'Unchanged:'} {OUTPUT_PATH}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Go-to-Definition locations from Makepad source.")
+    add_index_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    metrics = metrics_from_args(args, "generate_locations")
     
-    print(f"Written to {output_path}")
+    print("Finding widget and property locations...")
+    index = index_from_args(args, metrics)
+    with metrics.phase("find locations"):
+        output = build_locations(index)
+    with metrics.phase("write locations"):
+        write_locations(output)
     
     # Also output stats
+    widgets = output['widgets']
     print("\nSample widgets:")
     for name in list(widgets.keys())[:10]:
         loc = widgets[name]
-        print(f"  {name}: {loc['file']}:{loc['line']}")
+        print(f"  {name}: {loc['file']}:{loc['line']}:{loc['column']}")
+    
+    print(write_summary())
+    metrics.finish(METRICS_PATH, args.profile_top)
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Resident index server for editor queries, speaking JSON-RPC 2.0 over stdio.
+
+Builds the index once, keeps it in memory with lookup tables derived from it,
+and answers definition, hover, completion and "which live_design! block am I
+in" queries without touching the disk. `refresh` re-reads only the files whose
+size or mtime changed. Messages are newline-delimited JSON, one per line on
+stdin and stdout; requests without an id are notifications and get no reply.
+Log output goes to stderr.
+
+Methods (params -> result):
+  initialize                                  -> index status
+  refresh                                     -> {changed, removed} file counts
+  definition {name, widget?, property?}       -> {kind, file, line, column} or null
+  hover      {name, widget?, property?}       -> {kind, name, ...} or null
+  complete   {kind, prefix?, widget?, property?, limit?} -> {items: [{label, kind, detail}], incomplete}
+  search     {query, kind?, limit?}           -> {items: [{label, kind, detail, score}]}, fuzzy, best first
+  open/change {uri, text}, close {uri}        -> track an editor document
+  context    {uri or text, offset or line+character} -> enclosing live_design! block
+  stats                                       -> per-method request counts and handling time
+  shutdown, exit
+
+widget is the enclosing widget (from `context`), property the property whose
+value is being looked up. Completion items leave docs to `hover`, and at
+most limit (default MAX_COMPLETIONS) are returned; incomplete says whether
+more matched. File lines and columns are 1-based like
+locations.json; document offsets, lines and characters are 0-based like the
+editor's.
+
+Use --record to append every request to a trace file that
+server_benchmark.py can replay.
+"""
+
+import re
+import sys
+import json
+import time
+import inspect
+import argparse
+from bisect import bisect_left
+from contextlib import redirect_stdout
+from typing import Optional
+
+from completion_tables import build_completion_tables, prefix_range, property_values, sort_key
+from fuzzy_search import KINDS, SymbolIndex, collect_symbols
+from generate_locations import find_property_locations, find_struct_bases, find_variant_locations, find_widget_locations
+from makepad_index import MakepadIndex, add_index_arguments, enum_of, index_from_args, refresh_index
+from rust_lexer import PUNCT, tokenize
+from workspace_index import CLOSING_DELIMITERS, MACRO_DELIMITERS, block_widget, live_design_at
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Completion items returned when the request sets no limit
+MAX_COMPLETIONS = 200
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+class PrefixTable:
+    """Prebuilt result items sorted by lower-cased label, looked up by prefix with two bisects."""
+
+    def __init__(self, items: list):
+        self.items = sorted(items, key=lambda item: sort_key(item['label']))
+        self.keys = [item['label'].lower() for item in self.items]
+
+    def lookup(self, prefix: str, limit: int = MAX_COMPLETIONS) -> dict:
+        found = prefix_range(self.keys, prefix)
+        return {'items': self.items[found.start:min(found.stop, found.start + limit)], 'incomplete': len(found) > limit}
+
+class QueryIndex:
+    """Lookup tables for editor queries, derived from a MakepadIndex."""
+
+    def __init__(self, index: MakepadIndex):
+        self.widget_locations = find_widget_locations(index)
+        self.property_locations = find_property_locations(index)
+        self.bases = find_struct_bases(index)
+        # First declaration of each property name per struct, for resolving through bases
+        self.declared = {
+            name: {entry['struct']: entry for entry in reversed(entries)}
+            for name, entries in self.property_locations.items()
+        }
+        self.enums = index.enums
+        self.variant_locations = find_variant_locations(index)
+
+        tables = build_completion_tables(index)
+        self.widget_docs = dict(tables['widgets'])
+        self.properties = {name: (ty, doc) for name, ty, doc in tables['properties']}
+        self.values = tables['values']
+        self.widget_properties = {
+            widget: [tables['properties'][i][0] for i in ids] for widget, ids in tables['widget_properties'].items()
+        }
+        self.widget_table = PrefixTable([
+            {'label': name, 'kind': 'widget', 'detail': 'Makepad Widget'} for name, _ in tables['widgets']
+        ])
+        self.property_items = {
+            name: {'label': name, 'kind': 'property', 'detail': ty} for name, ty, _ in tables['properties']
+        }
+        self.property_table = PrefixTable(list(self.property_items.values()))
+        self.symbols = SymbolIndex(collect_symbols(index))
+        self._widget_property_tables = {}
+        self._value_tables = {}
+
+    def property_location(self, name: str, widget: Optional[str]) -> Optional[dict]:
+        """The declaration of a property as seen from a widget.
+
+        Its own field, else the first base (depth-first, in field order) that
+        declares it, else the most relevant declaration overall; the same
+        resolution as the extension's propertyLocation().
+        """
+        entries = self.property_locations.get(name)
+        if not entries:
+            return None
+        declared = self.declared[name]
+        seen = set()
+
+        def find(struct: str) -> Optional[dict]:
+            if struct in seen:
+                return None
+            seen.add(struct)
+            if struct in declared:
+                return declared[struct]
+            for base in self.bases.get(struct, ()):
+                inherited = find(base)
+                if inherited:
+                    return inherited
+            return None
+
+        return (widget and find(widget)) or entries[0]
+
+    def property_type(self, name: str, widget: Optional[str]) -> Optional[str]:
+        location = self.property_location(name, widget)
+        return location['type'] if location else None
+
+    def variant_location(self, name: str, prop: Optional[str], widget: Optional[str]) -> Optional[dict]:
+        """Where a value is declared, preferring the enum of the property it's assigned to."""
+        entries = self.variant_locations.get(name)
+        if not entries:
+            return None
+        ty = prop and self.property_type(prop, widget)
+        enum = ty and enum_of(ty, self.enums)
+        return next((entry for entry in entries if enum and entry['enum'] == enum.name), entries[0])
+
+    def definition(self, name: str, widget: Optional[str] = None, property: Optional[str] = None) -> Optional[dict]:
+        location = self.widget_locations.get(name)
+        if location:
+            return {'kind': 'widget', **location}
+        location = self.property_location(name, widget)
+        if location:
+            return {'kind': 'property', 'struct': location['struct'], 'file': location['file'],
+                    'line': location['line'], 'column': location['column']}
+        location = self.variant_location(name, property, widget)
+        if location:
+            return {'kind': 'variant', **location}
+        return None
+
+    def hover(self, name: str, widget: Optional[str] = None, property: Optional[str] = None) -> Optional[dict]:
+        if name in self.widget_docs:
+            location = self.widget_locations.get(name, {})
+            return {'kind': 'widget', 'name': name, 'doc': self.widget_docs[name],
+                    'properties': self.widget_properties.get(name, []),
+                    'file': location.get('file'), 'line': location.get('line')}
+        location = self.property_location(name, widget)
+        if location:
+            _, doc = self.properties.get(name, (None, ''))
+            return {'kind': 'property', 'name': name, 'type': location['type'], 'doc': doc,
+                    'struct': location['struct'], 'values': property_values(location['type'], self.enums)}
+        location = self.variant_location(name, property, widget)
+        if location:
+            enum = self.enums[location['enum']]
+            variant = next(v for v in enum.variants if v.name == name)
+            return {'kind': 'variant', 'name': name, 'enum': enum.name, 'doc': variant.doc or enum.doc,
+                    'default': enum.default, 'values': [v.name for v in enum.variants]}
+        return None
+
+    def complete(self, kind: str, prefix: str = '', widget: Optional[str] = None,
+                 property: Optional[str] = None, limit: int = MAX_COMPLETIONS) -> dict:
+        if kind == 'widget':
+            return self.widget_table.lookup(prefix, limit)
+        if kind == 'property':
+            return self.widget_property_table(widget).lookup(prefix, limit)
+        if kind == 'value':
+            return self.value_table(property).lookup(prefix, limit)
+        raise RpcError(INVALID_PARAMS, f"unknown completion kind {kind!r}")
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 20) -> dict:
+        if kind is not None and kind not in KINDS:
+            raise RpcError(INVALID_PARAMS, f"unknown symbol kind {kind!r}")
+        return {'items': [
+            {'label': name, 'kind': symbol_kind, 'detail': detail, 'score': score}
+            for score, (name, symbol_kind, detail) in self.symbols.search(query, limit, kind)
+        ]}
+
+    def widget_property_table(self, widget: Optional[str]) -> PrefixTable:
+        """Properties of one widget, or every property when the widget is unknown."""
+        names = self.widget_properties.get(widget)
+        if names is None:
+            return self.property_table
+        table = self._widget_property_tables.get(widget)
+        if table is None:
+            table = self._widget_property_tables[widget] = PrefixTable([self.property_items[n] for n in names])
+        return table
+
+    def value_table(self, prop: Optional[str]) -> PrefixTable:
+        table = self._value_tables.get(prop)
+        if table is None:
+            table = self._value_tables[prop] = PrefixTable([
+                {'label': value, 'kind': 'value', 'detail': prop} for value in self.values.get(prop, [])
+            ])
+        return table
+
+class Document:
+    """An editor document with its live_design! blocks, scanned once per change.
+
+    blocks holds one [start, end, widget, name, parent] per `{ ... }` inside
+    a live_design! macro, and one for the macro's own body whether it is
+    written `live_design! { }`, `!( )` or `![ ]`, in start order: start and
+    end are the offsets of the delimiters, widget the type in `<Widget> {` or
+    `Name = {{Widget}} {`, name the instance in `name = <Widget> {`, parent
+    the enclosing block's index.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+        self.blocks = []
+        self.starts = []
+        self.scan()
+
+    def scan(self):
+        tokens = tokenize(self.text)
+        stack = []  # one entry per open delimiter inside the macro: its block, or None for ( and [
+        parents = []  # the open blocks
+        in_macro = False
+        for k, (kind, text, start, _) in enumerate(tokens):
+            if not in_macro:
+                in_macro = live_design_at(tokens, k) is not None
+                continue
+            if kind != PUNCT:
+                continue
+            if text == '{' or (text in MACRO_DELIMITERS and not stack):
+                widget, name = block_widget(tokens, k)
+                self.blocks.append([start, len(self.text), widget, name, parents[-1] if parents else None])
+                self.starts.append(start)
+                stack.append(len(self.blocks) - 1)
+                parents.append(len(self.blocks) - 1)
+            elif text in MACRO_DELIMITERS:
+                stack.append(None)
+            elif text in CLOSING_DELIMITERS and stack:
+                block = stack.pop()
+                if block is not None:
+                    self.blocks[block][1] = start
+                    parents.pop()
+                # The macro ends with the delimiter that closes its body
+                in_macro = bool(stack)
+
+    def offset(self, line: int, character: int) -> int:
+        if line >= len(self.line_starts):
+            return len(self.text)
+        return min(self.line_starts[line] + character, len(self.text))
+
+    def context(self, offset: int) -> dict:
+        """The innermost live_design! block around offset and the widgets enclosing it."""
+        i = bisect_left(self.starts, offset) - 1
+        while i is not None and i >= 0 and self.blocks[i][1] < offset:
+            i = self.blocks[i][4]
+        if i is None or i < 0:
+            return {'live_design': False, 'widget': None, 'name': None, 'widgets': [], 'block': None}
+        start, end, widget, name, _ = self.blocks[i]
+        widgets = []
+        j = i
+        while j is not None:
+            if self.blocks[j][2]:
+                widgets.append(self.blocks[j][2])
+            j = self.blocks[j][4]
+        return {'live_design': True, 'widget': widget, 'name': name, 'widgets': widgets[::-1],
+                'block': [start, end]}
+
+class IndexServer:
+    """Dispatches JSON-RPC requests to the resident index."""
+
+    def __init__(self, index: MakepadIndex):
+        self.index = index
+        self.queries = QueryIndex(index)
+        self.documents = {}
+        self.stats = {}  # method -> [count, total seconds, max seconds]
+        self.exited = False
+        self.methods = self.dispatch_table()
+
+    def dispatch_table(self) -> dict:
+        """Method name -> (handler, signature the params are bound against)."""
+        handlers = {
+            'initialize': self.initialize,
+            'refresh': self.refresh,
+            'definition': self.queries.definition,
+            'hover': self.queries.hover,
+            'complete': self.queries.complete,
+            'search': self.queries.search,
+            'open': self.open,
+            'change': self.open,
+            'close': self.close,
+            'context': self.context,
+            'stats': self.request_stats,
+            'shutdown': self.shutdown,
+            'exit': self.exit,
+        }
+        return {name: (handler, inspect.signature(handler)) for name, handler in handlers.items()}
+
+    def initialize(self) -> dict:
+        return {
+            'root': str(self.index.root),
+            'files': len(self.index.files),
+            'widgets': len(self.queries.widget_locations),
+            'properties': len(self.queries.property_locations),
+            'enums': len(self.queries.enums),
+            'fingerprint': self.index.fingerprint,
+        }
+
+    def refresh(self) -> dict:
+        changed, removed = refresh_index(self.index)
+        if changed or removed:
+            self.queries = QueryIndex(self.index)
+            self.methods = self.dispatch_table()
+        return {'changed': len(changed), 'removed': len(removed)}
+
+    def open(self, uri: str, text: str):
+        self.documents[uri] = Document(text)
+
+    def close(self, uri: str):
+        self.documents.pop(uri, None)
+
+    def context(self, uri: Optional[str] = None, text: Optional[str] = None, offset: Optional[int] = None,
+                line: Optional[int] = None, character: Optional[int] = None) -> dict:
+        if text is not None:
+            document = Document(text)
+        elif uri in self.documents:
+            document = self.documents[uri]
+        else:
+            raise RpcError(INVALID_PARAMS, f"unknown document {uri!r}")
+        if offset is None:
+            if line is None:
+                raise RpcError(INVALID_PARAMS, "context needs an offset or a line and character")
+            offset = document.offset(line, character or 0)
+        return document.context(offset)
+
+    def request_stats(self) -> dict:
+        return {method: {'count': count, 'mean_seconds': total / count, 'max_seconds': longest}
+                for method, (count, total, longest) in self.stats.items()}
+
+    def shutdown(self):
+        pass
+
+    def exit(self):
+        self.exited = True
+
+    def handle(self, request) -> Optional[dict]:
+        """Answer one decoded request; returns None for notifications."""
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return error_response(None, INVALID_REQUEST, "not a JSON-RPC request")
+        request_id = request.get('id')
+        method = request['method']
+        params = request.get('params') or {}
+        try:
+            if method not in self.methods:
+                raise RpcError(METHOD_NOT_FOUND, f"unknown method {method!r}")
+            handler, signature = self.methods[method]
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            try:
+                signature.bind(**params)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e)) from e
+            result = handler(**params)
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except RpcError as e:
+            response = error_response(request_id, e.code, str(e))
+        except Exception as e:
+            response = error_response(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        return response if 'id' in request else None
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """Answer one message; the time taken, encoding included, is added to the method's stats."""
+        started = time.perf_counter()
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps(error_response(None, PARSE_ERROR, str(e)))
+        response = self.handle(request)
+        encoded = json.dumps(response) if response is not None else None
+        if isinstance(request, dict) and isinstance(request.get('method'), str):
+            elapsed = time.perf_counter() - started
+            entry = self.stats.setdefault(request['method'], [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+        return encoded
+
+def error_response(request_id, code: int, message: str) -> dict:
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+def serve(server: IndexServer, stdin, stdout, record=None):
+    """Answer requests from stdin until `exit` or end of input."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        if record is not None:
+            record.write(line if line.endswith('\n') else line + '\n')
+        response = server.handle_line(line)
+        if response is not None:
+            stdout.write(response + '\n')
+            stdout.flush()
+        if server.exited:
+            break
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve index queries as JSON-RPC over stdin/stdout.")
+    add_index_arguments(parser)
+    parser.add_argument("--record", type=argparse.FileType('a'), metavar="TRACE",
+                        help="append every request to this file, for server_benchmark.py --trace")
+    args = parser.parse_args()
+
+    # stdout carries the protocol; the indexer's progress output goes to stderr
+    with redirect_stdout(sys.stderr):
+        started = time.perf_counter()
+        server = IndexServer(index_from_args(args))
+        print(f"Index server ready in {time.perf_counter() - started:.2f}s")
+    try:
+        serve(server, sys.stdin, sys.stdout, args.record)
+    finally:
+        if args.record:
+            args.record.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,969 @@
+#!/usr/bin/env python3
+"""
+Indexing engine shared by the generator scripts.
+
+Reads every Makepad source file once and builds a single in-memory model of
+widgets, their properties, Live enums and source locations. Snippets, WIDGETS.md and
+locations.json are all rendered from this model, so they always agree.
+
+The model classes are slotted dataclasses, and the strings they repeat
+thousands of times (file names, field names, types such as f64 or Walk,
+default expressions) are interned, so a multi-crate or multi-version index
+holds one copy of each.
+
+Files are read by one of two backends: "str" decodes each file to text
+with universal newlines, "mmap" memory-maps it and scans the UTF-8 bytes
+directly, decoding only the names, types and docs it captures. Both produce
+the same model, and both key the extraction cache on the raw bytes.
+
+With --io-workers, reads go through the async pipeline in async_reader.py:
+many files are read at once on a thread pool and parsed as they arrive,
+which hides per-file latency on slow or networked mounts. There the mmap
+backend reads each file's bytes in full instead of mapping it, so the parser
+never waits on the mount.
+"""
+
+import os
+import re
+import json
+import mmap
+import time
+import hashlib
+import asyncio
+import argparse
+from sys import intern
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+from async_reader import (QUEUE_LIMIT, ReadReport, env_number, read_pipeline, set_read_latency, simulate_latency,
+                          summarize)
+from discovery import REGISTRY_CRATE_RE, find_makepad_root
+from metrics import Metrics
+from outputs import atomic_write
+from rust_lexer import LineIndex, RustItem, RustStruct, RustVariant, lex_file
+
+# Crates scanned under the Makepad root (override with MAKEPAD_CRATES=a,b,c or
+# --crate). Only widget crates contribute widgets; the others contribute the
+# types widgets are built from (Walk, Layout, draw shaders, ...).
+DEFAULT_CRATES = os.environ.get("MAKEPAD_CRATES", "widgets,draw,platform,code_editor").split(",")
+WIDGET_CRATES = {"widgets"}
+
+# Directories never descended into while walking a crate
+PRUNED_DIRS = {"target", "examples", "example", "tests", "benches", "node_modules"}
+
+# Parse results are cached per file between runs. Bump CACHE_VERSION whenever
+# the parsing logic changes so stale entries are discarded.
+CACHE_PATH = Path(__file__).parent / ".cache" / "makepad_index.json"
+CACHE_VERSION = 5
+
+# Below this many files to parse, process pool startup costs more than it saves
+PARALLEL_MIN_FILES = 16
+
+# How source files are read (override with MAKEPAD_SCAN_BACKEND or --backend)
+BACKENDS = ("str", "mmap")
+DEFAULT_BACKEND = os.environ.get("MAKEPAD_SCAN_BACKEND", "str")
+
+# Reads in flight through the async pipeline; 0 reads one file at a time
+DEFAULT_IO_WORKERS = env_number("MAKEPAD_IO_WORKERS", 0)
+
+# A carriage return that isn't part of \r\n; decode_source() turns it into a line break
+LONE_CR_RE = re.compile(rb'\r(?!\n)')
+
+# Types that derive Live/Widget but aren't usable in live_design!
+INTERNAL_TYPES = ['WidgetAction', 'WidgetActionData', 'WidgetUid', 'WidgetRegistry']
+
+# Field attributes whose type's properties are set directly on the struct:
+# `#[deref] view: View` inherits everything View accepts, `#[walk]`/`#[layout]`
+# flatten Walk (width, height, margin...) and Layout (flow, padding, spacing...).
+BASE_ATTRS = ('deref', 'walk', 'layout')
+
+# Last path segment of a type, without generic arguments: crate::view::View<T> -> View
+TYPE_NAME_RE = re.compile(r'(?:\w+\s*::\s*)*(\w+)')
+
+# Wrappers looked through when matching a property type to a Live enum
+TYPE_WRAPPERS = ('Option<', 'Box<')
+
+# (source, root) found by discover_makepad(); discovery runs on first use, not at import
+_discovered = None
+
+def discover_makepad(use_cache: bool = True) -> tuple:
+    """Return (source, root) of the Makepad source to index, discovering it once.
+
+    MAKEPAD_PATH if set, else found the way the extension finds it (see
+    discovery.py). root falls back to ~/makepad, with source None, when
+    nothing is found.
+    """
+    global _discovered
+    if _discovered is None:
+        source, root = find_makepad_root(use_cache=use_cache)
+        _discovered = (source, root or Path.home() / "makepad")
+    return _discovered
+
+def makepad_root() -> Path:
+    """Root of the discovered Makepad source (see discover_makepad())."""
+    return discover_makepad()[1]
+
+@dataclass(slots=True)
+class WidgetProperty:
+    name: str
+    prop_type: str
+    default: Optional[str] = None
+    doc: str = ""
+    line: int = 0
+    column: int = 0
+
+@dataclass(slots=True)
+class WidgetBase:
+    """A #[deref], #[walk] or #[layout] field, whose type's properties the struct accepts."""
+    kind: str
+    name: str
+    base_type: str
+    line: int = 0
+    column: int = 0
+
+@dataclass(slots=True)
+class Widget:
+    name: str
+    file: str
+    properties: list = field(default_factory=list)
+    doc: str = ""
+    is_usable: bool = True  # Some are internal/Draw* types
+    line: int = 0
+    column: int = 0
+    bases: list = field(default_factory=list)  # WidgetBase records, in field order
+
+@dataclass(slots=True)
+class ResolvedProperty:
+    """One entry of a struct's effective property set."""
+    property: WidgetProperty
+    origin: str      # struct that declares the field
+    via: tuple = ()  # base fields followed to reach it, e.g. ("view", "walk")
+
+@dataclass(slots=True)
+class EnumVariant:
+    name: str
+    line: int = 0
+    column: int = 0
+    doc: str = ""
+    pick: bool = False        # #[pick]: the variant Live uses when none is set
+    is_default: bool = False  # #[default], for derive(Default)
+    value: Optional[str] = None  # payload default from #[live(...)] or #[pick(...)]
+
+@dataclass(slots=True)
+class LiveEnum:
+    name: str
+    file: str
+    variants: list = field(default_factory=list)
+    doc: str = ""
+    line: int = 0
+    column: int = 0
+
+    @property
+    def default(self) -> Optional[str]:
+        """The #[pick] variant, else the #[default] one."""
+        for marker in ('pick', 'is_default'):
+            for variant in self.variants:
+                if getattr(variant, marker):
+                    return variant.name
+        return None
+
+@dataclass(slots=True)
+class SourceFile:
+    path: str
+    rel: str    # path relative to the crate's src directory
+    crate: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def widget_source(self) -> bool:
+        return self.crate in WIDGET_CRATES
+
+@dataclass(slots=True)
+class FileIndex:
+    """Everything extracted from one source file."""
+    path: str
+    crate: str
+    widget_source: bool  # False for crates that only contribute types
+    structs: list = field(default_factory=list)  # Widget records, in source order
+    enums: list = field(default_factory=list)    # LiveEnum records, in source order
+    size: int = 0
+    mtime_ns: int = 0
+
+class MakepadIndex:
+    """The merged model built from all indexed files."""
+
+    def __init__(self, files: list, stats: Optional[dict] = None, source_root: Optional[Path] = None,
+                 crates: Optional[list] = None, backend: str = DEFAULT_BACKEND):
+        self.files = files
+        self.stats = stats or {}
+        # The checkout or registry crate the files were listed from, and the
+        # directory their paths are made relative to (see index_root())
+        self.source_root = Path(source_root or makepad_root())
+        self.root = index_root(self.source_root)
+        self.crates = crates
+        self.backend = backend
+        self._resolver = None
+        self._resolver_files = None
+
+    def iter_structs(self):
+        """Yield (FileIndex, Widget) for every indexed struct, in file order."""
+        for file_index in self.files:
+            for struct in file_index.structs:
+                yield file_index, struct
+
+    @property
+    def widgets(self) -> dict:
+        """Usable widgets by name; later definitions win."""
+        widgets = {}
+        for file_index, struct in self.iter_structs():
+            if file_index.widget_source and not is_internal_type(struct.name):
+                widgets[struct.name] = struct
+        return widgets
+
+    @property
+    def types(self) -> dict:
+        """Every indexed struct by name, including internal and support types."""
+        return {struct.name: struct for _, struct in self.iter_structs()}
+
+    @property
+    def enums(self) -> dict:
+        """Every indexed Live enum by name; later definitions win."""
+        return {enum.name: enum for file_index in self.files for enum in file_index.enums}
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the path, size and mtime of every indexed file.
+
+        Cheap to recompute from a stat of each file, so consumers can tell
+        whether a prebuilt index still matches the source on disk.
+        """
+        return files_fingerprint(self.files, self.root)
+
+    @property
+    def relative_paths(self) -> list:
+        """Indexed file paths relative to the index root, with forward slashes."""
+        return [os.path.relpath(f.path, self.root).replace(os.sep, '/') for f in self.files]
+
+    def source_header(self) -> dict:
+        """Header fields naming the source a generated file was built from.
+
+        The extension re-stats the listed files and only uses the file when
+        widgets_src is the source it found and the fingerprint still matches.
+        """
+        return {
+            "root": str(self.root),
+            "widgets_src": str(widgets_src_dir(self.source_root)),
+            "files": self.relative_paths,
+            "fingerprint": self.fingerprint,
+        }
+
+    @property
+    def resolver(self) -> "PropertyResolver":
+        """Memoized resolver over the current files; rebuilt after refresh_index()."""
+        if self._resolver_files is not self.files:
+            self._resolver = PropertyResolver(self.types)
+            self._resolver_files = self.files
+        return self._resolver
+
+    @property
+    def resolved_widgets(self) -> dict:
+        """Effective property set (ResolvedProperty list) of every usable widget."""
+        return {name: self.resolver.resolve(name) for name in self.widgets}
+
+    def locate(self, name: str):
+        """Return the FileIndex and struct record of the type called name."""
+        found = (None, None)
+        for file_index, struct in self.iter_structs():
+            if struct.name == name:
+                found = (file_index, struct)
+        return found
+
+def is_internal_type(name: str) -> bool:
+    """True for generated helper types (refs, sets, draw shaders) and registries."""
+    if name.startswith('Draw') or name.endswith('Ref') or name.endswith('Set'):
+        return True
+    return name in INTERNAL_TYPES
+
+def base_type_name(ty: str) -> str:
+    match = TYPE_NAME_RE.match(ty.strip())
+    return match.group(1) if match else ty
+
+def value_type(prop_type: str) -> str:
+    """The type whose values a property takes, looking through Option<>/Box<>."""
+    prop_type = prop_type.strip()
+    for wrapper in TYPE_WRAPPERS:
+        if prop_type.startswith(wrapper) and prop_type.endswith('>'):
+            return value_type(prop_type[len(wrapper):-1])
+    return prop_type
+
+def enum_of(prop_type: str, enums: dict) -> Optional[LiveEnum]:
+    """The Live enum a property of this type is set to (Size, Flow, ImageFit...), if any."""
+    return enums.get(base_type_name(value_type(prop_type)))
+
+class PropertyResolver:
+    """Computes effective property sets by following #[deref], #[walk] and #[layout] fields.
+
+    Every struct is resolved once and memoized, so a base shared by many
+    widgets (View, Walk, Layout) is expanded a single time. A struct's own
+    properties shadow inherited ones of the same name, and earlier base fields
+    win over later ones. A base that leads back to a struct still being
+    resolved closes a cycle: that edge is skipped and recorded in cycles.
+    """
+
+    def __init__(self, types: dict):
+        self.types = types
+        self.resolved = {}        # struct name -> list of ResolvedProperty
+        self.cycles = []          # (A, B, ..., A) for every cycle broken
+        self.unresolved = set()   # base types that aren't indexed
+        self._stack = []
+
+    def resolve(self, name: str) -> list:
+        """Return the effective properties of the struct called name, own properties first."""
+        if name in self.resolved:
+            return self.resolved[name]
+        struct = self.types.get(name)
+        if struct is None:
+            self.unresolved.add(name)
+            return []
+
+        self._stack.append(name)
+        effective = {prop.name: ResolvedProperty(prop, name) for prop in struct.properties}
+        for base in struct.bases:
+            base_type = base_type_name(base.base_type)
+            if base_type in self._stack:
+                self.cycles.append(tuple(self._stack[self._stack.index(base_type):]) + (base_type,))
+                continue
+            for inherited in self.resolve(base_type):
+                effective.setdefault(inherited.property.name, ResolvedProperty(
+                    inherited.property, inherited.origin, (base.name,) + inherited.via))
+        self._stack.pop()
+
+        self.resolved[name] = list(effective.values())
+        return self.resolved[name]
+
+class ExtractionCache:
+    """On-disk cache of per-file parse results.
+
+    Files are tracked by path with their mtime/size and content hash; parse
+    results are stored once per content hash, so a file that was touched but
+    not modified is still a hit.
+    """
+
+    version = CACHE_VERSION
+
+    def __init__(self, path: Path = CACHE_PATH, enabled: bool = True, rebuild: bool = False):
+        self.path = path
+        self.enabled = enabled
+        self.files = {}    # path -> {"mtime_ns", "size", "hash"}
+        self.results = {}  # content hash -> list of serialized structs
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.bytes_read = 0
+        self._seen = set()
+        if enabled and not rebuild:
+            self.load()
+
+    def load(self):
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") != self.version:
+            return
+        self.files = data.get("files", {})
+        self.results = data.get("results", {})
+
+    def lookup(self, rs_file: Path, backend: str = "str"):
+        """Return cached structs for a file, or None on a miss.
+
+        On a miss the file content and its hash are returned so the caller
+        does not have to read the file twice. The mmap backend hashes the
+        mapped bytes and returns no content; the parse job maps the file again.
+        """
+        key = str(rs_file)
+        stat = rs_file.stat()
+        if self.unchanged(key, stat):
+            return self.hit(key), None, None
+
+        if backend == "mmap":
+            with open_source(rs_file, backend) as mapped:
+                content_hash = hash_content(mapped)
+            content = None
+        else:
+            content, content_hash = read_hashed(rs_file, backend)
+        cached = self.record(key, stat, content_hash)
+        if cached is not None:
+            return cached, None, None
+        return None, content, content_hash
+
+    def unchanged(self, key: str, stat: os.stat_result) -> bool:
+        """Whether a file's size and mtime match a cached result.
+
+        Read-only, so the async pipeline's reader threads can call it.
+        """
+        entry = self.files.get(key)
+        return bool(entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+                    and entry["hash"] in self.results)
+
+    def hit(self, key: str) -> list:
+        """Count an unchanged file as a hit and return its cached structs."""
+        self._seen.add(key)
+        self.hits += 1
+        return self.results[self.files[key]["hash"]]
+
+    def record(self, key: str, stat: os.stat_result, content_hash: str):
+        """Track a file that was read; return cached structs if its content is known, else None."""
+        self._seen.add(key)
+        self.bytes_read += stat.st_size
+        self.files[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": content_hash}
+        if content_hash in self.results:
+            self.hits += 1
+            return self.results[content_hash]
+        self.misses += 1
+        return None
+
+    def store(self, content_hash: str, parsed: tuple):
+        self.results[content_hash] = parsed_to_dict(parsed)
+
+    def save(self):
+        """Evict entries for files that were not seen and write the cache."""
+        if not self.enabled:
+            return
+        for key in list(self.files):
+            if key not in self._seen:
+                del self.files[key]
+                self.evicted += 1
+        live_hashes = {entry["hash"] for entry in self.files.values()}
+        self.results = {h: r for h, r in self.results.items() if h in live_hashes}
+
+        with atomic_write(self.path, track=False) as f:
+            json.dump({"version": self.version, "files": self.files, "results": self.results}, f)
+
+def parsed_to_dict(parsed: tuple) -> dict:
+    """Serialize parse_file() results for the cache (the file name is stored per path)."""
+    structs, enums = parsed
+    data = {"structs": [asdict(w) for w in structs], "enums": [asdict(e) for e in enums]}
+    for item in data["structs"] + data["enums"]:
+        del item["file"]
+    return data
+
+def parsed_from_dict(data: dict, file: str) -> tuple:
+    """Inverse of parsed_to_dict(), interning strings the way parse_file() does."""
+    file = intern(file)
+    structs = [
+        Widget(**{**w, "name": intern(w["name"]), "file": file,
+                  "properties": [WidgetProperty(**{**p, "name": intern(p["name"]), "prop_type": intern(p["prop_type"]),
+                                                   "default": intern_optional(p["default"])})
+                                 for p in w["properties"]],
+                  "bases": [WidgetBase(intern(b["kind"]), intern(b["name"]), intern(b["base_type"]), b["line"], b["column"])
+                            for b in w["bases"]]})
+        for w in data["structs"]
+    ]
+    enums = [
+        LiveEnum(**{**e, "name": intern(e["name"]), "file": file,
+                    "variants": [EnumVariant(**{**v, "name": intern(v["name"]), "value": intern_optional(v["value"])})
+                                 for v in e["variants"]]})
+        for e in data["enums"]
+    ]
+    return structs, enums
+
+def intern_optional(value: Optional[str]) -> Optional[str]:
+    return intern(value) if value is not None else None
+
+def intern_parsed(parsed: tuple):
+    """Intern the repeated strings of parse_file() results in place."""
+    structs, enums = parsed
+    for struct in structs:
+        struct.name = intern(struct.name)
+        struct.file = intern(struct.file)
+        for prop in struct.properties:
+            prop.name = intern(prop.name)
+            prop.prop_type = intern(prop.prop_type)
+            prop.default = intern_optional(prop.default)
+        for base in struct.bases:
+            base.kind, base.name, base.base_type = intern(base.kind), intern(base.name), intern(base.base_type)
+    for enum in enums:
+        enum.name = intern(enum.name)
+        enum.file = intern(enum.file)
+        for variant in enum.variants:
+            variant.name = intern(variant.name)
+            variant.value = intern_optional(variant.value)
+
+def crate_src_dirs(crates: Optional[list] = None, root: Optional[Path] = None) -> list:
+    """Return (crate name, src directory) for each configured crate that exists.
+
+    root is either a checkout of the Makepad repository (crates in
+    subdirectories) or one crate unpacked in the Cargo registry, such as
+    makepad-widgets-0.6.0, whose sibling crates of the same version are used.
+    """
+    root = Path(root or makepad_root())
+    registry = REGISTRY_CRATE_RE.match(root.name)
+    dirs = []
+    for crate in crates or DEFAULT_CRATES:
+        if registry:
+            src = root.parent / f"makepad-{crate.replace('_', '-')}-{registry.group(2)}" / "src"
+        else:
+            src = root / crate / "src"
+        if src.is_dir():
+            dirs.append((crate, src))
+    return dirs
+
+def walk_rust_files(root: Path) -> list:
+    """Recursively list (path, size, mtime_ns) of .rs files under root.
+
+    Uses os.scandir so directory entries don't need a separate stat, and
+    prunes build output, VCS metadata and example trees before descending.
+    """
+    found = []
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in PRUNED_DIRS and not name.startswith('.'):
+                        stack.append(entry.path)
+                elif name.endswith('.rs') and entry.is_file():
+                    stat = entry.stat()
+                    found.append((entry.path, stat.st_size, stat.st_mtime_ns))
+    return found
+
+def list_sources(crates: Optional[list] = None, root: Optional[Path] = None) -> list:
+    """Return every SourceFile to index, sorted by crate then path."""
+    sources = []
+    for crate, src in crate_src_dirs(crates, root):
+        for path, size, mtime_ns in sorted(walk_rust_files(src)):
+            rel = os.path.relpath(path, src).replace(os.sep, '/')
+            sources.append(SourceFile(path=path, rel=rel, crate=crate, size=size, mtime_ns=mtime_ns))
+    return sources
+
+def files_fingerprint(files: list, root: Path) -> str:
+    """MakepadIndex.fingerprint of files (SourceFile or FileIndex records) under the index root."""
+    digest = hashlib.sha1()
+    for f in files:
+        rel = os.path.relpath(f.path, root).replace(os.sep, '/')
+        digest.update(f"{rel}:{f.size}:{f.mtime_ns // 1_000_000}\n".encode())
+    return digest.hexdigest()
+
+def build_index(cache: Optional[ExtractionCache] = None, jobs: int = 1,
+                crates: Optional[list] = None, metrics: Optional[Metrics] = None,
+                root: Optional[Path] = None, save_cache: bool = True,
+                backend: str = DEFAULT_BACKEND, io_workers: int = DEFAULT_IO_WORKERS,
+                queue_limit: int = QUEUE_LIMIT) -> MakepadIndex:
+    """Read and parse every source file once and return the merged model.
+
+    Pass save_cache=False when indexing several roots through one cache, so
+    entries of the other roots aren't evicted between builds. io_workers > 0
+    reads through the async pipeline with that many reads in flight.
+    """
+    metrics = metrics or Metrics("build_index")
+    started = time.perf_counter()
+    with metrics.phase("walk"):
+        sources = list_sources(crates, root)
+    walked = time.perf_counter()
+    per_file = [None] * len(sources)
+    reads = None
+    if io_workers > 0:
+        with metrics.phase("read+parse"):
+            reads = pipeline_index(sources, per_file, cache, jobs, backend, metrics, io_workers, queue_limit)
+        uncached = sources
+    else:
+        uncached = sequential_index(sources, per_file, cache, jobs, backend, metrics)
+
+    if cache is not None and save_cache:
+        with metrics.phase("cache save"):
+            cache.save()
+    finished = time.perf_counter()
+
+    # Every file that missed was read by the cache lookup, or else by its parse job
+    bytes_read = cache.bytes_read if cache is not None else sum(source.size for source in uncached)
+    metrics.bytes_read += bytes_read
+
+    stats = {
+        'crates': sorted({source.crate for source in sources}),
+        'files': len(sources),
+        'bytes': sum(source.size for source in sources),
+        'bytes_read': bytes_read,
+        'walk_seconds': walked - started,
+        'parse_seconds': finished - walked,
+    }
+    if reads is not None:
+        stats['reads'] = reads.to_dict()
+    return MakepadIndex([
+        FileIndex(path=source.path, crate=source.crate, widget_source=source.widget_source,
+                  structs=structs, enums=enums, size=source.size, mtime_ns=source.mtime_ns)
+        for source, (structs, enums) in zip(sources, per_file)
+    ], stats, source_root=root, crates=crates, backend=backend)
+
+def sequential_index(sources: list, per_file: list, cache: Optional[ExtractionCache], jobs: int,
+                     backend: str, metrics: Metrics) -> list:
+    """Fill per_file by reading the sources in order, then parsing the misses.
+
+    Returns the sources that were parsed.
+    """
+    # Resolve cache hits first; everything else is parsed (possibly in parallel)
+    pending = []
+    pending_hashes = []
+    with metrics.phase("read"):
+        for i, source in enumerate(sources):
+            if cache is None:
+                pending.append((i, source.path, source.rel, None))
+                continue
+            cached, content, content_hash = cache.lookup(Path(source.path), backend)
+            if cached is not None:
+                per_file[i] = parsed_from_dict(cached, source.rel)
+            else:
+                pending.append((i, source.path, source.rel, content))
+                pending_hashes.append(content_hash)
+
+    with metrics.phase("parse"):
+        # Timed jobs also report how long each file took to read and parse
+        job_func = _timed_parse_job if metrics.enabled else _parse_job
+        parsed = map_files(job_func, [job[1:] + (backend,) for job in pending], jobs)
+        for n, (job, result) in enumerate(zip(pending, parsed)):
+            if metrics.enabled:
+                result, read_seconds, parse_seconds = result
+                metrics.record_file(job[1], sources[job[0]].size, read_seconds, parse_seconds)
+            if jobs > 1:
+                # Strings unpickled from the workers are copies; share the parent's
+                intern_parsed(result)
+            per_file[job[0]] = result
+            if cache is not None:
+                cache.store(pending_hashes[n], result)
+    return [sources[job[0]] for job in pending]
+
+def pipeline_index(sources: list, per_file: list, cache: Optional[ExtractionCache], jobs: int,
+                   backend: str, metrics: Metrics, io_workers: int, queue_limit: int) -> ReadReport:
+    """Fill per_file through the async read pipeline, parsing each file as it arrives.
+
+    Reader threads stat each file, skip the read when the cache has it and
+    otherwise read and hash it; cache bookkeeping and parsing happen on this
+    thread, or in a process pool when jobs > 1.
+    """
+    job_func = _timed_parse_job if metrics.enabled else _parse_job
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(sources) >= PARALLEL_MIN_FILES else None
+
+    def read(entry):
+        _, source = entry
+        stat = None
+        if cache is not None:
+            stat = os.stat(source.path)
+            if cache.unchanged(source.path, stat):
+                return stat, None, None
+        if cache is None:
+            return stat, read_source(source.path, backend), None
+        return (stat,) + read_hashed(source.path, backend)
+
+    def store(entry, content_hash, result, read_seconds):
+        i, source = entry
+        if metrics.enabled:
+            result, _, parse_seconds = result
+            metrics.record_file(source.path, source.size, read_seconds, parse_seconds)
+        if pool is not None:
+            intern_parsed(result)
+        per_file[i] = result
+        if cache is not None:
+            cache.store(content_hash, result)
+
+    def consume(entry, value, read_seconds):
+        i, source = entry
+        stat, content, content_hash = value
+        if cache is not None:
+            cached = cache.hit(source.path) if content is None else cache.record(source.path, stat, content_hash)
+            if cached is not None:
+                per_file[i] = parsed_from_dict(cached, source.rel)
+                return None
+        job = (source.path, source.rel, content, backend)
+        if pool is None:
+            return store(entry, content_hash, job_func(job), read_seconds)
+
+        async def parse_in_pool():
+            result = await asyncio.get_running_loop().run_in_executor(pool, job_func, job)
+            store(entry, content_hash, result, read_seconds)
+        return parse_in_pool()
+
+    try:
+        # Unchanged files come back without content: a stat, not a read
+        return read_pipeline(enumerate(sources), read, consume, workers=io_workers, queue_limit=queue_limit,
+                             consumers=jobs if pool is not None else 1, cached=lambda value: value[1] is None)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def widgets_src_dir(root: Optional[Path] = None) -> Path:
+    """The widgets crate's src directory for a checkout or registry root."""
+    root = Path(root or makepad_root())
+    return root / "src" if REGISTRY_CRATE_RE.match(root.name) else root / "widgets" / "src"
+
+def index_root(root: Optional[Path] = None) -> Path:
+    """Directory index paths are made relative to: the checkout, or the registry directory."""
+    root = Path(root or makepad_root())
+    return root.parent if REGISTRY_CRATE_RE.match(root.name) else root
+
+def refresh_index(index: MakepadIndex, sources: Optional[list] = None) -> tuple:
+    """Bring an index up to date with the files on disk, in place.
+
+    Only files whose size or mtime changed are re-read and re-parsed; the
+    rest of the model is reused. sources defaults to listing the index's own
+    source root again. Returns (changed paths, removed paths).
+    """
+    if sources is None:
+        sources = list_sources(index.crates, index.source_root)
+    existing = {f.path: f for f in index.files}
+    files = []
+    changed = []
+
+    for source in sources:
+        old = existing.get(source.path)
+        if old is not None and old.size == source.size and old.mtime_ns == source.mtime_ns:
+            files.append(old)
+            continue
+        with open_source(source.path, index.backend) as content:
+            structs, enums = parse_file(content, source.rel)
+        files.append(FileIndex(path=source.path, crate=source.crate, widget_source=source.widget_source,
+                               structs=structs, enums=enums, size=source.size, mtime_ns=source.mtime_ns))
+        changed.append(source.path)
+
+    removed = sorted(set(existing) - {source.path for source in sources})
+    index.files = files
+    return changed, removed
+
+def map_files(func, items: list, jobs: int) -> list:
+    """Apply func to every item, fanning out to a process pool when worthwhile.
+
+    Results are returned in input order regardless of how work was scheduled.
+    """
+    if jobs <= 1 or len(items) < PARALLEL_MIN_FILES:
+        return [func(item) for item in items]
+    chunksize = max(1, len(items) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(func, items, chunksize=chunksize))
+
+@contextmanager
+def open_source(path, backend: str = "str"):
+    """Yield a source file's content for parse_file(): its text, or a read-only mmap of its bytes."""
+    if backend == "str":
+        yield read_source(path, backend)
+        return
+    simulate_latency()
+    with open(path, 'rb') as f:
+        # Empty files can't be mapped
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else None
+    if mapped is None:
+        yield b""
+        return
+    with mapped:
+        yield mapped
+
+def read_source(path, backend: str = "str"):
+    """Read a whole source file: its text, or its bytes for the mmap backend."""
+    simulate_latency()
+    data = Path(path).read_bytes()
+    return decode_source(data) if backend == "str" else data
+
+def read_hashed(path, backend: str = "str") -> tuple:
+    """Read a whole source file like read_source() and return (content, hash of its raw bytes)."""
+    simulate_latency()
+    data = Path(path).read_bytes()
+    return (decode_source(data) if backend == "str" else data), hash_content(data)
+
+def decode_source(data) -> str:
+    """Decode source bytes like read_text(): UTF-8, with \r\n and lone \r turned into \n."""
+    return bytes(data).decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+def hash_content(content) -> str:
+    """Cache key of a file's content: the SHA-1 of its raw bytes.
+
+    Both backends hash the bytes on disk, before any newline translation, so
+    they share cache entries even for files with \r\n line endings.
+    """
+    return hashlib.sha1(content).hexdigest()
+
+def _parse_job(job: tuple) -> tuple:
+    """Worker entry point: parse one file, reading it if content wasn't supplied."""
+    path, rel, content, backend = job
+    if content is not None:
+        return parse_file(content, rel)
+    with open_source(path, backend) as content:
+        return parse_file(content, rel)
+
+def _timed_parse_job(job: tuple) -> tuple:
+    """Like _parse_job, but also return (read seconds, parse seconds) for --profile.
+
+    A mapped file is paged in while it is parsed, so its read time is only the mapping.
+    """
+    path, rel, content, backend = job
+    started = time.perf_counter()
+    if content is not None:
+        read = time.perf_counter()
+        parsed = parse_file(content, rel)
+        return parsed, read - started, time.perf_counter() - read
+    with open_source(path, backend) as content:
+        read = time.perf_counter()
+        parsed = parse_file(content, rel)
+    return parsed, read - started, time.perf_counter() - read
+
+def parse_file(content, file_name: str, private: bool = False) -> tuple:
+    """Extract the Live structs and enums defined in one source file.
+
+    content is the file's text, or its UTF-8 bytes (bytes or mmap). Returns
+    (structs, enums), each in source order. Only pub items are extracted
+    unless private is set.
+    """
+    structs = []
+    enums = []
+    file_name = intern(file_name)
+    if not isinstance(content, str) and LONE_CR_RE.search(content):
+        # Line numbers would disagree with the decoded text; decode like read_text() does
+        content = decode_source(content)
+    lines = LineIndex(content)
+    lexed = lex_file(content)
+
+    # Find pub structs with #[derive(...Live...Widget...)]
+    for struct in lexed.structs:
+        if not (struct.is_pub or private) or not is_live_struct(struct):
+            continue
+        line, column = lines.position(struct.pos)
+        structs.append(Widget(
+            name=intern(struct.name),
+            file=file_name,
+            properties=extract_properties(struct, lines),
+            doc=extract_doc_comment(struct),
+            line=line,
+            column=column,
+            bases=extract_bases(struct, lines)
+        ))
+
+    for enum in lexed.enums:
+        if not (enum.is_pub or private) or not is_live_struct(enum):
+            continue
+        line, column = lines.position(enum.pos)
+        enums.append(LiveEnum(
+            name=intern(enum.name),
+            file=file_name,
+            variants=[extract_variant(variant, lines) for variant in enum.variants],
+            doc=extract_doc_comment(enum),
+            line=line,
+            column=column
+        ))
+
+    return structs, enums
+
+def is_live_struct(item: RustItem) -> bool:
+    """True if the struct or enum derives Live or Widget (or a trait named after them)."""
+    return any('Live' in d or 'Widget' in d for d in item.derives)
+
+def extract_properties(struct: RustStruct, lines: Optional[LineIndex] = None) -> list:
+    """Extract #[live] properties from a lexed struct (base fields are left to extract_bases)."""
+    properties = []
+
+    for struct_field in struct.fields:
+        if any(attr in BASE_ATTRS for attr in struct_field.attrs):
+            continue
+        for attr in struct_field.attrs:
+            if attr == 'live' or attr.startswith('live('):
+                line, column = lines.position(struct_field.pos) if lines else (0, 0)
+                properties.append(WidgetProperty(
+                    name=intern(struct_field.name),
+                    prop_type=intern(struct_field.ty),
+                    default=intern(attr[5:-1].strip()) if attr.startswith('live(') else None,
+                    doc=' '.join(struct_field.docs),
+                    line=line,
+                    column=column
+                ))
+                break
+
+    return properties
+
+def extract_bases(struct: RustStruct, lines: Optional[LineIndex] = None) -> list:
+    """Extract the #[deref], #[walk] and #[layout] fields of a lexed struct."""
+    bases = []
+
+    for struct_field in struct.fields:
+        kind = next((attr for attr in struct_field.attrs if attr in BASE_ATTRS), None)
+        if kind:
+            line, column = lines.position(struct_field.pos) if lines else (0, 0)
+            bases.append(WidgetBase(intern(kind), intern(struct_field.name), intern(struct_field.ty), line, column))
+
+    return bases
+
+def extract_variant(variant: RustVariant, lines: Optional[LineIndex] = None) -> EnumVariant:
+    """An enum variant with its docs, #[pick]/#[default] markers and #[live(...)]/#[pick(...)] payload default."""
+    line, column = lines.position(variant.pos) if lines else (0, 0)
+    value = None
+    for attr in variant.attrs:
+        for marker in ('live(', 'pick('):
+            if attr.startswith(marker) and attr.endswith(')'):
+                value = intern(attr[len(marker):-1].strip())
+    return EnumVariant(
+        name=intern(variant.name),
+        line=line,
+        column=column,
+        doc=' '.join(variant.docs),
+        pick=any(attr == 'pick' or attr.startswith('pick(') for attr in variant.attrs),
+        is_default='default' in variant.attrs,
+        value=value
+    )
+
+def extract_doc_comment(item: RustItem) -> str:
+    """Join the /// doc comments directly above a struct or enum."""
+    return ' '.join(text.strip() for _, text in item.docs)
+
+def add_index_arguments(parser: argparse.ArgumentParser):
+    """Add the indexing options shared by every generator script."""
+    parser.add_argument("--no-cache", action="store_true", help="don't read or write the extraction cache")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the existing cache and re-parse every file")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="number of parser processes (default: CPU count, 1 = sequential)")
+    parser.add_argument("--crate", dest="crates", action="append", metavar="NAME",
+                        help=f"crate directory under MAKEPAD_PATH to scan (repeatable, default: {','.join(DEFAULT_CRATES)})")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS",
+                        help="warn when a full scan takes longer than this")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f"read files decoded to str or scan memory-mapped bytes (default: {DEFAULT_BACKEND})")
+    parser.add_argument("--io-workers", type=int, default=DEFAULT_IO_WORKERS, metavar="N",
+                        help="read up to N files at once through the async pipeline, for slow or network "
+                             f"mounts (default: {DEFAULT_IO_WORKERS}, 0 = one at a time)")
+    parser.add_argument("--queue-limit", type=int, default=QUEUE_LIMIT, metavar="N",
+                        help=f"files read ahead of the parser with --io-workers (default: {QUEUE_LIMIT})")
+    parser.add_argument("--read-latency", type=float, metavar="MS",
+                        help="add MS milliseconds to every file read, to simulate a slow mount")
+
+def fingerprint_from_args(args: argparse.Namespace) -> Optional[str]:
+    """Fingerprint index_from_args() would give, from a walk of the source without parsing it.
+
+    None when no Makepad source was found, so there is nothing to compare with.
+    """
+    _, root = discover_makepad(use_cache=not args.no_cache)
+    sources = list_sources(args.crates, root)
+    return files_fingerprint(sources, index_root(root)) if sources else None
+
+def index_from_args(args: argparse.Namespace, metrics: Optional[Metrics] = None) -> MakepadIndex:
+    """Build the index as configured by add_index_arguments() options."""
+    source, root = discover_makepad(use_cache=not args.no_cache)
+    print(f"Makepad source: {root} ({source or 'not found'})")
+    if args.read_latency is not None:
+        set_read_latency(args.read_latency)
+    cache = ExtractionCache(enabled=not args.no_cache, rebuild=args.rebuild)
+    index = build_index(cache, jobs=args.jobs, crates=args.crates, metrics=metrics, root=root,
+                        backend=args.backend, io_workers=args.io_workers, queue_limit=args.queue_limit)
+    stats = index.stats
+    total = stats['walk_seconds'] + stats['parse_seconds']
+    print(f"Indexed {stats['files']} files ({stats['bytes'] / 1e6:.1f} MB) in {', '.join(stats['crates'])}: "
+          f"walk {stats['walk_seconds']:.3f}s, parse {stats['parse_seconds']:.3f}s")
+    if cache.enabled:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses, {cache.evicted} evicted")
+    if 'reads' in stats:
+        print(f"Reads: {summarize(stats['reads'])}")
+    if args.time_budget is not None and total > args.time_budget:
+        print(f"Warning: scan took {total:.2f}s, over the {args.time_budget:.2f}s budget")
+    return index
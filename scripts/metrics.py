@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Per-phase timing and I/O metrics for the generator scripts.
+
+With --profile a script records wall and CPU time for every phase (walk,
+read, parse, render, write), per-file parse times and bytes read/written,
+prints a summary with the slowest files and writes the metrics as JSON next
+to its outputs so generator cost can be tracked across Makepad versions.
+--pstats additionally runs the script under cProfile and dumps the stats.
+"""
+
+import json
+import time
+import argparse
+import cProfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import outputs
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def child_cpu_time() -> float:
+    """CPU time used by reaped child processes (the parser pool)."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+class Metrics:
+    """Collects phase timings, per-file parse times and I/O volume.
+
+    Disabled instances accept the same calls and record nothing, so callers
+    don't need to check whether profiling is on.
+    """
+
+    def __init__(self, script: str, enabled: bool = False, pstats_path: Optional[Path] = None):
+        self.script = script
+        self.enabled = enabled
+        self.pstats_path = pstats_path
+        self.phases = []  # {"name", "wall_seconds", "cpu_seconds"} in the order they ran
+        self.files = []   # {"file", "bytes", "read_seconds", "parse_seconds"} for every parsed file
+        self.bytes_read = 0
+        self.profiler = cProfile.Profile() if enabled and pstats_path else None
+        self._writes_from = len(outputs.writes)
+        self._started = time.perf_counter()
+        if self.profiler:
+            self.profiler.enable()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as one phase."""
+        if not self.enabled:
+            yield
+            return
+        wall = time.perf_counter()
+        cpu = time.process_time() + child_cpu_time()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                "name": name,
+                "wall_seconds": time.perf_counter() - wall,
+                "cpu_seconds": time.process_time() + child_cpu_time() - cpu,
+            })
+
+    def record_file(self, path: str, size: int, read_seconds: float, parse_seconds: float):
+        self.files.append({"file": path, "bytes": size, "read_seconds": read_seconds, "parse_seconds": parse_seconds})
+
+    def slowest(self, n: int) -> list:
+        return sorted(self.files, key=lambda f: f["read_seconds"] + f["parse_seconds"], reverse=True)[:n]
+
+    @property
+    def written(self) -> dict:
+        """Bytes written per rewritten output path since this instance was created."""
+        return {path: size for path, size, rewritten in outputs.writes[self._writes_from:] if rewritten}
+
+    @property
+    def unchanged(self) -> list:
+        """Outputs whose content was already up to date."""
+        return [path for path, _, rewritten in outputs.writes[self._writes_from:] if not rewritten]
+
+    def to_dict(self, top: int) -> dict:
+        written = self.written
+        return {
+            "script": self.script,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total_seconds": time.perf_counter() - self._started,
+            "phases": self.phases,
+            "files_parsed": len(self.files),
+            "parse_seconds": sum(f["parse_seconds"] for f in self.files),
+            "bytes_read": self.bytes_read,
+            "bytes_written": sum(written.values()),
+            "outputs": written,
+            "outputs_unchanged": self.unchanged,
+            "slowest_files": self.slowest(top),
+        }
+
+    def finish(self, metrics_path: Path, top: int = 10):
+        """Print the summary and write the metrics JSON (and pstats dump if requested)."""
+        if not self.enabled:
+            return
+        if self.profiler:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.pstats_path)
+
+        data = self.to_dict(top)
+        print(f"\nProfile ({data['total_seconds']:.3f}s total):")
+        for phase in self.phases:
+            print(f"  {phase['name']:<20} wall {phase['wall_seconds']:8.3f}s  cpu {phase['cpu_seconds']:8.3f}s")
+        print(f"  Read {data['bytes_read'] / 1e6:.2f} MB, wrote {data['bytes_written'] / 1e6:.2f} MB "
+              f"to {len(data['outputs'])} files ({len(data['outputs_unchanged'])} unchanged)")
+        if data["slowest_files"]:
+            print(f"  Slowest {len(data['slowest_files'])} of {data['files_parsed']} parsed files:")
+            for f in data["slowest_files"]:
+                print(f"    {(f['read_seconds'] + f['parse_seconds']) * 1000:8.2f} ms  {f['bytes'] / 1024:8.1f} KB  {f['file']}")
+
+        with outputs.atomic_write(metrics_path) as f:
+            json.dump(data, f, indent=2)
+        print(f"Metrics written to {metrics_path}")
+        if self.profiler:
+            print(f"cProfile stats written to {self.pstats_path} (python3 -m pstats {self.pstats_path})")
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """Add the --profile options shared by the generator scripts."""
+    parser.add_argument("--profile", action="store_true",
+                        help="record per-phase timings, per-file parse times and I/O, and write a metrics JSON")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of slowest files to report with --profile (default: 10)")
+    parser.add_argument("--pstats", type=Path, metavar="FILE",
+                        help="with --profile, also run under cProfile and dump the stats to FILE")
+
+def metrics_from_args(args: argparse.Namespace, script: str) -> Metrics:
+    """Create the Metrics configured by add_profile_arguments() options."""
+    return Metrics(script, enabled=args.profile, pstats_path=args.pstats if args.profile else None)
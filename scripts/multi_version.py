@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Index several Makepad versions in one run and diff them.
+
+Each version is a root: a Makepad checkout or a crate unpacked in the Cargo
+registry (makepad-widgets-0.6.0). All versions share one extraction cache,
+which stores parse results by content hash, so a file that is identical in
+several versions is parsed once and reused; indexing N versions costs about
+one version plus whatever changed between them.
+
+Writes <version>.json (or <version>.ndjson, one widget or enum per line)
+with the widgets, properties and Live enums of each version, and diff.json
+listing what was added, removed or changed between consecutive versions.
+Each version is written as soon as it is indexed and only the previous
+version's summary is kept for the diff, so memory stays flat however many
+versions are indexed.
+"""
+
+import re
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+
+from discovery import discover_versions
+from makepad_index import REGISTRY_CRATE_RE, ExtractionCache, MakepadIndex, build_index
+from outputs import atomic_write, stream_json, write_ndjson, write_summary
+from symbol_store import open_store, write_version
+
+OUTPUT_DIR = Path(__file__).parent / ".cache" / "versions"
+
+def parse_root(spec: str) -> tuple:
+    """Split a VERSION=PATH argument.
+
+    Without a version, registry crates are named by their crate version and
+    checkouts by their directory name.
+    """
+    name, sep, path = spec.partition('=')
+    if not sep:
+        path = spec
+        name = Path(spec).expanduser().resolve().name
+        registry = REGISTRY_CRATE_RE.match(name)
+        if registry:
+            name = registry.group(2)
+    return name, Path(path).expanduser()
+
+def version_file_name(version: str, suffix: str = ".json") -> str:
+    return re.sub(r'[^\w.+-]', '_', version) + suffix
+
+def summarize_version(index: MakepadIndex) -> dict:
+    """The per-version record: widgets with their properties, and Live enums."""
+    return {
+        "widgets": {
+            name: {
+                "file": widget.file,
+                "line": widget.line,
+                "doc": widget.doc,
+                "properties": {p.name: {"type": p.prop_type, "default": p.default} for p in widget.properties},
+            }
+            for name, widget in sorted(index.widgets.items())
+        },
+        "enums": {
+            name: {"file": enum.file, "line": enum.line, "default": enum.default,
+                   "variants": [v.name for v in enum.variants]}
+            for name, enum in sorted(index.enums.items())
+        },
+    }
+
+def diff_versions(old: dict, new: dict) -> dict:
+    """Widgets, properties and enum variants added, removed or changed from old to new."""
+    old_widgets, new_widgets = old["widgets"], new["widgets"]
+    changed = {}
+    for name in sorted(old_widgets.keys() & new_widgets.keys()):
+        before, after = old_widgets[name]["properties"], new_widgets[name]["properties"]
+        props = {
+            "added": sorted(after.keys() - before.keys()),
+            "removed": sorted(before.keys() - after.keys()),
+            "changed": {
+                prop: {"from": before[prop], "to": after[prop]}
+                for prop in sorted(before.keys() & after.keys()) if before[prop] != after[prop]
+            },
+        }
+        if any(props.values()):
+            changed[name] = props
+
+    old_enums, new_enums = old["enums"], new["enums"]
+    changed_enums = {}
+    for name in sorted(old_enums.keys() & new_enums.keys()):
+        before, after = old_enums[name]["variants"], new_enums[name]["variants"]
+        if before != after:
+            changed_enums[name] = {
+                "added": [v for v in after if v not in before],
+                "removed": [v for v in before if v not in after],
+            }
+        old_default, new_default = old_enums[name].get("default"), new_enums[name].get("default")
+        if old_default != new_default:
+            changed_enums.setdefault(name, {"added": [], "removed": []})["default"] = [old_default, new_default]
+
+    return {
+        "widgets": {
+            "added": sorted(new_widgets.keys() - old_widgets.keys()),
+            "removed": sorted(old_widgets.keys() - new_widgets.keys()),
+            "changed": changed,
+        },
+        "enums": {
+            "added": sorted(new_enums.keys() - old_enums.keys()),
+            "removed": sorted(old_enums.keys() - new_enums.keys()),
+            "changed": changed_enums,
+        },
+    }
+
+def version_records(version: str, summary: dict):
+    """The NDJSON lines of one version: a header, then one record per widget and per enum."""
+    yield {"version": version, "widgets": len(summary["widgets"]), "enums": len(summary["enums"])}
+    for name, widget in summary["widgets"].items():
+        yield {"kind": "widget", "name": name, **widget}
+    for name, enum in summary["enums"].items():
+        yield {"kind": "enum", "name": name, **enum}
+
+def index_versions(roots: list, cache: ExtractionCache, jobs: int = 1, crates=None):
+    """Yield (version, index) for every (version, root) as it is built, sharing parse results by content hash.
+
+    The cache is saved once the last version has been indexed.
+    """
+    for version, root in roots:
+        misses_before, hits_before = cache.misses, cache.hits
+        started = time.perf_counter()
+        index = build_index(cache, jobs=jobs, crates=crates, root=root, save_cache=False)
+        parsed = cache.misses - misses_before
+        reused = cache.hits - hits_before
+        print(f"  {version}: {index.stats['files']} files, {parsed} parsed, {reused} reused "
+              f"in {time.perf_counter() - started:.3f}s ({len(index.widgets)} widgets)")
+        yield version, index
+        del index  # the caller may drop it before the next version is built
+    cache.save()
+
+def write_versions(indexes, output_dir: Path = OUTPUT_DIR, ndjson: bool = False, store=None) -> list:
+    """Write each (version, index) as it arrives, then the diffs between consecutive versions.
+
+    Indexes are dropped once summarized (and written to the SQLite store, if
+    one is open); only the previous summary is kept.
+    """
+    versions = []
+    diffs = []
+    previous = None
+    for version, index in indexes:
+        summary = summarize_version(index)
+        if store is not None:
+            write_version(store, version, index)
+        del index
+        if ndjson:
+            with atomic_write(output_dir / version_file_name(version, ".ndjson")) as f:
+                write_ndjson(f, version_records(version, summary))
+        else:
+            with atomic_write(output_dir / version_file_name(version)) as f:
+                stream_json(f, {"version": version, **summary})
+        if previous is not None:
+            diffs.append({"from": versions[-1], "to": version, **diff_versions(previous, summary)})
+        versions.append(version)
+        previous = summary
+
+    with atomic_write(output_dir / "diff.json") as f:
+        stream_json(f, {"versions": versions, "diffs": diffs}, depth=5)
+    return diffs
+
+def main():
+    parser = argparse.ArgumentParser(description="Index several Makepad versions and diff their widgets.")
+    parser.add_argument("--root", dest="roots", action="append", default=[], metavar="[VERSION=]PATH",
+                        help="Makepad checkout or registry crate dir (makepad-widgets-X.Y.Z); repeat in version order")
+    parser.add_argument("--discover", action="store_true",
+                        help="also index every registry version (in semver order) and git checkout Cargo has installed")
+    parser.add_argument("--crate", dest="crates", action="append", metavar="NAME",
+                        help="crate to scan in every root (repeatable)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="number of parser processes")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="don't read or write the on-disk cache (files are still shared within the run)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR, help="directory for the per-version indexes and diff")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="write <version>.ndjson, one widget or enum record per line, instead of <version>.json")
+    parser.add_argument("--sqlite", type=Path, metavar="PATH",
+                        help="also write every version to this SQLite symbol store (see symbol_store.py)")
+    args = parser.parse_args()
+
+    roots = [parse_root(spec) for spec in args.roots]
+    if args.discover:
+        roots += discover_versions()
+    if not roots:
+        parser.error("no versions to index: pass --root or --discover")
+    try:
+        store = open_store(args.sqlite) if args.sqlite else None
+    except (ValueError, sqlite3.Error) as e:
+        parser.error(str(e))
+    # A disabled cache still dedupes in memory; it just isn't loaded or saved
+    cache = ExtractionCache(enabled=not args.no_cache)
+
+    print(f"Indexing {len(roots)} versions...")
+    started = time.perf_counter()
+    diffs = write_versions(index_versions(roots, cache, jobs=args.jobs, crates=args.crates), args.output,
+                           ndjson=args.ndjson, store=store)
+    print(f"Indexed {cache.hits + cache.misses} files in {time.perf_counter() - started:.3f}s: "
+          f"{cache.misses} parsed, {cache.hits} shared by content hash")
+    for diff in diffs:
+        widgets = diff["widgets"]
+        print(f"  {diff['from']} -> {diff['to']}: {len(widgets['added'])} widgets added, "
+              f"{len(widgets['removed'])} removed, {len(widgets['changed'])} changed")
+    print(write_summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Helpers for writing generated files.
+
+Outputs are written to a temporary file in the same directory and renamed
+over the target, so VS Code (or anything else watching them) never sees a
+half-written file. Content is hashed as it is written; when it matches the
+file already on disk the temporary file is dropped and the target is left
+untouched, so unchanged outputs keep their mtime and don't churn git.
+
+Large outputs are streamed: stream_json(), write_compact() and write_ndjson()
+encode records one at a time, as a generator produces them, so the whole
+document never has to exist in memory as one string or as nested dicts.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+# (path, bytes, rewritten) for every tracked file written through atomic_write
+writes = []
+
+class HashingWriter:
+    """Text file wrapper that hashes everything written through it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha1()
+        self.size = 0
+        self.rewritten = False  # set once the new content has been moved into place
+
+    def write(self, text: str) -> int:
+        data = text.encode()
+        self.digest.update(data)
+        self.size += len(data)
+        return self.f.write(text)
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def same_content(path: Path, size: int, digest: str) -> bool:
+    """True if path exists with exactly this size and hash."""
+    try:
+        if path.stat().st_size != size:
+            return False
+        return file_hash(path) == digest
+    except OSError:
+        return False
+
+@contextmanager
+def atomic_write(path: Path, track: bool = True):
+    """Open a temporary file for writing and move it over path if the content changed.
+
+    Tracked writes are recorded in writes for the rewritten/unchanged summary.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            writer = HashingWriter(f)
+            yield writer
+            f.flush()
+            changed = not same_content(path, writer.size, writer.digest.hexdigest())
+            if changed:
+                os.fsync(f.fileno())
+        if changed:
+            # mkstemp creates the file 0600; keep the permissions of the file we replace
+            os.chmod(tmp_path, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+            os.replace(tmp_path, path)
+            writer.rewritten = True
+        else:
+            os.unlink(tmp_path)
+        if track:
+            writes.append((str(path), writer.size, changed))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def stream_json(f, value, indent: int = 2, depth: int = 2, level: int = 0):
+    """Write value as indented JSON, its top depth levels of dicts and lists member by member.
+
+    The bytes are the same as json.dump(value, f, indent=indent). An iterator
+    of (key, value) pairs is written as an object at any depth, so members
+    can be produced by a generator while the file is written.
+    """
+    close = "\n" + " " * (indent * level)
+    pad = close + " " * indent
+    if hasattr(value, "__next__") or (depth > 0 and isinstance(value, dict)):
+        first = True
+        for key, member in (value if hasattr(value, "__next__") else value.items()):
+            f.write(("{" if first else ",") + pad + json.dumps(key) + ": ")
+            first = False
+            stream_json(f, member, indent, depth - 1, level + 1)
+        f.write("{}" if first else close + "}")
+    elif depth > 0 and isinstance(value, list) and value:
+        for n, member in enumerate(value):
+            f.write(("," if n else "[") + pad)
+            stream_json(f, member, indent, depth - 1, level + 1)
+        f.write(close + "]")
+    else:
+        f.write(json.dumps(value, indent=indent).replace("\n", close))
+
+def write_compact(f, value, depth: int = 2):
+    """Write value as compact JSON, encoding the members of its top depth levels one at a time.
+
+    The bytes are the same as json.dumps(value, separators=(',', ':')).
+    """
+    if depth and isinstance(value, dict):
+        f.write("{")
+        for n, (key, member) in enumerate(value.items()):
+            f.write(("," if n else "") + json.dumps(key) + ":")
+            write_compact(f, member, depth - 1)
+        f.write("}")
+    elif depth and isinstance(value, list):
+        f.write("[")
+        for n, member in enumerate(value):
+            if n:
+                f.write(",")
+            write_compact(f, member, depth - 1)
+        f.write("]")
+    else:
+        f.write(json.dumps(value, separators=(",", ":")))
+
+def write_ndjson(f, records) -> int:
+    """Write one compact JSON document per line; returns the number of records."""
+    count = 0
+    for record in records:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        count += 1
+    return count
+
+def remove_stale(directory: Path, keep: set, pattern: str = "*", marker: Optional[str] = None) -> list:
+    """Delete files in directory matching pattern whose names aren't in keep.
+
+    With a marker, only files whose content starts with it are deleted, so
+    files written by hand next to generated ones are left alone. The
+    directory itself is removed once deleting files has emptied it.
+    """
+    removed = []
+    if directory.is_dir():
+        for path in sorted(directory.glob(pattern)):
+            if path.is_file() and path.name not in keep and (marker is None or starts_with(path, marker)):
+                path.unlink()
+                removed.append(str(path))
+        if removed and not any(directory.iterdir()):
+            directory.rmdir()
+    return removed
+
+def starts_with(path: Path, marker: str) -> bool:
+    """True if the file's content begins with marker."""
+    expected = marker.encode()
+    with open(path, 'rb') as f:
+        return f.read(len(expected)) == expected
+
+def write_summary(since: int = 0) -> str:
+    """Summarize the writes made since the given position in writes."""
+    recent = writes[since:]
+    rewritten = sum(1 for _, _, changed in recent if changed)
+    return f"Outputs: {rewritten} rewritten, {len(recent) - rewritten} unchanged"
@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+"""
+Single-pass lexer for the subset of Rust the extraction scripts care about.
+
+Each source file is walked once by a precompiled alternation regex
+(SCAN_RE) whose named groups pick out /// docs, attributes (derive lists,
+#[live(...)] and friends), comments and struct/enum headers. Everything else,
+including string/char literals, raw strings and lifetimes, is consumed in
+runs, so braces inside them are never miscounted and code outside items
+costs one regex match per run instead of Python work per token. Struct bodies
+are read field by field with the same kind of scanner (STRUCT_RE, FIELD_RE);
+enums, and structs containing anything those don't cover (comments, string
+or char literals, lifetimes, where clauses), are split into fine tokens
+(TOKEN_RE) and parsed from those.
+
+Sources may be str or UTF-8 bytes (bytes, or an mmap of the file). Every
+pattern has a bytes twin derived from it, so a memory-mapped file is scanned
+without decoding it; only captured names, types, attributes and doc text are
+decoded. Offsets are then byte offsets, and LineIndex turns them into the
+same line and (character) column numbers as for the decoded text. On bytes
+every non-ASCII character counts as an identifier character; that only makes
+a difference where a symbol is glued to a name, which isn't valid Rust.
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+# Token kinds
+IDENT = "ident"
+PUNCT = "punct"
+ATTR = "attr"        # outer attribute, text is the inside of #[...]
+DOC = "doc"          # /// line, text is everything after the slashes
+COMMENT = "comment"  # any other comment
+LITERAL = "literal"  # string, char or number literal
+LIFETIME = "lifetime"
+
+IDENT_RE = re.compile(r'[A-Za-z_]\w*')
+
+# One alternative per token kind, tried in order at each offset. Nested block
+# comments and attributes can't be matched by a regex, so only their opening
+# is matched here and the rest is skipped by skip_block_comment/skip_brackets.
+TOKEN_RE = re.compile(r"""
+    (?P<ws>[ \t\r\n]+)
+  | (?P<doc>///(?!/)[^\n]*)
+  | (?P<comment>//[^\n]*)
+  | (?P<block>/\*)
+  | (?P<raw>b?r(?P<hashes>\#*)".*?(?:"(?P=hashes)|\Z))
+  | (?P<string>b?"[^"\\]*(?:\\.[^"\\]*)*(?:"|\\?\Z))
+  | (?P<bytechar>b'(?:\\.[^']*'|[^\\]')?)
+  | (?P<rawident>r\#(?P<rawname>[A-Za-z_]\w*))
+  | (?P<char>'(?:\\.[^']*'|[^\\]'))
+  | (?P<lifetime>'(?:[A-Za-z_]\w*)?)
+  | (?P<attr>\#(?P<inner>!)?\[)
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<number>\d[\w.]*)
+  | (?P<punct>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Tokens lex_file() only needs to know are there: anything that separates
+# attributes and doc comments from a following item. Mirrors TOKEN_RE so runs
+# end exactly on token boundaries. pub/struct/enum are left to the item group.
+_KEYWORD = r'(?:pub|struct|enum)(?!\w)'
+_SEP_TOKEN = r"""(?:
+    b?r(?P<sephashes>\#*)".*?(?:"(?P=sephashes)|\Z)
+  | b?"[^"\\]*(?:\\.[^"\\]*)*(?:"|\\?\Z)
+  | b'(?:\\.[^']*'|[^\\]')?
+  | r\#(?!""" + _KEYWORD + r""")[A-Za-z_]\w*
+  | '(?:\\.[^']*'|[^\\]')
+  | '(?:[A-Za-z_]\w*)?
+  | (?!(?:r\#)?""" + _KEYWORD + r""")[A-Za-z_]\w*
+  | \d[\w.]*
+  | [^ \t\r\n\w/\#'"]
+  | /(?![/*])
+  | \#(?!!?\[)
+  | (?![A-Za-z_\d])\w
+)"""
+
+SCAN_RE = re.compile(r"""
+    (?P<ws>[ \t\r\n]+)
+  | (?P<sep>""" + _SEP_TOKEN + r"""(?:[ \t\r\n]*""" + _SEP_TOKEN.replace('sephashes', 'sephashes2') + r""")*)
+  | (?P<doc>///(?!/)[^\n]*)
+  | (?P<comment>//[^\n]*)
+  | (?P<block>/\*)
+  | (?P<attr>\#(?P<inner>!)?\[)
+  | (?P<item>(?:(?:r\#)?pub(?:[ \t\r\n]*\([^()/"'\#]*\)[ \t\r\n]*|[ \t\r\n]+))?(?:r\#)?(?:struct|enum)(?!\w))
+  | (?P<restricted>(?:r\#)?pub(?=[ \t\r\n]*\([^()/"'\#]*[/"'\#]))
+  | (?P<keyword>(?:r\#)?pub(?!\w))
+""", re.VERBOSE | re.DOTALL)
+
+OPENERS = '([{<'
+CLOSERS = ')]}>'
+
+@dataclass
+class RustField:
+    name: str
+    ty: str
+    attrs: list = field(default_factory=list)
+    docs: list = field(default_factory=list)
+    pos: int = 0  # offset of the field name
+
+@dataclass
+class RustVariant:
+    name: str
+    attrs: list = field(default_factory=list)
+    docs: list = field(default_factory=list)
+    pos: int = 0  # offset of the variant name
+
+@dataclass
+class RustItem:
+    """A braced struct or enum definition."""
+    name: str
+    is_pub: bool
+    attrs: list = field(default_factory=list)
+    docs: list = field(default_factory=list)  # (offset, text) per /// line
+    start: int = 0       # offset of the first doc comment/attribute, or `pub`/`struct`
+    pos: int = 0         # offset of the item name
+    body_start: int = 0  # offset just after the opening brace
+    body_end: int = 0    # offset of the closing brace
+
+    @property
+    def derives(self) -> list:
+        """Names listed in #[derive(...)] attributes."""
+        names = []
+        for attr in self.attrs:
+            if attr.startswith('derive(') and attr.endswith(')'):
+                names.extend(n.strip() for n in attr[7:-1].split(',') if n.strip())
+        return names
+
+@dataclass
+class RustStruct(RustItem):
+    fields: list = field(default_factory=list)
+
+@dataclass
+class RustEnum(RustItem):
+    variants: list = field(default_factory=list)
+
+@dataclass
+class LexedFile:
+    structs: list = field(default_factory=list)
+    enums: list = field(default_factory=list)
+
+class LineIndex:
+    """Line-start offset table for one file.
+
+    Built once per file; converts offsets to 1-based line and column numbers
+    with a binary search instead of re-splitting the text. For a bytes
+    source, offsets are byte offsets and columns still count characters.
+    """
+
+    def __init__(self, src):
+        starts = [0]
+        find = src.find
+        newline = syntax_of(src).newline
+        pos = find(newline)
+        while pos >= 0:
+            starts.append(pos + 1)
+            pos = find(newline, pos + 1)
+        self.starts = starts
+        self.src = None if isinstance(src, str) else src
+
+    def line(self, offset: int) -> int:
+        """1-based line containing offset."""
+        return bisect_right(self.starts, offset)
+
+    def position(self, offset: int) -> tuple:
+        """1-based (line, column) of offset."""
+        line = bisect_right(self.starts, offset)
+        start = self.starts[line - 1]
+        if self.src is not None:
+            prefix = self.src[start:offset]
+            if not prefix.isascii():
+                return line, len(prefix.decode('utf-8')) + 1
+        return line, offset - start + 1
+
+# Fast path for struct items: a plain header, then fields made of docs,
+# attributes, visibility, `name:` and a type. A type is scanned for brackets
+# and separators only; anything else in it sends the item down the token path.
+STRUCT_RE = re.compile(r"""
+    (?:(?P<pub>pub)(?P<restricted>[ \t\r\n]*\([^()/"'\#]*\))?[ \t\r\n]*)?
+    struct[ \t\r\n]+(?P<name>[A-Za-z_]\w*)[ \t\r\n]*
+    (?:<[^<>{}();/"'\#]*(?:<[^<>{}();/"'\#]*>[^<>{}();/"'\#]*)*>[ \t\r\n]*)?
+    \{
+""", re.VERBOSE)
+FIELD_RE = re.compile(r"""
+    [ \t\r\n]*(?:
+        (?P<doc>///(?!/)[^\n]*)
+      | (?P<attr>\#\[)
+      | (?P<vis>pub(?!\w)(?:[ \t\r\n]*\([^()/"'\#]*\))?)
+      | (?P<field>(?P<name>[A-Za-z_]\w*)[ \t\r\n]*:(?!:))
+      | (?P<comma>,)
+      | (?P<close>\})
+    )
+""", re.VERBOSE)
+TYPE_STOP_RE = re.compile(r"""(?P<arrow>->)|(?P<open>[(\[{<])|(?P<close>[)\]>])|(?P<brace>\})|(?P<comma>,)
+    |(?P<other>["'/\#])""", re.VERBOSE)
+
+# What skip_brackets() and skip_string() look for
+BRACKET_RE = re.compile(r'(?P<open>\[)|(?P<close>\])|(?P<quote>")')
+STRING_TAIL_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+def _bytes_pattern(pattern: str) -> bytes:
+    """Translate a str pattern for UTF-8 bytes.
+
+    \\w also matches non-ASCII bytes, so identifiers with non-ASCII letters
+    stay whole, and a lone punctuation or char-literal character may be a
+    multi-byte sequence, so it is never split.
+    """
+    out = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            escape = pattern[i:i + 2]
+            if escape == '\\w':
+                escape = '\\w\\x80-\\xff' if in_class else '[\\w\\x80-\\xff]'
+            out.append(escape)
+            i += 2
+            continue
+        if c == '[' and not in_class:
+            in_class = True
+            # A ] right after [ or [^ is a literal
+            j = i + 2 if pattern[i + 1:i + 2] == '^' else i + 1
+            if pattern[j:j + 1] == ']':
+                out.append(pattern[i:j + 1])
+                i = j + 1
+                continue
+        elif c == ']' and in_class:
+            in_class = False
+        out.append(c)
+        i += 1
+    utf8_char = r'[\xc0-\xff][\x80-\xbf]*'
+    translated = ''.join(out).replace(r"[^\\]'", rf"(?:{utf8_char}|[^\\])'").replace(
+        '(?P<punct>.)', f'(?P<punct>{utf8_char}|.)')
+    return translated.encode('ascii')
+
+def _bytes_twin(regex: re.Pattern) -> re.Pattern:
+    return re.compile(_bytes_pattern(regex.pattern), regex.flags & ~re.UNICODE)
+
+class Syntax:
+    """The patterns and literals for one kind of source: str, or UTF-8 bytes."""
+
+    def __init__(self, binary: bool):
+        self.binary = binary
+        compile_ = _bytes_twin if binary else (lambda regex: regex)
+        self.token = compile_(TOKEN_RE)
+        self.scan = compile_(SCAN_RE)
+        self.struct = compile_(STRUCT_RE)
+        self.field = compile_(FIELD_RE)
+        self.type_stop = compile_(TYPE_STOP_RE)
+        self.bracket = compile_(BRACKET_RE)
+        self.string_tail = compile_(STRING_TAIL_RE)
+        self.newline, self.block_open, self.block_close = (b'\n', b'/*', b'*/') if binary else ('\n', '/*', '*/')
+
+    def text(self, src, start: int, end: int) -> str:
+        """The source between two offsets, as str."""
+        return src[start:end].decode('utf-8') if self.binary else src[start:end]
+
+    def squeeze(self, src, start: int, end: int) -> str:
+        """The source between two offsets with whitespace runs collapsed to one space."""
+        return ' '.join(self.text(src, start, end).split())
+
+TEXT = Syntax(binary=False)
+UTF8 = Syntax(binary=True)
+
+def syntax_of(src) -> Syntax:
+    return TEXT if isinstance(src, str) else UTF8
+
+def tokenize(src, pos: int = 0, item: bool = False) -> list:
+    """Split Rust source into (kind, text, start, end) tokens, starting at pos.
+
+    With item=True, stop after the `}` that closes the first bracketed group,
+    or at a `;` outside brackets: the extent of an item starting at pos.
+    """
+    tokens = []
+    append = tokens.append
+    syntax = syntax_of(src)
+    binary = syntax.binary
+    match = syntax.token.match
+    n = len(src)
+    i = pos
+    depth = 0
+
+    while i < n:
+        m = match(src, i)
+        group = m.lastgroup
+        end = m.end()
+
+        if group == 'ws':
+            pass
+        elif group == 'ident':
+            append((IDENT, m.group().decode('utf-8') if binary else m.group(), i, end))
+        elif group == 'punct':
+            text = m.group().decode('utf-8') if binary else m.group()
+            append((PUNCT, text, i, end))
+            if item:
+                if text in '([{':
+                    depth += 1
+                elif text in ')]}':
+                    depth -= 1
+                    if depth == 0 and text == '}':
+                        break
+                elif text == ';' and depth == 0:
+                    break
+        elif group == 'doc':
+            append((DOC, syntax.text(src, i + 3, end), i, end))
+        elif group == 'attr':
+            j = end - 1
+            end = skip_brackets(src, j)
+            if m.group('inner'):
+                append((COMMENT, '', i, end))
+            else:
+                append((ATTR, syntax.squeeze(src, j + 1, end - 1), i, end))
+        elif group == 'comment':
+            append((COMMENT, '', i, end))
+        elif group == 'block':
+            end = skip_block_comment(src, i)
+            append((COMMENT, '', i, end))
+        elif group == 'lifetime':
+            append((LIFETIME, m.group().decode('utf-8') if binary else m.group(), i, end))
+        elif group == 'rawident':
+            append((IDENT, m.group('rawname').decode('utf-8') if binary else m.group('rawname'), i, end))
+        else:
+            # string, raw, bytechar, char, number
+            append((LITERAL, '', i, end))
+        i = end
+
+    return tokens
+
+def skip_string(src, i: int) -> int:
+    """Return the offset after a "..." literal whose body starts at i."""
+    m = syntax_of(src).string_tail.match(src, i)
+    return m.end() if m else len(src)
+
+def skip_block_comment(src, i: int) -> int:
+    """Return the offset after a (possibly nested) /* */ comment at i."""
+    syntax = syntax_of(src)
+    depth = 1
+    j = i + 2
+    while depth:
+        close = src.find(syntax.block_close, j)
+        if close < 0:
+            return len(src)
+        nested = src.find(syntax.block_open, j, close)
+        if nested >= 0:
+            depth += 1
+            j = nested + 2
+        else:
+            depth -= 1
+            j = close + 2
+    return j
+
+def skip_brackets(src, i: int) -> int:
+    """Return the offset after the [...] group opening at i, skipping strings."""
+    search = syntax_of(src).bracket.search
+    depth = 0
+    while True:
+        m = search(src, i)
+        if m is None:
+            return len(src)
+        group = m.lastgroup
+        i = m.end()
+        if group == 'open':
+            depth += 1
+        elif group == 'close':
+            depth -= 1
+            if depth == 0:
+                return i
+        else:
+            i = skip_string(src, i)
+
+def lex_file(src) -> LexedFile:
+    """Lex a Rust source file and collect its struct and enum items in one sweep.
+
+    src is str, or UTF-8 bytes/mmap, in which case offsets are byte offsets.
+    """
+    lexed = LexedFile()
+    attrs = []
+    docs = []
+    item_start = None
+    syntax = syntax_of(src)
+    scan = syntax.scan.finditer
+    n = len(src)
+    pos = 0
+
+    # Attributes and block comments nest, so the scan restarts after skipping them
+    while pos < n:
+        for m in scan(src, pos):
+            group = m.lastgroup
+            if group == 'ws':
+                continue
+            if group == 'sep' or group == 'keyword':
+                attrs, docs, item_start = [], [], None
+                continue
+
+            start, end = m.span()
+            if group == 'doc':
+                docs.append((start, syntax.text(src, start + 3, end)))
+                item_start = start if item_start is None else item_start
+            elif group == 'comment':
+                # A plain comment separates doc comments from the item below
+                docs = []
+            elif group == 'attr':
+                j = end - 1
+                pos = skip_brackets(src, j)
+                if m.group('inner'):
+                    docs = []
+                else:
+                    attrs.append(syntax.squeeze(src, j + 1, pos - 1))
+                    item_start = start if item_start is None else item_start
+                break
+            elif group == 'block':
+                pos = skip_block_comment(src, start)
+                docs = []
+                break
+            else:
+                # item, or a pub(...) whose parens hold a comment or literal
+                item, pos = lex_item(src, start)
+                if item is None:
+                    attrs, docs, item_start = [], [], None
+                    continue
+                item.attrs = attrs
+                item.docs = docs
+                item.start = start if item_start is None else item_start
+                if isinstance(item, RustStruct):
+                    lexed.structs.append(item)
+                else:
+                    lexed.enums.append(item)
+                attrs, docs, item_start = [], [], None
+                break
+        else:
+            break
+
+    return lexed
+
+def lex_item(src, pos: int):
+    """Parse the struct or enum whose header starts at pos.
+
+    Returns (item, offset after its closing brace), or (None, None). Only the
+    item's own tokens are produced; if the parse needed more than that (a
+    brace in a const generic, say), the rest of the file is tokenized.
+    """
+    item = scan_struct(src, pos)
+    if item is not None:
+        return item, item.body_end + 1
+
+    tokens = tokenize(src, pos, item=True)
+    item, k = parse_item(src, tokens, 0)
+    ran_out = k > len(tokens) if item is not None else k > 0
+    if ran_out and tokens[-1][3] < len(src):
+        tokens = tokenize(src, pos)
+        item, k = parse_item(src, tokens, 0)
+    if item is None:
+        return None, None
+    return item, tokens[k - 1][3] if k <= len(tokens) else len(src)
+
+def scan_struct(src, pos: int):
+    """Parse a plain struct at pos without tokenizing it, or return None.
+
+    None means the item isn't a braced struct or contains something only the
+    token path handles; the result is the same as parse_item()'s either way.
+    """
+    syntax = syntax_of(src)
+    header = syntax.struct.match(src, pos)
+    if header is None:
+        return None
+    item = RustStruct(name=syntax.text(src, *header.span('name')), is_pub=bool(header.group('pub')) and not header.group('restricted'),
+                      pos=header.start('name'), body_start=header.end())
+    fields = item.fields
+    attrs = []
+    docs = []
+    match = syntax.field.match
+    i = header.end()
+
+    while True:
+        m = match(src, i)
+        if m is None:
+            return None
+        group = m.lastgroup
+        i = m.end()
+        if group == 'field':
+            type_start = i
+            stop = scan_type_text(src, i)
+            if stop is None:
+                return None
+            stop, at_comma = stop
+            fields.append(RustField(name=syntax.text(src, *m.span('name')), ty=syntax.squeeze(src, type_start, stop),
+                                    attrs=attrs, docs=docs, pos=m.start('name')))
+            attrs, docs = [], []
+            i = stop + 1 if at_comma else stop
+        elif group == 'doc':
+            docs.append(syntax.text(src, m.start(group) + 3, i).strip())
+        elif group == 'attr':
+            j = i - 1
+            i = skip_brackets(src, j)
+            attrs.append(syntax.squeeze(src, j + 1, i - 1))
+        elif group == 'close':
+            item.body_end = i - 1
+            return item
+        # vis and comma carry nothing
+
+def scan_type_text(src, i: int):
+    """(offset, True if a comma) of the `,` or `}` ending a field type that starts at i.
+
+    Brackets nest as in scan_type(); returns None if the type contains a
+    literal, lifetime, comment or attribute, or never ends.
+    """
+    depth = 0
+    search = syntax_of(src).type_stop.search
+    while True:
+        m = search(src, i)
+        if m is None:
+            return None
+        group = m.lastgroup
+        i = m.end()
+        if group == 'open':
+            depth += 1
+        elif group == 'close' or group == 'brace':
+            if depth:
+                depth -= 1
+            elif group == 'brace':
+                return i - 1, False
+        elif group == 'comma':
+            if not depth:
+                return i - 1, True
+        elif group == 'other':
+            return None
+
+def parse_item(src, tokens: list, k: int):
+    """Parse a braced struct or enum starting at token k.
+
+    Returns (RustStruct or RustEnum, index after the closing brace), or
+    (None, k) when the tokens at k aren't a braced struct/enum definition
+    ((None, len(tokens)) if the tokens ran out before that was clear).
+    """
+    n = len(tokens)
+    is_pub = False
+    j = k
+    if tokens[j][1] == 'pub':
+        j += 1
+        if j < n and tokens[j][1] == '(':
+            # pub(crate) and friends are not public API
+            while j < n and tokens[j][1] != ')':
+                j += 1
+            j += 1
+        else:
+            is_pub = True
+    if j + 1 >= n or tokens[j][1] not in ('struct', 'enum') or tokens[j + 1][0] != IDENT:
+        return None, k
+    keyword = tokens[j][1]
+    name = tokens[j + 1][1]
+    name_pos = tokens[j + 1][2]
+    j += 2
+
+    # Skip generics and where clauses up to the body
+    depth = 0
+    while j < n:
+        kind, text, _, _ = tokens[j]
+        if kind == PUNCT:
+            if text == '<':
+                depth += 1
+            elif text == '>':
+                depth -= 1
+            elif depth == 0 and text in ';(':
+                return None, k  # tuple or unit struct
+            elif depth == 0 and text == '{':
+                break
+        j += 1
+    if j >= n:
+        return None, n
+
+    if keyword == 'struct':
+        item = RustStruct(name=name, is_pub=is_pub, pos=name_pos, body_start=tokens[j][3])
+        j = parse_fields(src, tokens, j + 1, item.fields)
+    else:
+        item = RustEnum(name=name, is_pub=is_pub, pos=name_pos, body_start=tokens[j][3])
+        j = parse_variants(tokens, j + 1, item.variants)
+    item.body_end = tokens[j][2] if j < n else len(src)
+    return item, j + 1
+
+def parse_variants(tokens: list, j: int, variants: list) -> int:
+    """Collect variants of an enum body; returns the index of the closing brace."""
+    n = len(tokens)
+    attrs = []
+    docs = []
+
+    while j < n:
+        kind, text, start, end = tokens[j]
+
+        if kind == PUNCT and text == '}':
+            return j
+        if kind == ATTR:
+            attrs.append(text)
+        elif kind == DOC:
+            docs.append(text.strip())
+        elif kind == IDENT:
+            variants.append(RustVariant(name=text, attrs=attrs, docs=docs, pos=start))
+            attrs, docs = [], []
+            j = skip_variant_payload(tokens, j + 1)
+            continue
+        j += 1
+
+    return j
+
+def skip_variant_payload(tokens: list, j: int) -> int:
+    """Skip a variant's fields/discriminant; returns the index after its comma,
+    or of the enum's closing brace."""
+    n = len(tokens)
+    depth = 0
+
+    while j < n:
+        kind, text, _, _ = tokens[j]
+        if kind == PUNCT:
+            if text in '([{':
+                depth += 1
+            elif text in ')]}':
+                if depth == 0:
+                    return j
+                depth -= 1
+            elif text == ',' and depth == 0:
+                return j + 1
+        j += 1
+
+    return j
+
+def parse_fields(src, tokens: list, j: int, fields: list) -> int:
+    """Collect fields of a struct body; returns the index of the closing brace."""
+    n = len(tokens)
+    attrs = []
+    docs = []
+
+    while j < n:
+        kind, text, start, end = tokens[j]
+
+        if kind == PUNCT and text == '}':
+            return j
+        if kind == ATTR:
+            attrs.append(text)
+            j += 1
+            continue
+        if kind == DOC:
+            docs.append(text.strip())
+            j += 1
+            continue
+        if kind == IDENT and text == 'pub':
+            j += 1
+            if j < n and tokens[j][1] == '(':
+                while j < n and tokens[j][1] != ')':
+                    j += 1
+                j += 1
+            continue
+
+        if (kind == IDENT and j + 1 < n and tokens[j + 1][1] == ':'
+                and not (j + 2 < n and tokens[j + 2][1] == ':' and tokens[j + 2][2] == tokens[j + 1][3])):
+            type_start = tokens[j + 1][3]
+            type_end, j = scan_type(tokens, j + 2)
+            ty = syntax_of(src).squeeze(src, type_start, type_end)
+            fields.append(RustField(name=text, ty=ty, attrs=attrs, docs=docs, pos=start))
+            attrs, docs = [], []
+            continue
+
+        j += 1
+
+    return j
+
+def scan_type(tokens: list, j: int):
+    """Scan a field type up to the next top-level comma or closing brace.
+
+    Returns (offset where the type ends, index of the next token to parse).
+    """
+    n = len(tokens)
+    depth = 0
+    type_end = tokens[j - 1][3]
+
+    while j < n:
+        kind, text, start, end = tokens[j]
+        if kind == PUNCT:
+            if text == '>' and j > 0 and tokens[j - 1][1] == '-' and tokens[j - 1][3] == start:
+                pass  # `->` in fn pointer types
+            elif text in OPENERS:
+                depth += 1
+            elif text in CLOSERS:
+                if depth == 0:
+                    if text == '}':
+                        return type_end, j  # closing brace of the struct body
+                else:
+                    depth -= 1
+            elif text == ',' and depth == 0:
+                return type_end, j + 1
+        if kind not in (COMMENT, DOC):
+            type_end = end
+        j += 1
+
+    return type_end, j
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Replay query traces against index_server.py and report request latency.
+
+Starts the server as a subprocess, waits for it to answer `initialize`, then
+sends the requests of a trace one at a time, waiting for each response, and
+reports round-trip latency percentiles per method next to the server's own
+handling time (from its `stats` method). Traces are files of JSON-RPC
+requests, one per line, as written by `index_server.py --record`; without
+one, --generate builds a synthetic editing session from the widgets,
+properties and values the server reports.
+
+Arguments after `--` are passed to the server, e.g. `-- --no-cache --backend mmap`.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+from pathlib import Path
+
+SERVER = Path(__file__).parent / "index_server.py"
+DEFAULT_OUTPUT = Path(__file__).parent / ".cache" / "server_benchmark.json"
+DOCUMENT_URI = "file:///benchmark/src/app.rs"
+
+class ServerProcess:
+    """index_server.py on the other end of a pipe."""
+
+    def __init__(self, server_args: list):
+        self.process = subprocess.Popen([sys.executable, str(SERVER), *server_args], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, text=True, bufsize=1)
+        self.next_id = 0
+
+    def send(self, request: dict) -> tuple:
+        """Send one request; returns (response or None for notifications, round-trip seconds)."""
+        started = time.perf_counter()
+        self.process.stdin.write(json.dumps(request) + '\n')
+        self.process.stdin.flush()
+        if 'id' not in request:
+            return None, 0.0
+        line = self.process.stdout.readline()
+        elapsed = time.perf_counter() - started
+        if not line:
+            raise RuntimeError(f"server exited with {self.process.wait()}")
+        response = json.loads(line)
+        if response.get('id') != request['id']:
+            raise RuntimeError(f"response {response.get('id')} to request {request['id']}")
+        return response, elapsed
+
+    def call(self, method: str, **params):
+        self.next_id += 1
+        response, _ = self.send({'jsonrpc': '2.0', 'id': f"bench-{self.next_id}", 'method': method, 'params': params})
+        if 'error' in response:
+            raise RuntimeError(f"{method}: {response['error']['message']}")
+        return response['result']
+
+    def close(self):
+        self.call('shutdown')
+        self.send({'jsonrpc': '2.0', 'method': 'exit'})
+        self.process.stdin.close()
+        self.process.wait()
+
+def generate_document(rng: random.Random, widgets: list, properties: dict, values: dict, blocks: int) -> str:
+    """A live_design! block nesting widgets and setting their properties."""
+    lines = ["use makepad_widgets::*;", "", "live_design! {", "    import makepad_widgets::base::*;", "",
+             "    App = {{App}} {", "        ui: <View> {"]
+    depth = 2
+    for i in range(blocks):
+        widget = rng.choice(widgets)
+        indent = '    ' * (depth + 1)
+        lines.append(f"{indent}item_{i} = <{widget}> {{")
+        for prop in rng.sample(properties[widget], min(3, len(properties[widget]))):
+            value = rng.choice(values[prop]) if values.get(prop) else "1.0"
+            lines.append(f"{indent}    {prop}: {value}")
+        if depth < 8 and rng.random() < 0.5:
+            depth += 1
+        else:
+            lines.append(f"{indent}}}")
+    while depth >= 2:
+        lines.append(f"{'    ' * (depth + 1)}}}")
+        depth -= 1
+    lines.extend(["}", "", "fn main() {}", ""])
+    return '\n'.join(lines)
+
+def generate_trace(server: ServerProcess, requests: int, seed: int) -> list:
+    """Build a synthetic editing session from the server's own tables."""
+    rng = random.Random(seed)
+    widgets = [item['label'] for item in server.call('complete', kind='widget', limit=1_000_000)['items']]
+    if not widgets:
+        raise RuntimeError("the server indexed no widgets")
+    properties = {
+        widget: [item['label'] for item in server.call('complete', kind='property', widget=widget, limit=1_000_000)['items']]
+        for widget in widgets
+    }
+    values = {}
+    for names in properties.values():
+        for prop in names:
+            if prop not in values:
+                values[prop] = [item['label'] for item in server.call('complete', kind='value', property=prop)['items']]
+    all_properties = sorted({prop for names in properties.values() for prop in names})
+    all_values = sorted({value for found in values.values() for value in found})
+    text = generate_document(rng, widgets, properties, values, blocks=max(10, requests // 20))
+    offsets = range(len(text))
+
+    def symbol():
+        kind = rng.random()
+        if kind < 0.3:
+            return {'name': rng.choice(widgets)}
+        if kind < 0.8 or not all_values:
+            return {'name': rng.choice(all_properties), 'widget': rng.choice(widgets)}
+        prop = rng.choice([prop for prop in all_properties if values[prop]])
+        return {'name': rng.choice(values[prop]), 'property': prop, 'widget': rng.choice(widgets)}
+
+    def prefix(name):
+        return name[:rng.randint(0, min(3, len(name)))]
+
+    trace = [{'method': 'open', 'params': {'uri': DOCUMENT_URI, 'text': text}}]
+    for _ in range(requests):
+        kind = rng.random()
+        if kind < 0.35:
+            trace.append({'method': 'context', 'params': {'uri': DOCUMENT_URI, 'offset': rng.choice(offsets)}})
+        elif kind < 0.55:
+            trace.append({'method': 'definition', 'params': symbol()})
+        elif kind < 0.7:
+            trace.append({'method': 'hover', 'params': symbol()})
+        elif kind < 0.8:
+            trace.append({'method': 'complete', 'params': {'kind': 'widget', 'prefix': prefix(rng.choice(widgets))}})
+        elif kind < 0.95:
+            widget = rng.choice(widgets)
+            name = rng.choice(properties[widget]) if properties[widget] else ''
+            trace.append({'method': 'complete', 'params': {'kind': 'property', 'widget': widget, 'prefix': prefix(name)}})
+        else:
+            prop = rng.choice(all_properties)
+            trace.append({'method': 'complete', 'params': {'kind': 'value', 'property': prop}})
+    return [{'jsonrpc': '2.0', 'id': i, **request} for i, request in enumerate(trace, 1)]
+
+def load_trace(path: Path) -> list:
+    """Requests of a recorded trace, minus the lifecycle methods the benchmark sends itself."""
+    requests = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    return [request for request in requests if request.get('method') not in ('initialize', 'stats', 'shutdown', 'exit')]
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def replay(server: ServerProcess, trace: list, repeat: int) -> dict:
+    """Send the trace repeat times; returns round-trip seconds per method."""
+    latencies = {}
+    errors = 0
+    for _ in range(repeat):
+        for request in trace:
+            response, elapsed = server.send(request)
+            if response is None:
+                continue
+            if 'error' in response:
+                errors += 1
+            latencies.setdefault(request['method'], []).append(elapsed)
+    if errors:
+        print(f"Warning: {errors} requests returned errors")
+    return latencies
+
+def summarize(latencies: dict, server_stats: dict) -> dict:
+    results = {}
+    print(f"  {'method':<12} {'requests':>8} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'server':>9}  (us)")
+    for method, values in sorted(latencies.items()):
+        values.sort()
+        handled = server_stats.get(method, {}).get('mean_seconds', 0.0)
+        results[method] = {
+            'requests': len(values),
+            'p50_seconds': percentile(values, 0.5),
+            'p90_seconds': percentile(values, 0.9),
+            'p99_seconds': percentile(values, 0.99),
+            'max_seconds': values[-1],
+            'server_mean_seconds': handled,
+        }
+        r = results[method]
+        print(f"  {method:<12} {len(values):>8} {r['p50_seconds'] * 1e6:9.1f} {r['p90_seconds'] * 1e6:9.1f} "
+              f"{r['p99_seconds'] * 1e6:9.1f} {r['max_seconds'] * 1e6:9.1f} {handled * 1e6:9.1f}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a query trace against index_server.py and report latency.",
+                                     epilog="Arguments after -- are passed to index_server.py.")
+    parser.add_argument("--trace", type=Path, help="recorded trace to replay (index_server.py --record)")
+    parser.add_argument("--generate", type=int, default=2000, metavar="N",
+                        help="requests in the synthetic trace used without --trace (default: 2000)")
+    parser.add_argument("--save-trace", type=Path, metavar="FILE", help="also write the replayed trace here")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the synthetic trace")
+    parser.add_argument("--repeat", type=int, default=3, help="times to replay the trace")
+    parser.add_argument("--output", "-o", type=Path, default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    args, server_args = parser.parse_known_args()
+    if server_args[:1] == ['--']:
+        server_args = server_args[1:]
+
+    started = time.perf_counter()
+    server = ServerProcess(server_args)
+    try:
+        status = server.call('initialize')
+        startup = time.perf_counter() - started
+        print(f"Server indexed {status['files']} files ({status['widgets']} widgets, "
+              f"{status['properties']} properties) and answered in {startup:.2f}s")
+
+        trace = load_trace(args.trace) if args.trace else generate_trace(server, args.generate, args.seed)
+        if args.save_trace:
+            args.save_trace.write_text(''.join(json.dumps(request) + '\n' for request in trace))
+        print(f"Replaying {len(trace)} requests x {args.repeat}")
+        latencies = replay(server, trace, args.repeat)
+        results = summarize(latencies, server.call('stats'))
+    finally:
+        server.close()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "trace": str(args.trace) if args.trace else f"generated:{args.generate}:{args.seed}",
+        "startup_seconds": startup,
+        "status": status,
+        "methods": results,
+    }, indent=2))
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
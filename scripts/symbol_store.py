@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+SQLite symbol store: the extracted index as queryable tables.
+
+Every indexed version gets its files, structs, fields, Live enums and
+variants as rows, plus the widgets of that version with their effective
+(inherited) property sets, a `locations` view over every declaration and an
+FTS5 table over names and doc comments. Questions such as "which widgets
+have a draw_icon?" or "every field of type DrawText" become one indexed
+query instead of a regeneration and a grep:
+
+    symbol_store.py --widgets-with draw_icon
+    symbol_store.py --fields-of-type DrawText
+    symbol_store.py --search "scroll bar"
+
+Writes happen in a single transaction with bulk inserts. Rows are keyed by
+file, so updating a version only deletes and re-inserts the files whose size
+or mtime changed. Widget property sets depend on every file, so they are
+resolved from the in-memory index and compared by digest; only widgets
+whose set changed are rewritten.
+"""
+
+import os
+import time
+import random
+import shutil
+import hashlib
+import sqlite3
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from makepad_index import (REGISTRY_CRATE_RE, MakepadIndex, add_index_arguments, base_type_name, build_index,
+                           index_from_args, refresh_index, value_type)
+
+DEFAULT_PATH = Path(__file__).parent / ".cache" / "symbols.sqlite"
+
+# Bump when the schema changes; stores written by another version are rebuilt
+STORE_VERSION = 1
+# PRAGMA application_id of stores this module created ("MKPD"); only those are ever rebuilt
+STORE_APPLICATION_ID = 0x4D4B5044
+
+SCHEMA = """
+CREATE TABLE versions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    root TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    version_id INTEGER NOT NULL REFERENCES versions ON DELETE CASCADE,
+    path TEXT NOT NULL,  -- relative to the version's root
+    crate TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    UNIQUE (version_id, path)
+);
+CREATE TABLE structs (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL
+);
+CREATE TABLE fields (
+    id INTEGER PRIMARY KEY,
+    struct_id INTEGER NOT NULL REFERENCES structs ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,       -- live, or the base attribute: deref, walk, layout
+    type TEXT NOT NULL,
+    base_type TEXT NOT NULL,  -- type name without paths and Option<>/Box<>
+    default_value TEXT,
+    doc TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL
+);
+CREATE TABLE enums (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    default_variant TEXT,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL
+);
+CREATE TABLE variants (
+    id INTEGER PRIMARY KEY,
+    enum_id INTEGER NOT NULL REFERENCES enums ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    pick INTEGER NOT NULL,
+    is_default INTEGER NOT NULL,
+    value TEXT,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL
+);
+CREATE TABLE widgets (
+    version_id INTEGER NOT NULL REFERENCES versions ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    struct_id INTEGER NOT NULL,  -- structs.id; kept in step by write_widgets rather than by cascade
+    digest TEXT NOT NULL,        -- of the widget's widget_properties rows
+    PRIMARY KEY (version_id, name)
+) WITHOUT ROWID;
+CREATE TABLE widget_properties (
+    version_id INTEGER NOT NULL REFERENCES versions ON DELETE CASCADE,
+    widget TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    origin TEXT NOT NULL,  -- struct that declares the field
+    via TEXT NOT NULL,     -- base fields followed to reach it, e.g. view.walk
+    PRIMARY KEY (version_id, widget, name, origin, via)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE docs USING fts5(
+    name, doc, kind UNINDEXED, version_id UNINDEXED, file_id UNINDEXED, line UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+
+CREATE INDEX files_version ON files (version_id);
+CREATE INDEX structs_name ON structs (name);
+CREATE INDEX structs_file ON structs (file_id);
+CREATE INDEX fields_name ON fields (name);
+CREATE INDEX fields_base_type ON fields (base_type);
+CREATE INDEX fields_struct ON fields (struct_id);
+CREATE INDEX enums_name ON enums (name);
+CREATE INDEX enums_file ON enums (file_id);
+CREATE INDEX variants_name ON variants (name);
+CREATE INDEX variants_enum ON variants (enum_id);
+CREATE INDEX widget_properties_name ON widget_properties (name, version_id);
+
+CREATE VIEW locations (kind, name, parent, version_id, path, line, column) AS
+    SELECT 'struct', s.name, NULL, f.version_id, f.path, s.line, s.column
+    FROM structs s JOIN files f ON f.id = s.file_id
+    UNION ALL
+    SELECT 'field', fl.name, s.name, f.version_id, f.path, fl.line, fl.column
+    FROM fields fl JOIN structs s ON s.id = fl.struct_id JOIN files f ON f.id = s.file_id
+    UNION ALL
+    SELECT 'enum', e.name, NULL, f.version_id, f.path, e.line, e.column
+    FROM enums e JOIN files f ON f.id = e.file_id
+    UNION ALL
+    SELECT 'variant', v.name, e.name, f.version_id, f.path, v.line, v.column
+    FROM variants v JOIN enums e ON e.id = v.enum_id JOIN files f ON f.id = e.file_id;
+"""
+
+def open_store(path: Path = DEFAULT_PATH, readonly: bool = False) -> sqlite3.Connection:
+    """Open the store, creating it (or recreating one of ours with another STORE_VERSION).
+
+    With readonly, the file is opened read-only and must be a store of the
+    current version. Raises ValueError for a database this module did not
+    create, which is never modified.
+    """
+    if readonly:
+        conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        if store_version(conn) != STORE_VERSION:
+            conn.close()
+            raise ValueError(f"{path} is not a version {STORE_VERSION} symbol store")
+        return conn
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    version = store_version(conn)
+    if version is None:
+        conn.close()
+        raise ValueError(f"{path} is not a symbol store; refusing to overwrite it")
+    if version != STORE_VERSION:
+        if conn.execute("SELECT count(*) FROM sqlite_master").fetchone()[0]:
+            conn.close()
+            for stale in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+                stale.unlink(missing_ok=True)
+            conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA application_id = {STORE_APPLICATION_ID}")
+        conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+def store_version(conn: sqlite3.Connection) -> Optional[int]:
+    """STORE_VERSION a store was written with (0 for an empty database), None for any other database."""
+    if conn.execute("PRAGMA application_id").fetchone()[0] == STORE_APPLICATION_ID:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    return None if conn.execute("SELECT count(*) FROM sqlite_master").fetchone()[0] else 0
+
+def version_name(root: Path) -> str:
+    """Default version label: the crate version of a registry root, else the directory name."""
+    registry = REGISTRY_CRATE_RE.match(root.name)
+    return registry.group(2) if registry else root.name
+
+def write_version(conn: sqlite3.Connection, version: str, index: MakepadIndex) -> dict:
+    """Insert or update one version in a single transaction.
+
+    Only files whose size or mtime changed since the version was last written
+    (or that are new or gone) have their rows replaced. Returns counts of the
+    files written and removed and the seconds taken.
+    """
+    started = time.perf_counter()
+    prefix = str(index.root).rstrip(os.sep) + os.sep
+    paths = {f.path: relative_path(f.path, prefix) for f in index.files}
+    current = {paths[f.path]: f for f in index.files}
+    with conn:
+        row = conn.execute("SELECT id FROM versions WHERE name = ?", (version,)).fetchone()
+        if row is None:
+            version_id = conn.execute("INSERT INTO versions (name, root, fingerprint) VALUES (?, ?, ?)",
+                                      (version, str(index.root), index.fingerprint)).lastrowid
+        else:
+            version_id = row[0]
+            conn.execute("UPDATE versions SET root = ?, fingerprint = ? WHERE id = ?",
+                         (str(index.root), index.fingerprint, version_id))
+
+        stored = {path: (file_id, size, mtime_ns) for path, file_id, size, mtime_ns in conn.execute(
+            "SELECT path, id, size, mtime_ns FROM files WHERE version_id = ?", (version_id,))}
+        stale = [file_id for path, (file_id, size, mtime_ns) in stored.items()
+                 if path not in current or (current[path].size, current[path].mtime_ns) != (size, mtime_ns)]
+        changed = [(path, f) for path, f in current.items()
+                   if path not in stored or stored[path][1:] != (f.size, f.mtime_ns)]
+
+        if stale or changed:
+            delete_files(conn, stale)
+            insert_files(conn, version_id, changed)
+            write_widgets(conn, version_id, index, paths)
+    return {"written": len(changed), "removed": len(stored.keys() - current.keys()),
+            "seconds": time.perf_counter() - started}
+
+def relative_path(path: str, prefix: str) -> str:
+    """path relative to the directory prefix (which ends in a separator), with forward slashes."""
+    rel = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, prefix)
+    return rel.replace(os.sep, '/')
+
+def delete_files(conn: sqlite3.Connection, file_ids: list):
+    """Delete files and, by cascade, their structs, fields, enums and variants."""
+    if not file_ids:
+        return
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS stale (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.stale")
+    conn.executemany("INSERT INTO temp.stale VALUES (?)", [(file_id,) for file_id in file_ids])
+    conn.execute("DELETE FROM docs WHERE file_id IN (SELECT id FROM temp.stale)")
+    conn.execute("DELETE FROM files WHERE id IN (SELECT id FROM temp.stale)")
+
+def next_id(conn: sqlite3.Connection, table: str) -> int:
+    return conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+def insert_files(conn: sqlite3.Connection, version_id: int, files: list):
+    """Bulk-insert the rows of (relative path, FileIndex) pairs, assigning ids up front."""
+    file_id, struct_id, field_id = next_id(conn, "files"), next_id(conn, "structs"), next_id(conn, "fields")
+    enum_id, variant_id = next_id(conn, "enums"), next_id(conn, "variants")
+    file_rows, struct_rows, field_rows, enum_rows, variant_rows, doc_rows = [], [], [], [], [], []
+
+    for path, f in files:
+        file_rows.append((file_id, version_id, path, f.crate, f.size, f.mtime_ns))
+        for struct in f.structs:
+            struct_rows.append((struct_id, file_id, struct.name, struct.doc, struct.line, struct.column))
+            doc_rows.append((struct.name, struct.doc, 'struct', version_id, file_id, struct.line))
+            for p in struct.properties:
+                field_rows.append((field_id, struct_id, p.name, 'live', p.prop_type,
+                                   base_type_name(value_type(p.prop_type)), p.default, p.doc, p.line, p.column))
+                doc_rows.append((f"{struct.name}.{p.name}", p.doc, 'field', version_id, file_id, p.line))
+                field_id += 1
+            for b in struct.bases:
+                field_rows.append((field_id, struct_id, b.name, b.kind, b.base_type, base_type_name(b.base_type),
+                                   None, '', b.line, b.column))
+                field_id += 1
+            struct_id += 1
+        for enum in f.enums:
+            enum_rows.append((enum_id, file_id, enum.name, enum.doc, enum.default, enum.line, enum.column))
+            doc_rows.append((enum.name, enum.doc, 'enum', version_id, file_id, enum.line))
+            for v in enum.variants:
+                variant_rows.append((variant_id, enum_id, v.name, v.doc, v.pick, v.is_default, v.value,
+                                     v.line, v.column))
+                doc_rows.append((f"{enum.name}::{v.name}", v.doc, 'variant', version_id, file_id, v.line))
+                variant_id += 1
+            enum_id += 1
+        file_id += 1
+
+    conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)", file_rows)
+    conn.executemany("INSERT INTO structs VALUES (?, ?, ?, ?, ?, ?)", struct_rows)
+    conn.executemany("INSERT INTO fields VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", field_rows)
+    conn.executemany("INSERT INTO enums VALUES (?, ?, ?, ?, ?, ?, ?)", enum_rows)
+    conn.executemany("INSERT INTO variants VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", variant_rows)
+    conn.executemany("INSERT INTO docs (name, doc, kind, version_id, file_id, line) VALUES (?, ?, ?, ?, ?, ?)",
+                     doc_rows)
+
+def write_widgets(conn: sqlite3.Connection, version_id: int, index: MakepadIndex, paths: dict):
+    """Bring a version's widgets and their effective property sets up to date.
+
+    Which struct is the widget of a name (later definitions win) and what it
+    inherits depend on every file, so the sets are resolved from the whole
+    index. Each widget row keeps a digest of its set, and only widgets whose
+    digest changed have their property rows rewritten.
+    """
+    widgets = index.widgets
+    struct_ids = {
+        (path, line, name): struct_id for path, line, name, struct_id in conn.execute(
+            "SELECT f.path, s.line, s.name, s.id FROM structs s JOIN files f ON f.id = s.file_id WHERE f.version_id = ?",
+            (version_id,))
+    }
+    current = {}
+    for file_index, struct in index.iter_structs():
+        if widgets.get(struct.name) is struct:
+            current[struct.name] = struct_ids[paths[file_index.path], struct.line, struct.name]
+    properties = {}
+    for name, resolved in index.resolved_widgets.items():
+        rows = list(dict.fromkeys((entry.property.name, entry.property.prop_type, entry.origin, '.'.join(entry.via))
+                                  for entry in resolved))
+        properties[name] = rows
+        current[name] = (current[name], hashlib.sha1(repr(rows).encode()).hexdigest())
+
+    stored = {name: (struct_id, digest) for name, struct_id, digest in conn.execute(
+        "SELECT name, struct_id, digest FROM widgets WHERE version_id = ?", (version_id,))}
+    changed = [name for name in stored.keys() | current.keys() if stored.get(name) != current.get(name)]
+    rewritten = [name for name in changed if stored.get(name, (0, None))[1] != current.get(name, (0, None))[1]]
+    conn.executemany("DELETE FROM widgets WHERE version_id = ? AND name = ?", [(version_id, name) for name in changed])
+    conn.executemany("DELETE FROM widget_properties WHERE version_id = ? AND widget = ?",
+                     [(version_id, name) for name in rewritten])
+    conn.executemany("INSERT INTO widgets VALUES (?, ?, ?, ?)",
+                     [(version_id, name, *current[name]) for name in changed if name in current])
+    conn.executemany("INSERT INTO widget_properties VALUES (?, ?, ?, ?, ?, ?)", [
+        (version_id, name, *row) for name in rewritten if name in current for row in properties[name]
+    ])
+
+def version_filter(column: str, version: Optional[str]) -> tuple:
+    """SQL condition and parameters restricting column (a version id) to one version name, if given."""
+    if version is None:
+        return "1", ()
+    return f"{column} = (SELECT id FROM versions WHERE name = ?)", (version,)
+
+def widgets_with(conn: sqlite3.Connection, name: str, version: Optional[str] = None) -> list:
+    """(version, widget, type, origin, via) of every widget whose effective property set has name."""
+    where, params = version_filter("wp.version_id", version)
+    return conn.execute(f"""
+        SELECT v.name, wp.widget, wp.type, wp.origin, wp.via
+        FROM widget_properties wp JOIN versions v ON v.id = wp.version_id
+        WHERE wp.name = ? AND {where} ORDER BY v.id, wp.widget""", (name, *params)).fetchall()
+
+def fields_of_type(conn: sqlite3.Connection, type_name: str, version: Optional[str] = None) -> list:
+    """(version, struct, field, type, path, line) of every field whose type is type_name (Option<> included)."""
+    where, params = version_filter("f.version_id", version)
+    return conn.execute(f"""
+        SELECT v.name, s.name, fl.name, fl.type, f.path, fl.line
+        FROM fields fl JOIN structs s ON s.id = fl.struct_id JOIN files f ON f.id = s.file_id
+        JOIN versions v ON v.id = f.version_id
+        WHERE fl.base_type = ? AND {where} ORDER BY v.id, s.name, fl.line""", (type_name, *params)).fetchall()
+
+def locate(conn: sqlite3.Connection, name: str, version: Optional[str] = None) -> list:
+    """(version, kind, name, parent, path, line, column) of every declaration called name."""
+    where, params = version_filter("l.version_id", version)
+    return conn.execute(f"""
+        SELECT v.name, l.kind, l.name, l.parent, l.path, l.line, l.column
+        FROM locations l JOIN versions v ON v.id = l.version_id
+        WHERE l.name = ? AND {where} ORDER BY v.id, l.kind, l.path""", (name, *params)).fetchall()
+
+def search_docs(conn: sqlite3.Connection, query: str, version: Optional[str] = None, limit: int = 20) -> list:
+    """(version, kind, name, snippet, path, line) of the best FTS5 matches for query over names and docs."""
+    where, params = version_filter("d.version_id", version)
+    return conn.execute(f"""
+        SELECT v.name, d.kind, d.name, snippet(docs, 1, '[', ']', '...', 12), f.path, d.line
+        FROM docs d JOIN versions v ON v.id = d.version_id JOIN files f ON f.id = d.file_id
+        WHERE docs MATCH ? AND {where} ORDER BY rank LIMIT ?""", (query, *params, limit)).fetchall()
+
+def print_rows(rows: list, headers: tuple):
+    """Print query results as aligned columns."""
+    if not rows:
+        print("No matches")
+        return
+    cells = [headers] + [tuple('' if value is None else str(value) for value in row) for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for row in cells:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+    print(f"({len(rows)} rows)")
+
+def run_query(conn: sqlite3.Connection, args: argparse.Namespace):
+    """Answer the query options of the command line."""
+    try:
+        if args.widgets_with:
+            print_rows(widgets_with(conn, args.widgets_with, args.version), ("version", "widget", "type", "origin", "via"))
+        if args.fields_of_type:
+            print_rows(fields_of_type(conn, args.fields_of_type, args.version),
+                       ("version", "struct", "field", "type", "path", "line"))
+        if args.locate:
+            print_rows(locate(conn, args.locate, args.version),
+                       ("version", "kind", "name", "parent", "path", "line", "column"))
+        if args.search:
+            print_rows(search_docs(conn, args.search, args.version, args.limit),
+                       ("version", "kind", "name", "doc", "path", "line"))
+        if args.sql:
+            cursor = conn.execute(args.sql)
+            print_rows(cursor.fetchall(), tuple(column[0] for column in cursor.description or ()))
+    except sqlite3.Error as e:
+        raise SystemExit(f"Query failed: {e}")
+
+def benchmark(versions: int, files: int, queries: int = 500, seed: int = 0):
+    """Build a store of several synthetic versions, then time updates and each kind of query."""
+    from benchmark import generate_corpus
+
+    rng = random.Random(seed)
+    work = Path(tempfile.mkdtemp(prefix="makepad-store-"))
+    try:
+        indexes = []
+        for v in range(versions):
+            root = work / f"v{v}"
+            generate_corpus(root, files, structs=5, fields=20, doc_lines=4, nesting=2, pathological=False, seed=v)
+            indexes.append((f"0.{v}.0", build_index(root=root, crates=["widgets", "draw"])))
+        print(f"Generated {versions} versions of {files} files")
+
+        conn = open_store(work / "symbols.sqlite")
+        started = time.perf_counter()
+        for version, index in indexes:
+            write_version(conn, version, index)
+        build_seconds = time.perf_counter() - started
+        counts = {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                  for table in ("files", "structs", "fields", "widget_properties", "docs")}
+        print(f"Store written in {build_seconds:.2f}s: " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+
+        # A save in the newest version: rewrite a few files and update that version only
+        version, index = indexes[-1]
+        touched = rng.sample([f.path for f in index.files], 5)
+        for path in touched:
+            with open(path, 'a') as f:
+                f.write("\n/// Added in an edit\n#[derive(Live, LiveHook)]\npub struct Edited { #[live] pub extra: f64 }\n")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        refresh_index(index)
+        update = write_version(conn, version, index)
+        print(f"Incremental update: {update['written']} files rewritten in {update['seconds'] * 1000:.1f} ms "
+              f"(full version write {build_seconds / versions * 1000:.1f} ms)")
+
+        fresh = open_store(work / "fresh.sqlite")
+        write_version(fresh, version, index)
+        for query in ("SELECT kind, name, parent, path, line, column FROM locations WHERE {}",
+                      "SELECT widget, name, type, origin, via FROM widget_properties WHERE {}",
+                      "SELECT name, doc, kind, line FROM docs WHERE {}"):
+            where, params = version_filter("version_id", version)
+            rows = sorted(conn.execute(query.format(where), params))
+            assert rows == sorted(fresh.execute(query.format(where), params)), "incremental update differs"
+        fresh.close()
+
+        structs = [s.name for _, s in index.iter_structs()]
+        fields = sorted({p.name for _, s in index.iter_structs() for p in s.properties})
+        types = sorted({base_type_name(value_type(p.prop_type)) for _, s in index.iter_structs() for p in s.properties})
+        cases = [
+            ("widgets_with", lambda: widgets_with(conn, rng.choice(fields))),
+            ("widgets_with (1 version)", lambda: widgets_with(conn, rng.choice(fields), version)),
+            ("fields_of_type", lambda: fields_of_type(conn, rng.choice(types), version)),
+            ("locate", lambda: locate(conn, rng.choice(structs))),
+            ("search (rare term)", lambda: search_docs(conn, rng.choice(structs), version)),
+            ("search (common term)", lambda: search_docs(conn, rng.choice(["documentation", "children"]), version)),
+        ]
+        print(f"  {'query':<26} {'p50 us':>9} {'p99 us':>9} {'rows':>7}")
+        for name, query in cases:
+            times = []
+            rows = 0
+            for _ in range(queries):
+                started = time.perf_counter()
+                rows += len(query())
+                times.append(time.perf_counter() - started)
+            times.sort()
+            print(f"  {name:<26} {times[len(times) // 2] * 1e6:9.1f} {times[int(len(times) * 0.99)] * 1e6:9.1f} "
+                  f"{rows / queries:7.1f}")
+        conn.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write the index to a SQLite symbol store, or query one.",
+        epilog="Without a query option, indexes the Makepad source and writes or updates --version in the store.")
+    add_index_arguments(parser)
+    parser.add_argument("--db", type=Path, default=DEFAULT_PATH, help=f"store to write or query (default: {DEFAULT_PATH})")
+    parser.add_argument("--version", help="version label to write, or to restrict queries to "
+                                          "(default when writing: the source directory's name or crate version)")
+    query = parser.add_argument_group("queries")
+    query.add_argument("--widgets-with", metavar="PROPERTY", help="widgets whose effective property set has PROPERTY")
+    query.add_argument("--fields-of-type", metavar="TYPE", help="fields of type TYPE (including Option<TYPE>)")
+    query.add_argument("--locate", metavar="NAME", help="every struct, field, enum or variant called NAME")
+    query.add_argument("--search", metavar="QUERY", help="full-text search over names and doc comments (FTS5 syntax)")
+    query.add_argument("--sql", metavar="SQL", help="run any SQL against the store")
+    query.add_argument("--limit", type=int, default=20, help="results of --search (default: 20)")
+    parser.add_argument("--benchmark", type=int, metavar="VERSIONS",
+                        help="time store writes and queries on this many synthetic versions instead")
+    parser.add_argument("--files", type=int, default=200, help="files per version for --benchmark")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.files)
+        return
+
+    if any((args.widgets_with, args.fields_of_type, args.locate, args.search, args.sql)):
+        if not args.db.exists():
+            parser.error(f"no store at {args.db}: run without query options first")
+        try:
+            conn = open_store(args.db, readonly=True)
+        except (ValueError, sqlite3.Error) as e:
+            parser.error(str(e))
+        run_query(conn, args)
+        return
+
+    try:
+        conn = open_store(args.db)
+    except (ValueError, sqlite3.Error) as e:
+        parser.error(str(e))
+    index = index_from_args(args)
+    version = args.version or version_name(index.source_root)
+    result = write_version(conn, version, index)
+    print(f"Store {args.db}: version {version}, {result['written']} files written, {result['removed']} removed "
+          f"in {result['seconds']:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+Index the live_design! components and Live structs of the app's own crates.
+
+makepad_index.py covers Makepad itself; this covers the workspace being
+edited. Every crate under the workspace root (a directory with a Cargo.toml
+and a src/ directory) is scanned for:
+
+- components defined at the top level of a live_design! block, either backed
+  by a Rust struct (`pub MyCard = {{MyCard}} { ... }`) or extending another
+  widget (`MyHeader = <View> { ... }`), with the properties and named
+  children set in their bodies
+- the #[derive(Live...)] structs behind them and their #[live] fields, pub
+  or not, and the app's Live enums
+
+Indexing is incremental per file. Parse results are cached by content hash
+between runs, and a running index re-reads only files whose size or mtime
+changed, so re-indexing after a save costs one file. --watch keeps the
+output up to date as files are saved; --benchmark times a full, warm and
+one-file re-index on a synthetic workspace.
+"""
+
+import os
+import re
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import tempfile
+from sys import intern
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+from makepad_index import (CACHE_VERSION, PRUNED_DIRS, ExtractionCache, SourceFile, parse_file, parsed_from_dict,
+                           parsed_to_dict, read_source, walk_rust_files)
+from outputs import atomic_write, stream_json
+from rust_lexer import COMMENT, DOC, IDENT, PUNCT, LineIndex, tokenize
+
+# Written inside the workspace, next to the build output editors already ignore
+OUTPUT_NAME = Path("target") / "makepad-live" / "workspace.json"
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+WORKSPACE_FORMAT = "makepad-workspace"
+WORKSPACE_VERSION = 1
+
+# Cached results are makepad_index's plus each file's components; bump the suffix when components change
+CACHE_FORMAT = f"{CACHE_VERSION}.2"
+
+PACKAGE_NAME_RE = re.compile(r'name\s*=\s*"([^"]+)"')
+
+# The delimiters a live_design! invocation can use, live_design!{ }, !( ) or ![ ], with their closers
+MACRO_DELIMITERS = {'{': '}', '(': ')', '[': ']'}
+CLOSING_DELIMITERS = set(MACRO_DELIMITERS.values())
+
+@dataclass(slots=True)
+class LiveComponent:
+    """A component defined at the top level of a live_design! block."""
+    name: str
+    base: str      # the struct in `Name = {{Struct}}`, or the widget in `Name = <Widget>`
+    backed: bool   # True for {{Struct}}: an instance of a Rust struct rather than an extended widget
+    is_pub: bool = False
+    line: int = 0
+    column: int = 0
+    properties: list = field(default_factory=list)  # property names set directly in its body
+    children: list = field(default_factory=list)    # [instance name, widget] of its named children
+
+@dataclass(slots=True)
+class WorkspaceFile:
+    """Everything extracted from one workspace source file."""
+    path: str
+    crate: str
+    size: int = 0
+    mtime_ns: int = 0
+    structs: list = field(default_factory=list)     # Widget records, pub or not
+    enums: list = field(default_factory=list)       # LiveEnum records
+    components: list = field(default_factory=list)  # LiveComponent records, in source order
+
+class WorkspaceCache(ExtractionCache):
+    """The extraction cache of one workspace; results also carry the file's components."""
+
+    version = CACHE_FORMAT
+
+    def __init__(self, root: Path, enabled: bool = True, rebuild: bool = False):
+        digest = hashlib.sha1(str(Path(root).resolve()).encode()).hexdigest()[:12]
+        super().__init__(CACHE_DIR / f"workspace_{digest}.json", enabled, rebuild)
+
+    def keep(self, key: str):
+        """Mark a file the running index didn't need to look up as present, so save() keeps its entry."""
+        self._seen.add(key)
+
+    def store(self, content_hash: str, parsed: tuple):
+        structs, enums, components = parsed
+        self.results[content_hash] = {**parsed_to_dict((structs, enums)),
+                                      "components": [asdict(c) for c in components]}
+
+def parsed_from_cache(data: dict, rel: str) -> tuple:
+    """Inverse of WorkspaceCache.store()."""
+    structs, enums = parsed_from_dict(data, rel)
+    components = [LiveComponent(**{**c, "name": intern(c["name"]), "base": intern(c["base"])})
+                  for c in data["components"]]
+    return structs, enums, components
+
+class WorkspaceIndex:
+    """The extracted model of a workspace, kept up to date one file at a time."""
+
+    def __init__(self, root: Path, cache: Optional[WorkspaceCache] = None):
+        self.root = Path(root)
+        self.cache = cache
+        self.crates = []
+        self.files = {}  # path -> WorkspaceFile, in crate then path order
+        self.parsed = 0  # files parsed rather than taken from the cache, over the index's lifetime
+
+    def refresh(self) -> tuple:
+        """Walk the workspace and re-index files whose size or mtime changed.
+
+        Returns (changed paths, removed paths).
+        """
+        self.crates = find_crates(self.root)
+        sources = list_workspace_sources(self.crates)
+        changed = []
+        for source in sources:
+            old = self.files.get(source.path)
+            if old is not None and old.size == source.size and old.mtime_ns == source.mtime_ns:
+                if self.cache is not None:
+                    self.cache.keep(source.path)
+                continue
+            self.files[source.path] = self.index_file(source)
+            changed.append(source.path)
+
+        removed = sorted(set(self.files) - {source.path for source in sources})
+        self.files = {source.path: self.files[source.path] for source in sources}
+        return changed, removed
+
+    def update(self, path) -> bool:
+        """Re-index one file after a save, without walking the workspace.
+
+        Returns whether the index changed. Paths outside the known crates are ignored.
+        """
+        path = str(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return self.files.pop(path, None) is not None
+        old = self.files.get(path)
+        if old is not None and old.size == stat.st_size and old.mtime_ns == stat.st_mtime_ns:
+            return False
+        for crate, src in self.crates:
+            if Path(path).is_relative_to(src):
+                rel = os.path.relpath(path, src).replace(os.sep, '/')
+                source = SourceFile(path=path, rel=rel, crate=crate, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                self.files[path] = self.index_file(source)
+                if old is None:
+                    # Keep the crate then path order refresh() produces
+                    self.files = dict(sorted(self.files.items(), key=lambda item: (item[1].crate, item[0])))
+                return True
+        return False
+
+    def index_file(self, source: SourceFile) -> WorkspaceFile:
+        """Extract one file, from the cache when its content hash is known."""
+        cached = content = content_hash = None
+        if self.cache is not None:
+            cached, content, content_hash = self.cache.lookup(Path(source.path))
+        if cached is not None:
+            structs, enums, components = parsed_from_cache(cached, source.rel)
+        else:
+            if content is None:
+                content = read_source(source.path)
+            structs, enums, components = parse_workspace_file(content, source.rel)
+            self.parsed += 1
+            if self.cache is not None:
+                self.cache.store(content_hash, (structs, enums, components))
+        return WorkspaceFile(path=source.path, crate=source.crate, size=source.size, mtime_ns=source.mtime_ns,
+                             structs=structs, enums=enums, components=components)
+
+    @property
+    def components(self) -> dict:
+        """(WorkspaceFile, LiveComponent) by component name; later definitions win."""
+        return {c.name: (f, c) for f in self.files.values() for c in f.components}
+
+    @property
+    def structs(self) -> dict:
+        """(WorkspaceFile, Widget) by struct name; later definitions win."""
+        return {s.name: (f, s) for f in self.files.values() for s in f.structs}
+
+    @property
+    def enums(self) -> dict:
+        """(WorkspaceFile, LiveEnum) by enum name; later definitions win."""
+        return {e.name: (f, e) for f in self.files.values() for e in f.enums}
+
+def widget_of(name: str, components: dict) -> str:
+    """The struct a component ultimately instantiates, following <Widget> bases through other components."""
+    seen = set()
+    while name in components and name not in seen:
+        seen.add(name)
+        component = components[name][1]
+        if component.backed:
+            return component.base
+        name = component.base
+    return name
+
+def package_name(manifest: Path) -> Optional[str]:
+    """The [package] name of a Cargo.toml, or None for a virtual workspace manifest."""
+    try:
+        text = manifest.read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+    section = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('['):
+            section = line
+        elif section == '[package]':
+            match = PACKAGE_NAME_RE.match(line)
+            if match:
+                return match.group(1)
+    return None
+
+def find_crates(root: Path) -> list:
+    """(crate name, src directory) of every crate under root, sorted.
+
+    A crate is a directory holding a Cargo.toml and a src/ directory. Build
+    output, hidden and example directories are pruned as for Makepad itself.
+    """
+    crates = []
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = [(entry.name, entry.path) for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        manifest = Path(directory) / "Cargo.toml"
+        if manifest.is_file() and any(name == "src" for name, _ in subdirs):
+            crates.append((package_name(manifest) or Path(directory).name, Path(directory) / "src"))
+        stack.extend(path for name, path in subdirs
+                     if name != "src" and name not in PRUNED_DIRS and not name.startswith('.'))
+    return sorted(crates)
+
+def list_workspace_sources(crates: list) -> list:
+    """Every SourceFile of the given crates, sorted by crate then path."""
+    sources = []
+    for crate, src in crates:
+        for path, size, mtime_ns in sorted(walk_rust_files(src)):
+            rel = os.path.relpath(path, src).replace(os.sep, '/')
+            sources.append(SourceFile(path=path, rel=rel, crate=crate, size=size, mtime_ns=mtime_ns))
+    return sources
+
+def parse_workspace_file(content: str, rel: str) -> tuple:
+    """(structs, enums, components) of one workspace file."""
+    structs, enums = parse_file(content, rel, private=True)
+    return structs, enums, extract_components(content)
+
+def extract_components(content: str, lines: Optional[LineIndex] = None) -> list:
+    """Find the components defined at the top level of each live_design! block of a file."""
+    lines = lines or LineIndex(content)
+    tokens = [token for token in tokenize(content) if token[0] not in (COMMENT, DOC)]
+    n = len(tokens)
+    components = []
+    stack = []  # one entry per open delimiter, the macro's own first: the LiveComponent a brace opens, or None
+    in_macro = False
+    for k, (kind, text, _, _) in enumerate(tokens):
+        if not in_macro:
+            in_macro = live_design_at(tokens, k) is not None
+            continue
+        if kind != PUNCT:
+            continue
+        body = stack[-1] if stack else None
+        if text == '{' and stack:
+            opened = None
+            if len(stack) == 1:
+                opened = component_at(tokens, k, lines)
+                if opened is not None:
+                    components.append(opened)
+            elif body is not None:
+                widget, name = block_widget(tokens, k)
+                if widget and name:
+                    body.children.append([name, widget])
+            stack.append(opened)
+        elif text in MACRO_DELIMITERS:
+            stack.append(None)
+        elif text in CLOSING_DELIMITERS and stack:
+            stack.pop()
+            # The macro ends with the delimiter that closes its body
+            in_macro = bool(stack)
+        elif (text == ':' and body is not None and tokens[k - 1][0] == IDENT
+              and not (k + 1 < n and tokens[k + 1][1] == '<') and tokens[k - 1][1] not in body.properties):
+            body.properties.append(intern(tokens[k - 1][1]))
+    return components
+
+def live_design_at(tokens: list, k: int) -> Optional[str]:
+    """The delimiter opening the body of a live_design! invocation starting at tokens[k], or None."""
+    if (tokens[k][0] == IDENT and tokens[k][1] == 'live_design' and k + 2 < len(tokens)
+            and tokens[k + 1][1] == '!' and tokens[k + 2][1] in MACRO_DELIMITERS):
+        return tokens[k + 2][1]
+    return None
+
+def component_at(tokens: list, k: int, lines: LineIndex) -> Optional[LiveComponent]:
+    """The component opened by the `{` at tokens[k], if it is `[pub] Name = {{Struct}} {` or `[pub] Name = <Widget> {`."""
+    widget, name = block_widget(tokens, k)
+    if not (widget and name):
+        return None
+    backed = tokens[k - 1][1] == '}'
+    at = k - 7 if backed else k - 5
+    line, column = lines.position(tokens[at][2])
+    return LiveComponent(name=intern(name), base=intern(widget), backed=backed,
+                         is_pub=at > 0 and tokens[at - 1][1] == 'pub', line=line, column=column)
+
+def block_widget(tokens: list, k: int) -> tuple:
+    """(widget, instance name) for the `{` at tokens[k], from `name = <Widget> {` or `Widget = {{Widget}} {`."""
+    def text(j):
+        return tokens[j][1] if j >= 0 else None
+
+    if text(k - 1) == '>' and text(k - 3) == '<' and tokens[k - 2][0] == IDENT:
+        name = text(k - 5) if text(k - 4) in ('=', ':') and k >= 5 and tokens[k - 5][0] == IDENT else None
+        return text(k - 2), name
+    if text(k - 1) == '}' and text(k - 2) == '}' and text(k - 4) == '{' and text(k - 5) == '{' and tokens[k - 3][0] == IDENT:
+        name = text(k - 7) if text(k - 6) == '=' and k >= 7 and tokens[k - 7][0] == IDENT else None
+        return text(k - 3), name
+    return None, None
+
+def build_workspace_output(workspace: WorkspaceIndex) -> dict:
+    """The workspace model in the layout written to workspace.json.
+
+    components: {name: {file, line, column, pub, base, backed, widget, properties, children}}
+                where widget is the struct the component ultimately instantiates
+    structs:    {name: {file, line, column, doc, bases: [{kind, field, type}], properties: [{name, type, default, line, column}]}}
+    enums:      {name: {file, line, column, doc, default, variants: [[name, line, column, doc]]}}
+    """
+    components = workspace.components
+    structs = workspace.structs
+    enums = workspace.enums
+    return {
+        "header": {
+            "format": WORKSPACE_FORMAT,
+            "version": WORKSPACE_VERSION,
+            "root": str(workspace.root),
+            "crates": [crate for crate, _ in workspace.crates],
+            "files": len(workspace.files),
+        },
+        "components": {
+            name: {
+                "file": f.path, "line": c.line, "column": c.column, "pub": c.is_pub,
+                "base": c.base, "backed": c.backed, "widget": widget_of(name, components),
+                "properties": c.properties, "children": c.children,
+            }
+            for name, (f, c) in sorted(components.items())
+        },
+        "structs": {
+            name: {
+                "file": f.path, "line": s.line, "column": s.column, "doc": s.doc,
+                "bases": [{"kind": b.kind, "field": b.name, "type": b.base_type} for b in s.bases],
+                "properties": [
+                    {"name": p.name, "type": p.prop_type, "default": p.default, "line": p.line, "column": p.column}
+                    for p in s.properties
+                ],
+            }
+            for name, (f, s) in sorted(structs.items())
+        },
+        "enums": {
+            name: {
+                "file": f.path, "line": e.line, "column": e.column, "doc": e.doc, "default": e.default,
+                "variants": [[v.name, v.line, v.column, v.doc] for v in e.variants],
+            }
+            for name, (f, e) in sorted(enums.items())
+        },
+    }
+
+def write_workspace_output(output: dict, path: Path):
+    with atomic_write(path) as f:
+        stream_json(f, output)
+    print(f"{'Written to' if f.rewritten else 'Unchanged:'} {path}")
+
+def index_workspace(workspace: WorkspaceIndex, output_path: Path):
+    """Bring the index up to date, save the cache and write the output; returns (changed, removed)."""
+    started = time.perf_counter()
+    changed, removed = workspace.refresh()
+    if workspace.cache is not None:
+        workspace.cache.save()
+    elapsed = time.perf_counter() - started
+    print(f"Indexed {len(workspace.files)} files in {len(workspace.crates)} crates in {elapsed:.3f}s: "
+          f"{len(changed)} changed, {len(removed)} removed, {workspace.parsed} parsed")
+    output = build_workspace_output(workspace)
+    print(f"{len(output['components'])} components, {len(output['structs'])} Live structs, "
+          f"{len(output['enums'])} Live enums")
+    write_workspace_output(output, output_path)
+    return changed, removed
+
+def watch(workspace: WorkspaceIndex, output_path: Path, interval: float):
+    """Poll the workspace and rewrite the output whenever a file changes."""
+    print(f"\nWatching {len(workspace.files)} files (poll every {interval}s). Ctrl+C to stop.")
+    while True:
+        time.sleep(interval)
+        parsed = workspace.parsed
+        started = time.perf_counter()
+        changed, removed = workspace.refresh()
+        if not (changed or removed):
+            continue
+        refreshed = time.perf_counter()
+        if workspace.cache is not None:
+            workspace.cache.save()
+        write_workspace_output(build_workspace_output(workspace), output_path)
+        names = [os.path.basename(path) for path in changed + removed]
+        print(f"Re-indexed {len(changed)} changed ({workspace.parsed - parsed} parsed), {len(removed)} removed "
+              f"({', '.join(names[:5])}{', ...' if len(names) > 5 else ''}): refresh {refreshed - started:.3f}s, "
+              f"total {time.perf_counter() - started:.3f}s")
+
+def generate_workspace(root: Path, files: int, seed: int = 0) -> dict:
+    """Write a synthetic app workspace: crates of files with live_design! components and their structs."""
+    rng = random.Random(seed)
+    crates = max(1, files // 100)
+    (root / "Cargo.toml").write_text('[workspace]\nmembers = ["crates/*"]\n')
+    size = 0
+    for c in range(crates):
+        crate = root / "crates" / f"app_{c}"
+        (crate / "src").mkdir(parents=True, exist_ok=True)
+        (crate / "Cargo.toml").write_text(f'[package]\nname = "app_{c}"\nversion = "0.1.0"\n\n'
+                                          f'[dependencies]\nmakepad-widgets = "0.6"\n')
+    for i in range(files):
+        src = root / "crates" / f"app_{i % crates}" / "src"
+        directory = src.joinpath(*[f"screen_{rng.randrange(4)}" for _ in range(rng.randrange(3))])
+        directory.mkdir(parents=True, exist_ok=True)
+        text = generate_workspace_file(rng, i)
+        (directory / f"widget_{i}.rs").write_text(text)
+        size += len(text)
+    return {"files": files, "crates": crates, "bytes": size}
+
+def generate_workspace_file(rng: random.Random, i: int) -> str:
+    """One app module: a live_design! block with a struct-backed card and derived components, plus the struct."""
+    lines = ["use makepad_widgets::*;", "", "live_design! {", "    import makepad_widgets::base::*;",
+             "    import makepad_widgets::theme_desktop_dark::*;", "",
+             f"    pub Card{i} = {{{{Card{i}}}}} {{", "        width: Fill, height: Fit", "        flow: Down",
+             "        // title row", f"        title = <Label> {{ text: \"Card {i}\" }}",
+             "        body = <View> {", "            show_bg: true", "            draw_bg: { color: #333 }",
+             "            <Label> { text: \"nested\" }", "        }", "    }"]
+    for j in range(rng.randint(1, 3)):
+        base = rng.choice([f"Card{i}", "View", "Button", f"Card{max(0, i - 1)}"])
+        lines += ["", f"    {'pub ' if rng.random() < 0.5 else ''}Item{i}_{j} = <{base}> {{",
+                  f"        padding: {rng.randint(0, 20)}", f"        icon = <Image> {{ fit: Smallest }}", "    }"]
+    lines += ["}", "", f"/// Card number {i}", "#[derive(Live, LiveHook, Widget)]",
+              f"{'pub ' if i % 2 else ''}struct Card{i} {{", "    #[deref] view: View,",
+              "    #[live] title_text: String,", f"    #[live({rng.randint(1, 9)}.0)] radius: f64,",
+              "    #[live] selected: bool,", "    #[rust] state: usize,", "}", "",
+              f"impl Widget for Card{i} {{",
+              "    fn draw_walk(&mut self, cx: &mut Cx2d, scope: &mut Scope, walk: Walk) -> DrawStep {",
+              "        self.view.draw_walk(cx, scope, walk)", "    }", "}", ""]
+    lines += [f"fn helper_{i}_{j}(x: f64) -> f64 {{ x * {j}.0 + {{ let y = [1, 2, 3]; y.len() as f64 }} }}"
+              for j in range(rng.randint(5, 30))]
+    return '\n'.join(lines) + '\n'
+
+def touch(path: Path, line: str):
+    """Append a line to a file and move its mtime forward, as an editor save would."""
+    with open(path, 'a') as f:
+        f.write(line)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def benchmark(files: int, seed: int = 0, edits: int = 5):
+    """Time full, warm and one-file re-indexing on a synthetic workspace."""
+    root = Path(tempfile.mkdtemp(prefix="makepad-workspace-"))
+    cache = None
+    try:
+        corpus = generate_workspace(root, files, seed)
+        print(f"Generated {corpus['files']} files in {corpus['crates']} crates ({corpus['bytes'] / 1e6:.1f} MB) in {root}")
+        results = []
+
+        def timed(name, func):
+            started = time.perf_counter()
+            value = func()
+            results.append((name, time.perf_counter() - started))
+            return value
+
+        full = WorkspaceIndex(root)
+        timed("full index (no cache)", full.refresh)
+        cache = WorkspaceCache(root, rebuild=True)
+        cold = WorkspaceIndex(root, cache)
+        timed("cold index + cache save", lambda: (cold.refresh(), cache.save()))
+        def warm_index():
+            index = WorkspaceIndex(root, WorkspaceCache(root))
+            index.refresh()
+            return index
+
+        warm = timed("warm index (cache load)", warm_index)
+        assert warm.parsed == 0, f"warm index parsed {warm.parsed} files"
+        unchanged = timed("refresh, nothing changed", warm.refresh)
+        assert unchanged == ([], [])
+
+        # Saves: one file at a time, found by walking the workspace or named directly
+        paths = sorted(warm.files)
+        walk_seconds = []
+        update_seconds = []
+        for n in range(edits):
+            parsed = warm.parsed
+            touch(Path(paths[rng_index(n, len(paths))]), f"// edit {n}\n")
+            started = time.perf_counter()
+            changed, _ = warm.refresh()
+            walk_seconds.append(time.perf_counter() - started)
+            assert len(changed) == 1 and warm.parsed == parsed + 1
+
+            path = paths[rng_index(n + edits, len(paths))]
+            touch(Path(path), f"// update {n}\n")
+            started = time.perf_counter()
+            assert warm.update(path)
+            update_seconds.append(time.perf_counter() - started)
+        results.append(("one file saved (walk)", sorted(walk_seconds)[len(walk_seconds) // 2]))
+        results.append(("one file saved (update)", sorted(update_seconds)[len(update_seconds) // 2]))
+
+        rebuilt = WorkspaceIndex(root)
+        rebuilt.refresh()
+        assert build_workspace_output(warm) == build_workspace_output(rebuilt), "incremental index differs from a rebuild"
+        output = build_workspace_output(rebuilt)
+        print(f"{len(output['components'])} components, {len(output['structs'])} structs; "
+              f"incremental index matches a full rebuild")
+        print(f"  {'stage':<26} {'ms':>10}")
+        for name, seconds in results:
+            print(f"  {name:<26} {seconds * 1000:10.2f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        if cache is not None:
+            cache.path.unlink(missing_ok=True)
+
+def rng_index(n: int, count: int) -> int:
+    """A spread of distinct file indexes for the edits."""
+    return (n * 7919) % count
+
+def main():
+    parser = argparse.ArgumentParser(description="Index the live_design! components and Live structs of an app workspace.")
+    parser.add_argument("--workspace", type=Path, default=Path.cwd(), metavar="DIR",
+                        help="workspace root to scan for crates (default: the current directory)")
+    parser.add_argument("--output", "-o", type=Path, metavar="FILE",
+                        help=f"where to write the index (default: <workspace>/{OUTPUT_NAME.as_posix()})")
+    parser.add_argument("--no-cache", action="store_true", help="don't read or write the extraction cache")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the existing cache and re-parse every file")
+    parser.add_argument("--watch", action="store_true", help="keep running and update the index when files change")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between polls in --watch mode")
+    parser.add_argument("--benchmark", type=int, metavar="FILES",
+                        help="time full and incremental indexing on a synthetic workspace of FILES files instead")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the --benchmark workspace")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.seed)
+        return
+
+    root = args.workspace.resolve()
+    output_path = args.output or root / OUTPUT_NAME
+    workspace = WorkspaceIndex(root, WorkspaceCache(root, enabled=not args.no_cache, rebuild=args.rebuild))
+    index_workspace(workspace, output_path)
+    if args.watch:
+        try:
+            watch(workspace, output_path, args.interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,25 @@ import * as vscode from 'vscode';
 import * as path from 'path';
 import * as fs from 'fs';
 import * as os from 'os';
+import * as crypto from 'crypto';
 
 // Makepad widgets source path - discovered dynamically
 let MAKEPAD_WIDGETS_PATH: string | null = null;
 
 // Widget locations (populated at activation)
 let WIDGET_LOCATIONS: Record<string, { file: string; line: number }> = {};
-let PROPERTY_LOCATIONS: Record<string, { file: string; line: number }> = {};
+
+// Every declaration of each property name, most relevant first, and the
+// #[deref]/#[walk]/#[layout] base types of each struct (from locations.json)
+interface PropertyLocation { struct: string; file: string; line: number }
+let PROPERTY_LOCATIONS: Record<string, PropertyLocation[]> = {};
+let STRUCT_BASES: Record<string, string[]> = {};
+
+// Every declaration of each enum value, most relevant first (from locations.json,
+// else the prebuilt index or the activation scan), and each enum's variants in order
+interface VariantLocation { enum: string; file: string; line: number }
+let VARIANT_LOCATIONS: Record<string, VariantLocation[]> = {};
+const ENUM_VARIANTS: Record<string, string[]> = {};
 
 // Widget documentation
 const WIDGET_DOCS: Record<string, { description: string; properties: string[]; example: string }> = {
@@ -213,11 +225,115 @@ const PROPERTY_DOCS: Record<string, { type: string; values: string[]; descriptio
     }
 };
 
+// Crates unpacked into the Cargo registry live side by side as makepad-<crate>-<version>
+const REGISTRY_CRATE_RE = /^makepad-([a-z_-]+?)-(\d+\.\d+\.\d+\S*)$/;
+const SEMVER_RE = /^(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$/;
+
+/**
+ * Semver precedence, as scripts/discovery.py's semver_key: a pre-release sorts
+ * before its release, numeric identifiers numerically and before alphanumeric
+ * ones, and unparseable versions first
+ */
+function compareSemver(a: string, b: string): number {
+    const key = (version: string): [number[], (number | string)[] | null] | null => {
+        const match = version.match(SEMVER_RE);
+        if (!match) return null;
+        const pre = match[4] === undefined ? null : match[4].split('.').map(part => /^\d+$/.test(part) ? Number(part) : part);
+        return [[Number(match[1]), Number(match[2]), Number(match[3])], pre];
+    };
+    const ka = key(a);
+    const kb = key(b);
+    if (!ka || !kb) return (ka ? 1 : 0) - (kb ? 1 : 0);
+    for (let i = 0; i < 3; i++) {
+        if (ka[0][i] !== kb[0][i]) return ka[0][i] - kb[0][i];
+    }
+    const [pa, pb] = [ka[1], kb[1]];
+    if (!pa || !pb) return (pa ? 0 : 1) - (pb ? 0 : 1);
+    for (let i = 0; i < Math.min(pa.length, pb.length); i++) {
+        const [x, y] = [pa[i], pb[i]];
+        if (x === y) continue;
+        if (typeof x !== typeof y) return typeof x === 'number' ? -1 : 1;
+        return x < y ? -1 : 1;
+    }
+    return pa.length - pb.length;
+}
+
+function listDirs(dir: string): string[] {
+    try {
+        return fs.readdirSync(dir, { withFileTypes: true }).filter(entry => entry.isDirectory()).map(entry => entry.name);
+    } catch (e) {
+        return [];
+    }
+}
+
+function cargoHome(): string {
+    return process.env.CARGO_HOME || path.join(os.homedir(), '.cargo');
+}
+
+/**
+ * widgets/src of a checkout, or src of a makepad-widgets-X.Y.Z registry crate
+ */
+function widgetsSrcDir(root: string): string {
+    return REGISTRY_CRATE_RE.test(path.basename(root)) ? path.join(root, 'src') : path.join(root, 'widgets', 'src');
+}
+
+/**
+ * The newest makepad-widgets crate across every registry index, by semver
+ */
+function newestRegistryCrate(): string | null {
+    const registry = path.join(cargoHome(), 'registry', 'src');
+    const found: [string, string][] = [];
+    for (const indexDir of listDirs(registry).sort()) {
+        for (const name of listDirs(path.join(registry, indexDir))) {
+            const match = name.match(REGISTRY_CRATE_RE);
+            const crate = path.join(registry, indexDir, name);
+            if (match && match[1] === 'widgets' && fs.existsSync(path.join(crate, 'src'))) {
+                found.push([match[2], crate]);
+            }
+        }
+    }
+    found.sort((a, b) => compareSemver(a[0], b[0]) || (a[1] < b[1] ? -1 : a[1] > b[1] ? 1 : 0));
+    return found.length ? found[found.length - 1][1] : null;
+}
+
+/**
+ * The most recently updated Makepad git checkout (revisions are hashes)
+ */
+function newestGitCheckout(): string | null {
+    const checkouts = path.join(cargoHome(), 'git', 'checkouts');
+    let newest: string | null = null;
+    let newestMtime = -1n;
+    for (const name of listDirs(checkouts).sort()) {
+        if (!name.toLowerCase().includes('makepad')) continue;
+        for (const rev of listDirs(path.join(checkouts, name))) {
+            const root = path.join(checkouts, name, rev);
+            if (!fs.existsSync(path.join(root, 'widgets', 'src'))) continue;
+            const mtime = fs.statSync(root, { bigint: true }).mtimeNs;
+            if (mtime >= newestMtime) {
+                newest = root;
+                newestMtime = mtime;
+            }
+        }
+    }
+    return newest;
+}
+
 /**
- * Find Makepad widgets source path from various locations
+ * Find Makepad widgets source path from various locations, in the same order
+ * and with the same version choice as scripts/discovery.py, so the extension
+ * and the generated tables agree on the source
  */
 function findMakepadWidgetsPath(): string | null {
     const home = os.homedir();
+
+    // 0. An explicit MAKEPAD_PATH always wins
+    if (process.env.MAKEPAD_PATH) {
+        const widgetsPath = widgetsSrcDir(process.env.MAKEPAD_PATH);
+        if (fs.existsSync(widgetsPath)) {
+            console.log('Found Makepad from MAKEPAD_PATH:', widgetsPath);
+            return widgetsPath;
+        }
+    }
     
     // 1. Check workspace folders for local Makepad checkout
     const workspaceFolders = vscode.workspace.workspaceFolders;
@@ -240,55 +356,28 @@ function findMakepadWidgetsPath(): string | null {
         }
     }
     
-    // 2. Check Cargo registry for published crate
-    const cargoRegistry = path.join(home, '.cargo', 'registry', 'src');
-    if (fs.existsSync(cargoRegistry)) {
-        try {
-            const registryDirs = fs.readdirSync(cargoRegistry);
-            for (const registryDir of registryDirs) {
-                const registryPath = path.join(cargoRegistry, registryDir);
-                const crates = fs.readdirSync(registryPath);
-                
-                // Find makepad-widgets-* directory (get latest version)
-                const makepadWidgets = crates
-                    .filter(c => c.startsWith('makepad-widgets-'))
-                    .sort()
-                    .pop();
-                
-                if (makepadWidgets) {
-                    const widgetsPath = path.join(registryPath, makepadWidgets, 'src');
-                    if (fs.existsSync(widgetsPath)) {
-                        console.log('Found Makepad in Cargo registry:', widgetsPath);
-                        return widgetsPath;
-                    }
-                }
-            }
-        } catch (e) {
-            console.log('Error scanning Cargo registry:', e);
+    // 2. Check Cargo registry for published crate (highest version across registries)
+    try {
+        const crate = newestRegistryCrate();
+        if (crate) {
+            const widgetsPath = path.join(crate, 'src');
+            console.log('Found Makepad in Cargo registry:', widgetsPath);
+            return widgetsPath;
         }
+    } catch (e) {
+        console.log('Error scanning Cargo registry:', e);
     }
     
-    // 3. Check Cargo git checkouts (for git dependencies)
-    const cargoGit = path.join(home, '.cargo', 'git', 'checkouts');
-    if (fs.existsSync(cargoGit)) {
-        try {
-            const checkouts = fs.readdirSync(cargoGit);
-            for (const checkout of checkouts) {
-                if (checkout.toLowerCase().includes('makepad')) {
-                    const checkoutPath = path.join(cargoGit, checkout);
-                    const versions = fs.readdirSync(checkoutPath);
-                    for (const version of versions) {
-                        const widgetsPath = path.join(checkoutPath, version, 'widgets', 'src');
-                        if (fs.existsSync(widgetsPath)) {
-                            console.log('Found Makepad in Cargo git:', widgetsPath);
-                            return widgetsPath;
-                        }
-                    }
-                }
-            }
-        } catch (e) {
-            console.log('Error scanning Cargo git:', e);
+    // 3. Check Cargo git checkouts (for git dependencies), newest first
+    try {
+        const checkout = newestGitCheckout();
+        if (checkout) {
+            const widgetsPath = path.join(checkout, 'widgets', 'src');
+            console.log('Found Makepad in Cargo git:', widgetsPath);
+            return widgetsPath;
         }
+    } catch (e) {
+        console.log('Error scanning Cargo git:', e);
     }
     
     // 4. Check common development locations
@@ -312,10 +401,231 @@ function findMakepadWidgetsPath(): string | null {
     return null;
 }
 
+// Prebuilt index (see scripts/compact_index.py for the layout): written by the
+// generator scripts, or by the extension itself after scanning the source
+const INDEX_FORMAT = 'makepad-index';
+const INDEX_VERSION = 2;
+
+interface PrebuiltIndex {
+    header: { format: string; version: number; root: string; widgets_src: string; fingerprint: string };
+    files: string[];
+    strings: string[];
+    // [name, file, line, column, is_widget, doc, [[name, type, default, line, column], ...]]
+    structs: [string, number, number, number, number, string, [string, number, number, number, number][]][];
+    // [name, file, line, column, doc, [[name, line, column, flags, doc, value], ...]]
+    enums: [string, number, number, number, string, [string, number, number, number, string, number][]][];
+}
+
 /**
- * Scan Makepad source files to find widget and property definitions
+ * Recompute the index fingerprint from a stat of every indexed file
  */
-function scanMakepadSource(): void {
+function indexFingerprint(root: string, files: string[]): string {
+    const digest = crypto.createHash('sha1');
+    for (const rel of files) {
+        const stat = fs.statSync(path.join(root, rel), { bigint: true });
+        digest.update(`${rel}:${stat.size}:${stat.mtimeNs / 1000000n}\n`);
+    }
+    return digest.digest('hex');
+}
+
+// Header fields of the generated tables naming the source they were built from
+interface SourceHeader {
+    root: string;
+    widgets_src: string;
+    files: string[];   // relative to root
+    fingerprint: string;
+}
+
+const FINGERPRINTS = new Map<string, string>();
+
+/**
+ * Whether a generated file was built from the Makepad source found at
+ * activation and none of its files have changed since
+ */
+function matchesSource(header: SourceHeader, widgetsPath: string | null): boolean {
+    if (!widgetsPath || !header.files || path.resolve(header.widgets_src) !== path.resolve(widgetsPath)) {
+        return false;
+    }
+    // The tables are usually generated together, so stat the same files once
+    const key = `${header.root}\n${header.files.join('\n')}`;
+    let fingerprint = FINGERPRINTS.get(key);
+    if (fingerprint === undefined) {
+        try {
+            fingerprint = indexFingerprint(header.root, header.files);
+        } catch (e) {
+            fingerprint = '';
+        }
+        FINGERPRINTS.set(key, fingerprint);
+    }
+    return fingerprint === header.fingerprint;
+}
+
+/**
+ * Load widget and property locations from a prebuilt index.
+ * Returns false if the index is missing or was built from different sources.
+ */
+function loadPrebuiltIndex(indexPath: string, widgetsPath: string): boolean {
+    let index: PrebuiltIndex;
+    try {
+        index = JSON.parse(fs.readFileSync(indexPath, 'utf8'));
+    } catch (e) {
+        return false;
+    }
+
+    const header = index.header;
+    if (!header || header.format !== INDEX_FORMAT || header.version !== INDEX_VERSION) {
+        return false;
+    }
+    if (path.resolve(header.widgets_src) !== path.resolve(widgetsPath)) {
+        return false;
+    }
+    try {
+        // An index the extension wrote lists widgets/src itself; a file added since isn't in its fingerprint
+        if (path.resolve(header.root) === path.resolve(widgetsPath)
+                && listRustFiles(widgetsPath).join('\n') !== index.files.join('\n')) {
+            console.log('Makepad index is stale - rescanning source');
+            return false;
+        }
+        if (indexFingerprint(header.root, index.files) !== header.fingerprint) {
+            console.log('Makepad index is stale - rescanning source');
+            return false;
+        }
+    } catch (e) {
+        return false;
+    }
+
+    applyIndex(index);
+    return true;
+}
+
+/**
+ * Fill the widget, property and enum value tables from an index
+ */
+function applyIndex(index: PrebuiltIndex): void {
+    const root = index.header.root;
+    for (const [name, fileId, line, , isWidget, , properties] of index.structs) {
+        const file = path.join(root, index.files[fileId]);
+        if (isWidget) {
+            WIDGET_LOCATIONS[name] = { file, line };
+        }
+        for (const [propName, , , propLine] of properties) {
+            (PROPERTY_LOCATIONS[propName] ??= []).push({ struct: name, file, line: propLine });
+        }
+    }
+    for (const [name, fileId, , , , variants] of index.enums) {
+        const file = path.join(root, index.files[fileId]);
+        ENUM_VARIANTS[name] = variants.map(([variant]) => variant);
+        for (const [variant, line] of variants) {
+            (VARIANT_LOCATIONS[variant] ??= []).push({ enum: name, file, line });
+        }
+    }
+}
+
+function listRustFiles(dir: string): string[] {
+    return fs.readdirSync(dir).filter(f => f.endsWith('.rs')).sort();
+}
+
+/**
+ * Scan the widgets source directory into an index in the prebuilt layout,
+ * with widgets/src itself as the root
+ */
+function scanWidgetsSource(widgetsPath: string): PrebuiltIndex {
+    const files = listRustFiles(widgetsPath);
+    const strings: string[] = [];
+    const stringIds = new Map<string, number>();
+    const intern = (value: string): number => {
+        let id = stringIds.get(value);
+        if (id === undefined) {
+            id = strings.length;
+            strings.push(value);
+            stringIds.set(value, id);
+        }
+        return id;
+    };
+    const structs: PrebuiltIndex['structs'] = [];
+    const enums: PrebuiltIndex['enums'] = [];
+
+    files.forEach((file, fileId) => {
+        const content = fs.readFileSync(path.join(widgetsPath, file), 'utf8');
+        const lines = content.split('\n');
+        let struct: PrebuiltIndex['structs'][number] | null = null;
+        let liveEnum: PrebuiltIndex['enums'][number] | null = null;
+
+        for (let i = 0; i < lines.length; i++) {
+            const line = lines[i];
+
+            // Enum variants, up to the closing brace: pub enum Name { ... }
+            const enumMatch = line.match(/^pub enum (\w+)\s*\{/);
+            if (enumMatch) {
+                const entry: PrebuiltIndex['enums'][number] = [enumMatch[1], fileId, i + 1, 0, '', []];
+                enums.push(entry);
+                liveEnum = line.includes('}') ? null : entry;
+                continue;
+            }
+            if (liveEnum) {
+                const variantMatch = line.match(/^\s*(?:#\[[^\]]*\]\s*)*([A-Z]\w*)\s*(?:[,({]|$)/);
+                if (/^\}/.test(line)) {
+                    liveEnum = null;
+                } else if (variantMatch) {
+                    liveEnum[5].push([variantMatch[1], i + 1, line.indexOf(variantMatch[1]), 0, '', -1]);
+                }
+                continue;
+            }
+
+            // Find struct definitions: pub struct WidgetName {
+            const structMatch = line.match(/^pub struct (\w+)\s*\{/);
+            if (structMatch) {
+                const name = structMatch[1];
+                // Skip internal types
+                const isWidget = !name.endsWith('Ref') && !name.endsWith('Set') && !name.startsWith('Draw');
+                struct = [name, fileId, i + 1, 0, isWidget ? 1 : 0, '', []];
+                structs.push(struct);
+            }
+
+            // Find property definitions
+            const propMatch = line.match(/#\[live.*?\]\s*(?:pub\s+)?(\w+):\s*([^,]*)/);
+            if (propMatch && struct) {
+                struct[6].push([propMatch[1], intern(propMatch[2].trim()), -1, i + 1, line.indexOf(propMatch[1])]);
+            }
+        }
+    });
+
+    return {
+        header: {
+            format: INDEX_FORMAT,
+            version: INDEX_VERSION,
+            root: widgetsPath,
+            widgets_src: widgetsPath,
+            fingerprint: indexFingerprint(widgetsPath, files),
+        },
+        files,
+        strings,
+        structs,
+        enums,
+    };
+}
+
+/**
+ * Write an index the extension built, so later activations load it in one read
+ */
+function writeIndexCache(cachePath: string, index: PrebuiltIndex): void {
+    try {
+        fs.mkdirSync(path.dirname(cachePath), { recursive: true });
+        const temp = `${cachePath}.${process.pid}.tmp`;
+        fs.writeFileSync(temp, JSON.stringify(index));
+        fs.renameSync(temp, cachePath);
+    } catch (e) {
+        console.log('Could not write the Makepad index cache:', e);
+    }
+}
+
+/**
+ * Find the Makepad source and load its widget and property definitions: from
+ * the generated index if it was built from this source, else from the index
+ * the extension wrote after its last scan, else by scanning the source and
+ * writing that index for next time
+ */
+function scanMakepadSource(indexPath: string, storagePath: string): void {
     MAKEPAD_WIDGETS_PATH = findMakepadWidgetsPath();
     
     if (!MAKEPAD_WIDGETS_PATH) {
@@ -323,55 +633,394 @@ function scanMakepadSource(): void {
         return;
     }
 
+    if (loadPrebuiltIndex(indexPath, MAKEPAD_WIDGETS_PATH)) {
+        console.log(`Loaded prebuilt Makepad index: ${Object.keys(WIDGET_LOCATIONS).length} widgets, ${Object.keys(PROPERTY_LOCATIONS).length} properties`);
+        return;
+    }
+
+    // One cache file per Makepad source, so workspaces using different versions don't evict each other
+    const key = crypto.createHash('sha1').update(path.resolve(MAKEPAD_WIDGETS_PATH)).digest('hex').substring(0, 12);
+    const cachePath = path.join(storagePath, `makepad_index-${key}.json`);
+    if (loadPrebuiltIndex(cachePath, MAKEPAD_WIDGETS_PATH)) {
+        console.log(`Loaded cached Makepad index: ${Object.keys(WIDGET_LOCATIONS).length} widgets, ${Object.keys(PROPERTY_LOCATIONS).length} properties`);
+        return;
+    }
+
     try {
-        const files = fs.readdirSync(MAKEPAD_WIDGETS_PATH).filter(f => f.endsWith('.rs'));
-        
-        for (const file of files) {
-            const filePath = path.join(MAKEPAD_WIDGETS_PATH, file);
-            const content = fs.readFileSync(filePath, 'utf8');
-            const lines = content.split('\n');
-            
-            for (let i = 0; i < lines.length; i++) {
-                const line = lines[i];
-                
-                // Find widget struct definitions: pub struct WidgetName {
-                const structMatch = line.match(/^pub struct (\w+)\s*\{/);
-                if (structMatch) {
-                    const name = structMatch[1];
-                    // Skip internal types
-                    if (!name.endsWith('Ref') && !name.endsWith('Set') && !name.startsWith('Draw')) {
-                        WIDGET_LOCATIONS[name] = {
-                            file: filePath,
-                            line: i + 1 // 1-indexed
-                        };
-                    }
-                }
-                
-                // Find property definitions
-                const propMatch = line.match(/#\[live.*?\]\s*(?:pub\s+)?(\w+):/);
-                if (propMatch) {
-                    const propName = propMatch[1];
-                    if (!PROPERTY_LOCATIONS[propName]) {
-                        PROPERTY_LOCATIONS[propName] = {
-                            file: filePath,
-                            line: i + 1
-                        };
-                    }
-                }
-            }
-        }
-        
+        const index = scanWidgetsSource(MAKEPAD_WIDGETS_PATH);
+        applyIndex(index);
+        writeIndexCache(cachePath, index);
         console.log(`Scanned Makepad: ${Object.keys(WIDGET_LOCATIONS).length} widgets, ${Object.keys(PROPERTY_LOCATIONS).length} properties`);
     } catch (e) {
         console.log('Error scanning Makepad source:', e);
     }
 }
 
+// Ranked locations written by scripts/generate_locations.py
+const LOCATIONS_FORMAT = 'makepad-locations';
+const LOCATIONS_VERSION = 1;
+
+/**
+ * Replace the property and enum value locations with the ranked index from
+ * locations.json, written by scripts/generate_locations.py, if it has been
+ * generated from the Makepad source found and none of its files have changed
+ */
+function loadLocations(locationsPath: string): void {
+    let locations: {
+        header?: SourceHeader & { format: string; version: number };
+        properties?: Record<string, PropertyLocation[]>;
+        bases?: Record<string, string[]>;
+        variants?: Record<string, VariantLocation[]>;
+    };
+    try {
+        locations = JSON.parse(fs.readFileSync(locationsPath, 'utf8'));
+    } catch (e) {
+        return;
+    }
+    const header = locations.header;
+    if (!header || header.format !== LOCATIONS_FORMAT || header.version !== LOCATIONS_VERSION) {
+        return;
+    }
+    if (!matchesSource(header, MAKEPAD_WIDGETS_PATH)) {
+        console.log('locations.json was built from other Makepad sources - using the scanned locations');
+        return;
+    }
+    if (locations.properties) {
+        PROPERTY_LOCATIONS = locations.properties;
+        STRUCT_BASES = locations.bases || {};
+    }
+    if (locations.variants) {
+        VARIANT_LOCATIONS = locations.variants;
+    }
+}
+
+/**
+ * The declaration of a property as seen from a widget: its own field, else
+ * the first base (depth-first, in field order) that declares it, else the
+ * most relevant declaration overall
+ */
+function propertyLocation(name: string, widget: string | null): PropertyLocation | null {
+    const entries = PROPERTY_LOCATIONS[name];
+    if (!entries || entries.length === 0) return null;
+
+    const seen = new Set<string>();
+    const find = (struct: string): PropertyLocation | undefined => {
+        if (seen.has(struct)) return undefined;
+        seen.add(struct);
+        const own = entries.find(entry => entry.struct === struct);
+        if (own) return own;
+        for (const base of STRUCT_BASES[struct] || []) {
+            const inherited = find(base);
+            if (inherited) return inherited;
+        }
+        return undefined;
+    };
+    return (widget && find(widget)) || entries[0];
+}
+
+// Completion tables written by scripts/completion_tables.py (see that file for the layout)
+const COMPLETIONS_FORMAT = 'makepad-completions';
+const COMPLETIONS_VERSION = 3;
+
+interface CompletionTables {
+    header: SourceHeader & { format: string; version: number };
+    widgets: [string, string][];                 // [name, doc], sorted by lower-cased name
+    properties: [string, string, string][];      // [name, type, doc], sorted by lower-cased name
+    widget_properties: Record<string, number[]>; // widget -> indexes into properties
+    values: Record<string, string[]>;            // property -> values
+    property_enums: Record<string, string>;      // property -> Live enum it takes
+    enums: Record<string, EnumTable>;
+}
+
+interface EnumTable {
+    doc: string;
+    default: string | null;        // the #[pick] variant
+    variants: [string, string][];  // [name, doc], in declaration order
+}
+
+/**
+ * Completion items sorted by lower-cased label. Items are built once and
+ * every lookup is two binary searches for the range matching a prefix.
+ */
+class PrefixTable {
+    private keys: string[] = [];
+    private items: vscode.CompletionItem[] = [];
+
+    /** Entries must already be sorted by lower-cased name */
+    static fromSorted(entries: [string, vscode.CompletionItem][]): PrefixTable {
+        const table = new PrefixTable();
+        for (const [name, item] of entries) {
+            table.keys.push(name.toLowerCase());
+            table.items.push(item);
+        }
+        return table;
+    }
+
+    has(name: string): boolean {
+        const key = name.toLowerCase();
+        const i = lowerBound(this.keys, key);
+        return i < this.keys.length && this.keys[i] === key;
+    }
+
+    insert(name: string, item: vscode.CompletionItem): void {
+        const i = lowerBound(this.keys, name.toLowerCase());
+        this.keys.splice(i, 0, name.toLowerCase());
+        this.items.splice(i, 0, item);
+    }
+
+    lookup(prefix: string): vscode.CompletionItem[] {
+        const key = prefix.toLowerCase();
+        const lo = lowerBound(this.keys, key);
+        return this.items.slice(lo, lowerBound(this.keys, key + '\uffff', lo));
+    }
+}
+
+function lowerBound(keys: string[], key: string, lo = 0): number {
+    let hi = keys.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >>> 1;
+        if (keys[mid] < key) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+let COMPLETIONS: CompletionTables | null = null;
+let WIDGET_TABLE = new PrefixTable();
+let PROPERTY_TABLE = new PrefixTable();
+const WIDGET_PROPERTY_TABLES = new Map<string, PrefixTable>();
+const VALUE_ITEMS = new Map<string, vscode.CompletionItem[]>();
+
+function widgetItem(name: string, description: string): vscode.CompletionItem {
+    const item = new vscode.CompletionItem(name, vscode.CompletionItemKind.Class);
+    item.detail = 'Makepad Widget';
+    if (description) {
+        item.documentation = new vscode.MarkdownString(description);
+    }
+    item.insertText = new vscode.SnippetString(`${name}> {\n\t$0\n}`);
+    return item;
+}
+
+function propertyItem(name: string, type: string, description: string, values: string[]): vscode.CompletionItem {
+    const item = new vscode.CompletionItem(name, vscode.CompletionItemKind.Property);
+    item.detail = type;
+    if (description) {
+        item.documentation = new vscode.MarkdownString(description);
+    }
+
+    if (name === 'align') {
+        item.insertText = new vscode.SnippetString(`${name}: {x: \${1:0.5}, y: \${2:0.5}}`);
+    } else if (name === 'padding' || name === 'margin') {
+        item.insertText = new vscode.SnippetString(`${name}: \${1:10}`);
+    } else if (name === 'draw_bg') {
+        item.insertText = new vscode.SnippetString(`${name}: {\n\tcolor: \${1:#333}\n}`);
+    } else if (values.length > 1) {
+        item.insertText = new vscode.SnippetString(`${name}: \${1|${values.join(',')}|}`);
+    } else {
+        item.insertText = new vscode.SnippetString(`${name}: \${1:value}`);
+    }
+    return item;
+}
+
+/**
+ * The Live enum a property takes - from the generated tables, else the
+ * documented type if the index or scan found an enum of that name
+ */
+function propertyEnum(name: string | null): string | null {
+    if (!name) return null;
+    const generated = COMPLETIONS?.property_enums[name];
+    if (generated) {
+        return generated;
+    }
+    const type = PROPERTY_DOCS[name]?.type;
+    return type && ENUM_VARIANTS[type] ? type : null;
+}
+
+/**
+ * Values offered after `property:` - from the generated tables, else the
+ * variants of the property's enum found by the index or scan, else the
+ * hand-written PROPERTY_DOCS (placeholders like <number> are skipped)
+ */
+function propertyValues(name: string): string[] {
+    const generated = COMPLETIONS?.values[name];
+    if (generated) {
+        return generated;
+    }
+    const enumName = propertyEnum(name);
+    if (enumName) {
+        return ENUM_VARIANTS[enumName];
+    }
+    const prop = PROPERTY_DOCS[name];
+    return prop ? prop.values.filter(value => !value.startsWith('<') && !value.startsWith('{')) : [];
+}
+
+/**
+ * Hand-written value forms that aren't enum variants (`<number>`,
+ * `{x: 0.0-1.0, y: 0.0-1.0}`, `dep("...")`), shown on hover after the values
+ */
+function valueHints(name: string): string[] {
+    const prop = PROPERTY_DOCS[name];
+    return prop ? prop.values.filter(value => !/^\w+$/.test(value)) : [];
+}
+
+/**
+ * The declaration of an enum value, preferring the enum of the property it
+ * is assigned to, else the most relevant one
+ */
+function variantLocation(name: string, property: string | null): VariantLocation | null {
+    const entries = VARIANT_LOCATIONS[name];
+    if (!entries || entries.length === 0) return null;
+    const enumName = propertyEnum(property);
+    return entries.find(entry => entry.enum === enumName) || entries[0];
+}
+
+/**
+ * The property a value is being assigned to (`flow: Down` -> flow), if any
+ */
+function propertyBefore(document: vscode.TextDocument, range: vscode.Range): string | null {
+    const before = document.lineAt(range.start.line).text.substring(0, range.start.character);
+    const match = before.match(/(\w+)\s*:\s*$/);
+    return match ? match[1] : null;
+}
+
+function valueItems(name: string): vscode.CompletionItem[] {
+    let items = VALUE_ITEMS.get(name);
+    if (!items) {
+        const enumName = propertyEnum(name);
+        const table = enumName ? COMPLETIONS?.enums[enumName] : undefined;
+        const docs = new Map(table?.variants || []);
+        items = propertyValues(name).map(value => {
+            const item = new vscode.CompletionItem(value, vscode.CompletionItemKind.EnumMember);
+            const isDefault = value === table?.default;
+            item.detail = isDefault ? `${enumName} (default)` : enumName || name;
+            const doc = docs.get(value);
+            if (doc) {
+                item.documentation = new vscode.MarkdownString(doc);
+            }
+            item.preselect = isDefault;
+            return item;
+        });
+        VALUE_ITEMS.set(name, items);
+    }
+    return items;
+}
+
+/**
+ * Build the widget and property prefix tables from the generated completion
+ * tables (if present and built from the Makepad source found), the
+ * hand-written docs and the scanned widget locations.
+ */
+function loadCompletionTables(tablesPath: string): void {
+    try {
+        const tables: CompletionTables = JSON.parse(fs.readFileSync(tablesPath, 'utf8'));
+        const header = tables.header;
+        if (header && header.format === COMPLETIONS_FORMAT && header.version === COMPLETIONS_VERSION) {
+            if (matchesSource(header, MAKEPAD_WIDGETS_PATH)) {
+                COMPLETIONS = tables;
+            } else {
+                console.log('Completion tables were built from other Makepad sources - using the scanned index');
+            }
+        }
+    } catch (e) {
+        COMPLETIONS = null;
+    }
+
+    if (COMPLETIONS) {
+        WIDGET_TABLE = PrefixTable.fromSorted(COMPLETIONS.widgets.map(([name, doc]) =>
+            [name, widgetItem(name, WIDGET_DOCS[name]?.description || doc)]));
+        PROPERTY_TABLE = PrefixTable.fromSorted(COMPLETIONS.properties.map(([name, type, doc]) =>
+            [name, propertyItem(name, type, PROPERTY_DOCS[name]?.description || doc, propertyValues(name))]));
+    }
+
+    // Widgets defined only in live_design! (no backing struct) and anything the tables lack
+    for (const name of [...Object.keys(WIDGET_DOCS), ...Object.keys(WIDGET_LOCATIONS)]) {
+        if (!WIDGET_TABLE.has(name)) {
+            WIDGET_TABLE.insert(name, widgetItem(name, WIDGET_DOCS[name]?.description || ''));
+        }
+    }
+    for (const [name, prop] of Object.entries(PROPERTY_DOCS)) {
+        if (!PROPERTY_TABLE.has(name)) {
+            PROPERTY_TABLE.insert(name, propertyItem(name, prop.type, prop.description, propertyValues(name)));
+        }
+    }
+    for (const [name, entries] of Object.entries(PROPERTY_LOCATIONS)) {
+        if (!PROPERTY_TABLE.has(name)) {
+            PROPERTY_TABLE.insert(name, propertyItem(name, '', `Declared in ${entries[0].struct}`, propertyValues(name)));
+        }
+    }
+}
+
+/**
+ * Properties of one widget from the generated tables, or null if unknown
+ */
+function widgetPropertyTable(widget: string): PrefixTable | null {
+    const ids = COMPLETIONS?.widget_properties[widget];
+    if (!COMPLETIONS || !ids) {
+        return null;
+    }
+    let table = WIDGET_PROPERTY_TABLES.get(widget);
+    if (!table) {
+        const properties = COMPLETIONS.properties;
+        // Indexes are in table order, so the entries stay sorted
+        table = PrefixTable.fromSorted(ids.map(id => {
+            const [name, type, doc] = properties[id];
+            return [name, propertyItem(name, type, PROPERTY_DOCS[name]?.description || doc, propertyValues(name))];
+        }));
+        WIDGET_PROPERTY_TABLES.set(widget, table);
+    }
+    return table;
+}
+
+/**
+ * True if a live_design! macro starts before the cursor. Walks back line by
+ * line instead of copying the whole document prefix on every request.
+ */
+function inLiveDesign(document: vscode.TextDocument, position: vscode.Position): boolean {
+    for (let line = position.line; line >= 0; line--) {
+        const text = document.lineAt(line).text;
+        if ((line === position.line ? text.substring(0, position.character) : text).includes('live_design!')) {
+            return true;
+        }
+    }
+    return false;
+}
+
+/**
+ * Name of the `<Widget> {` block enclosing the cursor, if any
+ */
+function enclosingWidget(document: vscode.TextDocument, position: vscode.Position): string | null {
+    let depth = 0;
+    for (let line = position.line; line >= 0; line--) {
+        const full = document.lineAt(line).text;
+        const text = line === position.line ? full.substring(0, position.character) : full;
+        for (let i = text.length - 1; i >= 0; i--) {
+            if (text[i] === '}') {
+                depth++;
+            } else if (text[i] === '{') {
+                if (depth === 0) {
+                    const match = text.substring(0, i).match(/<(\w+)>\s*$/);
+                    return match ? match[1] : null;
+                }
+                depth--;
+            }
+        }
+        if (text.includes('live_design!')) {
+            break;
+        }
+    }
+    return null;
+}
+
 export function activate(context: vscode.ExtensionContext) {
     console.log('Makepad Live Design extension activated');
     
-    // Scan Makepad source for definitions
-    scanMakepadSource();
+    // Load the prebuilt index, or scan Makepad source for definitions
+    scanMakepadSource(context.asAbsolutePath(path.join('src', 'makepad_index.json')), context.globalStorageUri.fsPath);
+    loadLocations(context.asAbsolutePath(path.join('src', 'locations.json')));
+    loadCompletionTables(context.asAbsolutePath(path.join('src', 'completions.json')));
 
     // DEFINITION PROVIDER for Go-to-Definition (Cmd+Click)
     const definitionProvider = vscode.languages.registerDefinitionProvider('rust', {
@@ -382,8 +1031,7 @@ export function activate(context: vscode.ExtensionContext) {
             const word = document.getText(range);
             
             // Check if inside live_design! macro
-            const textBefore = document.getText(new vscode.Range(0, 0, position.line, position.character));
-            if (!textBefore.includes('live_design!')) {
+            if (!inLiveDesign(document, position)) {
                 return null;
             }
 
@@ -398,9 +1046,9 @@ export function activate(context: vscode.ExtensionContext) {
                 }
             }
 
-            // Property names
-            if (PROPERTY_LOCATIONS[word]) {
-                const loc = PROPERTY_LOCATIONS[word];
+            // Property names, resolved through the enclosing widget's bases
+            const loc = propertyLocation(word, enclosingWidget(document, position));
+            if (loc) {
                 if (fs.existsSync(loc.file)) {
                     return new vscode.Location(
                         vscode.Uri.file(loc.file),
@@ -409,36 +1057,13 @@ export function activate(context: vscode.ExtensionContext) {
                 }
             }
 
-            // Enum values - search in discovered Makepad path
-            if (MAKEPAD_WIDGETS_PATH) {
-                const enumLocations: Record<string, { file: string; pattern: string }> = {
-                    'Fill': { file: 'view.rs', pattern: 'Fill' },
-                    'Fit': { file: 'view.rs', pattern: 'Fit' },
-                    'Down': { file: 'view.rs', pattern: 'Down' },
-                    'Right': { file: 'view.rs', pattern: 'Right' },
-                    'Overlay': { file: 'view.rs', pattern: 'Overlay' },
-                    'Centered': { file: 'image_cache.rs', pattern: 'Centered' },
-                    'Smallest': { file: 'image_cache.rs', pattern: 'Smallest' },
-                    'Biggest': { file: 'image_cache.rs', pattern: 'Biggest' },
-                    'Stretch': { file: 'image_cache.rs', pattern: 'Stretch' },
-                };
-
-                if (enumLocations[word]) {
-                    const enumInfo = enumLocations[word];
-                    const filePath = path.join(MAKEPAD_WIDGETS_PATH, enumInfo.file);
-                    if (fs.existsSync(filePath)) {
-                        const content = fs.readFileSync(filePath, 'utf8');
-                        const lines = content.split('\n');
-                        for (let i = 0; i < lines.length; i++) {
-                            if (lines[i].includes(enumInfo.pattern) && lines[i].includes('#[')) {
-                                return new vscode.Location(
-                                    vscode.Uri.file(filePath),
-                                    new vscode.Position(i, 0)
-                                );
-                            }
-                        }
-                    }
-                }
+            // Enum values, in the enum of the property being set (`flow: Down`)
+            const variantLoc = variantLocation(word, propertyBefore(document, range));
+            if (variantLoc && fs.existsSync(variantLoc.file)) {
+                return new vscode.Location(
+                    vscode.Uri.file(variantLoc.file),
+                    new vscode.Position(variantLoc.line - 1, 0)
+                );
             }
 
             return null;
@@ -454,8 +1079,7 @@ export function activate(context: vscode.ExtensionContext) {
             const word = document.getText(range);
 
             // Check if inside live_design! macro
-            const textBefore = document.getText(new vscode.Range(0, 0, position.line, position.character));
-            if (!textBefore.includes('live_design!')) {
+            if (!inLiveDesign(document, position)) {
                 return null;
             }
 
@@ -486,7 +1110,30 @@ export function activate(context: vscode.ExtensionContext) {
                 markdown.appendMarkdown(`## ${word}\n\n`);
                 markdown.appendMarkdown(`**Type:** \`${prop.type}\`\n\n`);
                 markdown.appendMarkdown(`${prop.description}\n\n`);
-                markdown.appendMarkdown(`**Values:** \`${prop.values.join('`, `')}\``);
+                const values = propertyValues(word);
+                const hints = valueHints(word).filter(hint => !values.includes(hint));
+                if (values.length + hints.length > 0) {
+                    const table = COMPLETIONS?.enums[propertyEnum(word) || ''];
+                    const shown = values.map(value => value === table?.default ? `\`${value}\` (default)` : `\`${value}\``);
+                    markdown.appendMarkdown(`**Values:** ${[...shown, ...hints.map(hint => `\`${hint}\``)].join(', ')}`);
+                }
+                return new vscode.Hover(markdown, range);
+            }
+
+            // Enum values: the variant's docs and the rest of its enum
+            const variantLoc = variantLocation(word, propertyBefore(document, range));
+            if (variantLoc) {
+                const table = COMPLETIONS?.enums[variantLoc.enum];
+                const doc = table?.variants.find(([name]) => name === word)?.[1] || table?.doc;
+                const markdown = new vscode.MarkdownString();
+                markdown.appendMarkdown(`## ${word}\n\n`);
+                markdown.appendMarkdown(`**Enum:** \`${variantLoc.enum}\`${table?.default === word ? ' (default)' : ''}\n\n`);
+                if (doc) {
+                    markdown.appendMarkdown(`${doc}\n\n`);
+                }
+                const values = table ? table.variants.map(([name]) => name) : ENUM_VARIANTS[variantLoc.enum] || [];
+                markdown.appendMarkdown(`**Values:** \`${values.join('`, `')}\`\n\n`);
+                markdown.appendMarkdown(`**Source:** \`${path.basename(variantLoc.file)}:${variantLoc.line}\``);
                 return new vscode.Hover(markdown, range);
             }
 
@@ -497,13 +1144,10 @@ export function activate(context: vscode.ExtensionContext) {
     // COMPLETION PROVIDER
     const completionProvider = vscode.languages.registerCompletionItemProvider('rust', {
         provideCompletionItems(document, position, _token, context) {
-            const textBefore = document.getText(new vscode.Range(0, 0, position.line, position.character));
-            
-            if (!textBefore.includes('live_design!')) {
+            if (!inLiveDesign(document, position)) {
                 return [];
             }
 
-            const items: vscode.CompletionItem[] = [];
             const line = document.lineAt(position.line).text;
             const charBefore = line.substring(0, position.character);
 
@@ -512,67 +1156,26 @@ export function activate(context: vscode.ExtensionContext) {
             const isExplicitInvoke = context.triggerKind === vscode.CompletionTriggerKind.Invoke;
 
             // After '<' - suggest widgets (only on trigger character '<')
-            if (charBefore.match(/<\s*$/) && (isTriggerCharacter || isExplicitInvoke)) {
-                for (const [name, widget] of Object.entries(WIDGET_DOCS)) {
-                    const item = new vscode.CompletionItem(name, vscode.CompletionItemKind.Class);
-                    item.detail = 'Makepad Widget';
-                    item.documentation = new vscode.MarkdownString(widget.description);
-                    item.insertText = new vscode.SnippetString(`${name}> {\n\t$0\n}`);
-                    items.push(item);
-                }
-                
-                // Add widgets from scanned source
-                for (const name of Object.keys(WIDGET_LOCATIONS)) {
-                    if (!WIDGET_DOCS[name]) {
-                        const item = new vscode.CompletionItem(name, vscode.CompletionItemKind.Class);
-                        item.detail = 'Makepad Widget';
-                        item.insertText = new vscode.SnippetString(`${name}> {\n\t$0\n}`);
-                        items.push(item);
-                    }
-                }
-                return items;
+            const widgetMatch = charBefore.match(/<\s*(\w*)$/);
+            if (widgetMatch && (isTriggerCharacter || isExplicitInvoke)) {
+                return WIDGET_TABLE.lookup(widgetMatch[1]);
             }
 
             // After property: - suggest values (only on trigger character ':')
             const propMatch = charBefore.match(/(\w+):\s*$/);
             if (propMatch && (isTriggerCharacter || isExplicitInvoke)) {
-                const propName = propMatch[1];
-                const prop = PROPERTY_DOCS[propName];
-                if (prop) {
-                    for (const value of prop.values) {
-                        if (!value.startsWith('<') && !value.startsWith('{')) {
-                            const item = new vscode.CompletionItem(value, vscode.CompletionItemKind.Value);
-                            item.detail = propName;
-                            items.push(item);
-                        }
-                    }
-                }
-                return items;
+                return valueItems(propMatch[1]);
             }
 
             // Inside widget - suggest properties (ONLY on explicit invoke Ctrl/Cmd+Space)
-            if (isExplicitInvoke && (charBefore.match(/^\s*$/) || charBefore.match(/{\s*$/))) {
-                for (const [name, prop] of Object.entries(PROPERTY_DOCS)) {
-                    const item = new vscode.CompletionItem(name, vscode.CompletionItemKind.Property);
-                    item.detail = prop.type;
-                    item.documentation = new vscode.MarkdownString(prop.description);
-                    
-                    if (name === 'align') {
-                        item.insertText = new vscode.SnippetString(`${name}: {x: \${1:0.5}, y: \${2:0.5}}`);
-                    } else if (name === 'padding' || name === 'margin') {
-                        item.insertText = new vscode.SnippetString(`${name}: \${1:10}`);
-                    } else if (name === 'draw_bg') {
-                        item.insertText = new vscode.SnippetString(`${name}: {\n\tcolor: \${1:#333}\n}`);
-                    } else if (prop.values.length > 1) {
-                        item.insertText = new vscode.SnippetString(`${name}: \${1|${prop.values.join(',')}|}`);
-                    } else {
-                        item.insertText = new vscode.SnippetString(`${name}: \${1:value}`);
-                    }
-                    items.push(item);
-                }
+            const propertyMatch = charBefore.match(/(?:^|{)\s*(\w*)$/);
+            if (isExplicitInvoke && propertyMatch) {
+                const widget = enclosingWidget(document, position);
+                const table = (widget && widgetPropertyTable(widget)) || PROPERTY_TABLE;
+                return table.lookup(propertyMatch[1]);
             }
 
-            return items;
+            return [];
         }
     }, '<', ':');
 
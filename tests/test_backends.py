@@ -0,0 +1,103 @@
+"""
+Tests that the mmap/bytes parsing path in scripts/makepad_index.py produces
+the same index as the str path.
+
+Run from the repository root with `python -m unittest discover tests` (or
+pytest).
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from benchmark import generate_corpus  # noqa: E402
+from makepad_index import ExtractionCache, build_index, open_source, parse_file  # noqa: E402
+
+CRATES = ["widgets", "draw"]
+
+# Non-ASCII docs and names shift byte offsets away from character offsets
+UNICODE_WIDGET = """use crate::*;
+
+/// A label for ünïcödé text ✓
+#[derive(Live, LiveHook, Widget)]
+pub struct UnicodeLabel {
+    /// Größe des Textes
+    #[live(12.0)] font_größe: f64,
+    #[live] label: String, // «comment» }
+    #[live("✓ ünï")] mark: String,
+    #[deref] view: View,
+}
+
+#[derive(Live, LiveHook)]
+pub enum Ausrichtung {
+    #[pick] Links,
+    /// Rechts ➜
+    Rechts,
+}
+"""
+
+def snapshot(index) -> list:
+    return [(f.path, f.structs, f.enums) for f in index.files]
+
+class BackendEquivalenceTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="makepad-backend-test-"))
+        generate_corpus(self.root, 12, 3, 6, 2, 2, True, seed=3)
+        src = self.root / "widgets" / "src"
+        (src / "unicode.rs").write_text(UNICODE_WIDGET)
+        (src / "crlf.rs").write_bytes(UNICODE_WIDGET.replace("UnicodeLabel", "Crlf").replace("\n", "\r\n").encode())
+        (src / "lone_cr.rs").write_bytes(UNICODE_WIDGET.replace("UnicodeLabel", "LoneCr").replace("\n", "\r").encode())
+        (src / "empty.rs").write_bytes(b"")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def build(self, backend: str, **kwargs):
+        return build_index(root=self.root, crates=CRATES, backend=backend, **kwargs)
+
+    def test_parse_file_str_bytes_and_mmap(self):
+        path = self.root / "widgets" / "src" / "crlf.rs"
+        with open_source(path, "str") as text:
+            expected = parse_file(text, "crlf.rs")
+        self.assertEqual([s.name for s in expected[0]], ["Crlf"])
+        self.assertEqual(parse_file(path.read_bytes(), "crlf.rs"), expected)
+        with open_source(path, "mmap") as mapped:
+            self.assertEqual(parse_file(mapped, "crlf.rs"), expected)
+
+    def test_positions_count_characters(self):
+        structs, enums = parse_file(UNICODE_WIDGET.encode(), "unicode.rs")
+        self.assertEqual((structs, enums), parse_file(UNICODE_WIDGET, "unicode.rs"))
+        size, _, mark = structs[0].properties
+        self.assertEqual((size.name, size.default, size.line, size.column), ("font_größe", "12.0", 7, 19))
+        self.assertEqual((mark.name, mark.default, mark.line, mark.column), ("mark", '"✓ ünï"', 9, 22))
+        self.assertEqual(enums[0].variants[1].doc, "Rechts ➜")
+
+    def test_sequential_index_matches(self):
+        expected = snapshot(self.build("str", io_workers=0))
+        self.assertIn("LoneCr", [s.name for _, structs, _ in expected for s in structs])
+        self.assertEqual(snapshot(self.build("mmap", io_workers=0)), expected)
+        self.assertEqual(snapshot(self.build("mmap", io_workers=0, jobs=2)), expected)
+
+    def test_pipeline_index_matches(self):
+        expected = snapshot(self.build("str", io_workers=0))
+        self.assertEqual(snapshot(self.build("str", io_workers=4)), expected)
+        self.assertEqual(snapshot(self.build("mmap", io_workers=4)), expected)
+
+    def test_backends_share_cache_entries(self):
+        cache_path = self.root / "cache.json"
+        cold = ExtractionCache(cache_path, rebuild=True)
+        expected = snapshot(self.build("str", cache=cold, io_workers=0))
+        # Same bytes, new mtimes: the mmap build must hash to the str build's entries
+        for path in (self.root / "widgets" / "src").glob("*.rs"):
+            path.touch()
+        warm = ExtractionCache(cache_path)
+        self.assertEqual(snapshot(self.build("mmap", cache=warm, io_workers=0)), expected)
+        self.assertEqual(warm.misses, 0)
+        self.assertGreater(warm.hits, 0)
+
+if __name__ == "__main__":
+    unittest.main()
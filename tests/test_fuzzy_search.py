@@ -0,0 +1,148 @@
+"""
+Tests for the ranking in scripts/fuzzy_search.py: half-remembered names,
+word-by-word abbreviations and typos, and the shipped table's header checks.
+
+Run from the repository root with `python -m unittest discover tests` (or
+pytest).
+"""
+
+import io
+import sys
+import json
+import random
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from fuzzy_search import (SymbolIndex, benchmark, generate_symbols, load_symbol_table, marked_key,  # noqa: E402
+                          subsequence_score, symbol_key, word_starts, write_symbol_table)
+
+SYMBOLS = [
+    ["PortalList", "widget", "A virtualized list"],
+    ["PortalListItem", "widget", ""],
+    ["ScrollYView", "widget", ""],
+    ["ScrollXYView", "widget", ""],
+    ["ScrollBars", "widget", ""],
+    ["View", "widget", ""],
+    ["draw_bg", "property", "DrawQuad"],
+    ["draw_border_glow", "property", "DrawColor"],
+    ["draw_icon", "property", "DrawIcon"],
+    ["drag_bar", "property", "f64"],
+    ["show_bg", "property", "bool"],
+    ["scroll_bars", "property", "ScrollBars"],
+    ["Flow", "enum", ""],
+    ["Down", "variant", "Flow"],
+    ["DownRight", "variant", "Flow"],
+]
+
+def names(results: list) -> list:
+    return [symbol[0] for _, symbol in results]
+
+class KeyTest(unittest.TestCase):
+    def test_keys_and_word_starts(self):
+        self.assertEqual(symbol_key("draw_bg"), "drawbg")
+        self.assertEqual(symbol_key("Flow::Down"), "flowdown")
+        self.assertEqual(word_starts("ScrollYView"), (0, 6))
+        self.assertEqual(word_starts("draw_bg"), (0, 4))
+        self.assertEqual(word_starts("Vec2d_3"), (0, 3, 5))
+
+    def test_score_prefers_runs_and_word_starts(self):
+        def score(query, name):
+            key = symbol_key(name)
+            return subsequence_score(query, key, marked_key(key, word_starts(name)))
+        self.assertIsNone(score("xyz", "draw_bg"))
+        self.assertGreater(score("drawbg", "draw_bg"), score("drawbg", "draw_border_glow"))
+        self.assertGreater(score("down", "Down"), score("down", "DownRight"))
+        self.assertGreater(score("sv", "ScrollView"), score("sv", "Subview"))
+
+class RankingTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SymbolIndex(SYMBOLS)
+
+    def test_half_remembered_names(self):
+        self.assertEqual(names(self.index.search("PortalLst", 3))[0], "PortalList")
+        self.assertEqual(names(self.index.search("drawbg", 3))[0], "draw_bg")
+        self.assertEqual(names(self.index.search("ScrollYV", 3))[0], "ScrollYView")
+
+    def test_exact_match_first(self):
+        self.assertEqual(names(self.index.search("Down", 2)), ["Down", "DownRight"])
+        self.assertEqual(names(self.index.search("view", 1)), ["View"])
+
+    def test_word_abbreviations(self):
+        self.assertEqual(names(self.index.search("sxyv", 1)), ["ScrollXYView"])
+        self.assertEqual(names(self.index.search("dbg", 2))[0], "draw_bg")
+        self.assertEqual(names(self.index.search("PLItem", 1)), ["PortalListItem"])
+
+    def test_swapped_letters(self):
+        self.assertEqual(names(self.index.search("Dwon", 2)), ["Down", "DownRight"])
+        self.assertEqual(names(self.index.search("drabwg", 1)), ["draw_bg"])
+        # Swapped back, "flwo" is Flow exactly, but still scores below typing it right
+        self.assertEqual(names(self.index.search("flwo", 1)), ["Flow"])
+        self.assertLess(self.index.search("flwo", 1)[0][0], self.index.search("flow", 1)[0][0])
+
+    def test_longer_typos_by_shared_trigrams(self):
+        results = self.index.search("PortlaListItem", 3)
+        self.assertEqual(names(results)[0], "PortalListItem")
+        self.assertTrue(all(score < 0 for score, _ in results))
+
+    def test_kind_filter_and_empty_query(self):
+        properties = self.index.search("scrollbars", 5, "property")
+        self.assertEqual(names(properties)[0], "scroll_bars")
+        self.assertEqual({symbol[1] for _, symbol in properties}, {"property"})
+        self.assertEqual(names(self.index.search("scrollbars", 5, "widget"))[0], "ScrollBars")
+        self.assertEqual(self.index.search("__", 5), [])
+
+class IndexedSearchTest(unittest.TestCase):
+    def test_table_round_trip(self):
+        index = SymbolIndex(generate_symbols(2000, random.Random(4)))
+        table = json.loads(json.dumps(index.to_table()))
+        loaded = SymbolIndex(table["symbols"], table["trigrams"])
+        for query in ("drawbg", "scrlview", "btnclr", "lyout", "x"):
+            self.assertEqual(loaded.search(query, 10), index.search(query, 10))
+
+    def test_top_score_matches_full_scan(self):
+        # Candidates are only the likeliest symbols, so a few queries may miss the best match
+        index = SymbolIndex(generate_symbols(3000, random.Random(7)))
+        rng = random.Random(8)
+        agree = 0
+        for symbol in rng.sample(index.symbols, 100):
+            key = symbol_key(symbol[0])
+            query = ''.join(ch for i, ch in enumerate(key) if i == 0 or rng.random() < 0.7)
+            best = max(score for score in (subsequence_score(query, k, m) for k, m in zip(index.keys, index.marked))
+                       if score is not None)
+            agree += index.search(query, 1)[0][0] == best
+        self.assertGreaterEqual(agree, 95)
+
+    def test_benchmark_meets_recall_threshold(self):
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertTrue(benchmark(3000, queries=400))
+            self.assertFalse(benchmark(300, queries=50, min_recall=1.01))
+        self.assertIn("below 101%", output.getvalue())
+
+class TableTest(unittest.TestCase):
+    def setUp(self):
+        self.work = Path(tempfile.mkdtemp(prefix="makepad-symbols-test-"))
+        self.path = self.work / "makepad.symbols.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def test_fingerprint_is_checked(self):
+        with redirect_stdout(io.StringIO()):
+            write_symbol_table(SymbolIndex(SYMBOLS).to_table("abc"), self.path)
+        self.assertEqual(names(load_symbol_table(self.path, "abc").search("drawbg", 1)), ["draw_bg"])
+        self.assertEqual(len(load_symbol_table(self.path).symbols), len(SYMBOLS))
+        with self.assertRaises(ValueError):
+            load_symbol_table(self.path, "def")
+
+    def test_other_formats_are_rejected(self):
+        self.path.write_text(json.dumps({"header": {"format": "makepad-symbols", "version": 0}}))
+        with self.assertRaises(ValueError):
+            load_symbol_table(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Tests for the JSON-RPC request handling in scripts/index_server.py.
+
+Run from the repository root with `python -m unittest discover tests` (or
+pytest).
+"""
+
+import io
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from index_server import (INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR,  # noqa: E402
+                          IndexServer, serve)
+from makepad_index import build_index  # noqa: E402
+
+VIEW = """use crate::*;
+
+#[derive(Live, LiveHook)]
+pub enum Flow {
+    #[pick] Right,
+    /// Top to bottom
+    Down,
+}
+
+/// Lays out its children.
+#[derive(Live, LiveHook, Widget)]
+pub struct View {
+    /// Direction children are placed in
+    #[live] flow: Flow,
+    #[live] show_bg: bool,
+}
+"""
+
+BUTTON = """use crate::*;
+
+/// A clickable button.
+#[derive(Live, LiveHook, Widget)]
+pub struct Button {
+    #[deref] view: View,
+    /// The label
+    #[live] text: String,
+}
+"""
+
+def touch(path: Path, line: str):
+    """Append a line to a file and move its mtime forward, as an editor save would."""
+    with open(path, 'a') as f:
+        f.write(line)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+class IndexServerTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="makepad-server-test-"))
+        self.src = self.root / "widgets" / "src"
+        self.src.mkdir(parents=True)
+        (self.src / "view.rs").write_text(VIEW)
+        (self.src / "button.rs").write_text(BUTTON)
+        self.server = IndexServer(build_index(root=self.root, crates=["widgets"], io_workers=0))
+        self.next_id = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def call(self, method: str, **params) -> dict:
+        self.next_id += 1
+        response = json.loads(self.server.handle_line(json.dumps(
+            {'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params})))
+        self.assertEqual((response['jsonrpc'], response['id']), ('2.0', self.next_id))
+        return response
+
+    def result(self, method: str, **params):
+        response = self.call(method, **params)
+        self.assertNotIn('error', response)
+        return response['result']
+
+    def error_code(self, line: str) -> int:
+        return json.loads(self.server.handle_line(line))['error']['code']
+
+    def test_initialize(self):
+        status = self.result('initialize')
+        self.assertEqual((status['files'], status['widgets'], status['enums']), (2, 2, 1))
+        self.assertEqual(status['fingerprint'], self.server.index.fingerprint)
+
+    def test_definition_resolves_through_bases(self):
+        self.assertEqual(self.result('definition', name='flow', widget='Button'),
+                         {'kind': 'property', 'struct': 'View', 'file': str(self.src / "view.rs"),
+                          'line': 14, 'column': 13})
+        variant = self.result('definition', name='Down', property='flow')
+        self.assertEqual((variant['kind'], variant['enum'], variant['line']), ('variant', 'Flow', 7))
+        self.assertEqual(self.result('definition', name='Button')['kind'], 'widget')
+        self.assertIsNone(self.result('definition', name='nothing'))
+
+    def test_hover(self):
+        button = self.result('hover', name='Button')
+        self.assertEqual((button['doc'], button['properties']), ("A clickable button.", ["flow", "show_bg", "text"]))
+        down = self.result('hover', name='Down', property='flow')
+        self.assertEqual((down['doc'], down['default'], down['values']), ("Top to bottom", "Right", ["Right", "Down"]))
+
+    def test_complete_and_search(self):
+        properties = self.result('complete', kind='property', widget='Button', prefix='s')
+        self.assertEqual([item['label'] for item in properties['items']], ["show_bg"])
+        values = self.result('complete', kind='value', property='flow')
+        self.assertEqual(sorted(item['label'] for item in values['items']), ["Down", "Right"])
+        self.assertEqual(self.result('search', query='btn')['items'][0]['label'], "Button")
+
+    def test_context_of_open_document(self):
+        text = 'live_design!{ A = <Button> { text: "x" } }'
+        self.assertIsNone(self.result('open', uri='file:///a.rs', text=text))
+        context = self.result('context', uri='file:///a.rs', offset=text.index('text'))
+        self.assertEqual((context['widget'], context['name']), ("Button", "A"))
+        self.assertEqual(self.result('context', uri='file:///a.rs', line=0, character=text.index('text')), context)
+        self.result('close', uri='file:///a.rs')
+        self.assertEqual(self.call('context', uri='file:///a.rs', offset=0)['error']['code'], INVALID_PARAMS)
+
+    def test_errors(self):
+        self.assertEqual(self.error_code('{bad'), PARSE_ERROR)
+        self.assertEqual(self.error_code('[1, 2]'), INVALID_REQUEST)
+        self.assertEqual(self.error_code('{"jsonrpc": "2.0", "id": 1, "method": "nope"}'), METHOD_NOT_FOUND)
+        self.assertEqual(self.error_code('{"jsonrpc": "2.0", "id": 1, "method": "hover", "params": [1]}'),
+                         INVALID_PARAMS)
+        self.assertEqual(self.call('definition', nom='x')['error']['code'], INVALID_PARAMS)
+        self.assertEqual(self.call('complete', kind='bogus')['error']['code'], INVALID_PARAMS)
+        self.assertEqual(self.call('search', query='x', kind='bogus')['error']['code'], INVALID_PARAMS)
+
+    def test_notifications_get_no_reply(self):
+        self.assertIsNone(self.server.handle_line(json.dumps(
+            {'jsonrpc': '2.0', 'method': 'open', 'params': {'uri': 'u', 'text': ''}})))
+        self.assertIn('u', self.server.documents)
+        self.assertEqual(self.server.request_stats()['open']['count'], 1)
+
+    def test_serve_stops_at_exit(self):
+        requests = [
+            {'jsonrpc': '2.0', 'id': 1, 'method': 'shutdown'},
+            {'jsonrpc': '2.0', 'method': 'exit'},
+            {'jsonrpc': '2.0', 'id': 2, 'method': 'initialize'},
+        ]
+        stdout = io.StringIO()
+        serve(self.server, io.StringIO('\n'.join(json.dumps(r) for r in requests) + '\n\n'), stdout)
+        self.assertEqual([json.loads(line) for line in stdout.getvalue().splitlines()],
+                         [{'jsonrpc': '2.0', 'id': 1, 'result': None}])
+
+    def test_refresh_picks_up_edits(self):
+        self.assertEqual(self.result('refresh'), {'changed': 0, 'removed': 0})
+        touch(self.src / "button.rs", "\n#[derive(Live, LiveHook, Widget)]\n"
+              "pub struct IconButton { #[deref] button: Button, #[live] icon: String }\n")
+        self.assertEqual(self.result('refresh'), {'changed': 1, 'removed': 0})
+        self.assertEqual(self.result('hover', name='IconButton')['properties'], ["flow", "icon", "show_bg", "text"])
+        self.assertEqual(self.result('definition', name='flow', widget='IconButton')['struct'], "View")
+        (self.src / "view.rs").unlink()
+        self.assertEqual(self.result('refresh'), {'changed': 0, 'removed': 1})
+        self.assertIsNone(self.result('definition', name='flow', widget='Button'))
+
+if __name__ == "__main__":
+    unittest.main()
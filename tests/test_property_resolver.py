@@ -0,0 +1,107 @@
+"""
+Tests for PropertyResolver in scripts/makepad_index.py: effective property
+sets through #[deref], #[walk] and #[layout] fields, and broken cycles.
+
+Run from the repository root with `python -m unittest discover tests` (or
+pytest).
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from makepad_index import PropertyResolver, Widget, WidgetBase, WidgetProperty, parse_file  # noqa: E402
+
+def widget(name: str, properties: list, bases: tuple = ()) -> Widget:
+    return Widget(name=name, file=f"{name.lower()}.rs",
+                  properties=[WidgetProperty(prop, "f64") for prop in properties],
+                  bases=[WidgetBase(kind, field, ty) for kind, field, ty in bases])
+
+def effective(resolver: PropertyResolver, name: str) -> dict:
+    return {r.property.name: (r.origin, r.via) for r in resolver.resolve(name)}
+
+TYPES = {w.name: w for w in [
+    widget("Walk", ["width", "height", "margin"]),
+    widget("Layout", ["padding", "spacing", "flow"]),
+    widget("View", ["show_bg", "width"], [("walk", "walk", "Walk"), ("layout", "layout", "Layout")]),
+    widget("Button", ["text", "padding"], [("deref", "view", "View")]),
+    widget("IconButton", ["icon"], [("deref", "button", "crate::button::Button"), ("walk", "walk", "Walk")]),
+]}
+
+class InheritanceTest(unittest.TestCase):
+    def test_deref_walk_and_layout(self):
+        props = effective(PropertyResolver(TYPES), "Button")
+        self.assertEqual(props["text"], ("Button", ()))
+        self.assertEqual(props["show_bg"], ("View", ("view",)))
+        self.assertEqual(props["height"], ("Walk", ("view", "walk")))
+        self.assertEqual(props["spacing"], ("Layout", ("view", "layout")))
+        self.assertEqual(sorted(props), ["flow", "height", "margin", "padding", "show_bg", "spacing", "text", "width"])
+
+    def test_own_properties_come_first_and_shadow_bases(self):
+        resolver = PropertyResolver(TYPES)
+        names = [r.property.name for r in resolver.resolve("Button")]
+        self.assertEqual(names[:2], ["text", "padding"])
+        # Button declares padding itself; View declares width over Walk's
+        self.assertEqual(effective(resolver, "Button")["padding"], ("Button", ()))
+        self.assertEqual(effective(resolver, "View")["width"], ("View", ()))
+
+    def test_earlier_base_wins(self):
+        # IconButton reaches Walk through button.view.walk before its own walk field
+        props = effective(PropertyResolver(TYPES), "IconButton")
+        self.assertEqual(props["height"], ("Walk", ("button", "view", "walk")))
+        self.assertEqual(props["text"], ("Button", ("button",)))
+
+    def test_bases_are_resolved_once(self):
+        resolver = PropertyResolver(TYPES)
+        view = resolver.resolve("View")
+        resolver.resolve("Button")
+        resolver.resolve("IconButton")
+        self.assertIs(resolver.resolve("View"), view)
+        self.assertEqual(sorted(resolver.resolved), ["Button", "IconButton", "Layout", "View", "Walk"])
+
+    def test_unindexed_base(self):
+        types = dict(TYPES, Custom=widget("Custom", ["value"], [("deref", "inner", "Missing")]))
+        resolver = PropertyResolver(types)
+        self.assertEqual(effective(resolver, "Custom"), {"value": ("Custom", ())})
+        self.assertEqual(resolver.unresolved, {"Missing"})
+        self.assertEqual(resolver.resolve("Nowhere"), [])
+
+class CycleTest(unittest.TestCase):
+    def test_cycle_is_broken_and_recorded(self):
+        types = {
+            "A": widget("A", ["a"], [("deref", "b", "B")]),
+            "B": widget("B", ["b"], [("deref", "c", "C")]),
+            "C": widget("C", ["c"], [("deref", "a", "A")]),
+        }
+        resolver = PropertyResolver(types)
+        self.assertEqual(effective(resolver, "A"), {"a": ("A", ()), "b": ("B", ("b",)), "c": ("C", ("b", "c"))})
+        self.assertEqual(resolver.cycles, [("A", "B", "C", "A")])
+        # B and C were memoized while A was still open, without A's properties
+        self.assertEqual(sorted(effective(resolver, "C")), ["c"])
+
+    def test_self_reference(self):
+        resolver = PropertyResolver({"Node": widget("Node", ["value"], [("deref", "next", "Node")])})
+        self.assertEqual(effective(resolver, "Node"), {"value": ("Node", ())})
+        self.assertEqual(resolver.cycles, [("Node", "Node")])
+
+class ParsedSourceTest(unittest.TestCase):
+    def test_resolves_parsed_structs(self):
+        source = """
+#[derive(Live, LiveHook)]
+pub struct Walk { #[live] width: Size, #[live] height: Size }
+
+#[derive(Live, LiveHook, Widget)]
+pub struct View { #[walk] walk: Walk, #[live] show_bg: bool }
+
+#[derive(Live, LiveHook, Widget)]
+pub struct Label { #[deref] view: View, #[live] text: String, #[rust] cache: usize }
+"""
+        structs, _ = parse_file(source, "lib.rs")
+        props = effective(PropertyResolver({s.name: s for s in structs}), "Label")
+        self.assertEqual(props, {"text": ("Label", ()), "show_bg": ("View", ("view",)),
+                                 "width": ("Walk", ("view", "walk")), "height": ("Walk", ("view", "walk"))})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for the hand-written lexer in scripts/rust_lexer.py: literals and
+comments that hide braces or items, and lifetimes that look like chars.
+
+Run from the repository root with `python -m unittest discover tests` (or
+pytest).
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from rust_lexer import COMMENT, LIFETIME, LITERAL, lex_file, tokenize  # noqa: E402
+
+SOURCE = r'''use makepad_widgets::*;
+
+const FAKE: &str = r#"pub struct Fake { x: u32 } "quoted" }"#;
+/* outer /* pub struct Nested { y: u32 } */ still a comment { */
+
+/// Holds a borrowed name.
+#[derive(Live, Widget)]
+pub struct Holder<'a> {
+    /// The name
+    #[live] name: &'a str,
+    #[live('{')] brace: char,
+    #[rust] quote: Quote<'static>,
+}
+
+fn closer() -> char { '}' }
+
+#[derive(Live, LiveHook)]
+pub enum Mode {
+    #[pick] Plain,
+    /* } */
+    Sized(u8),
+}
+'''
+
+def kinds(text: str) -> list:
+    return [(kind, value) for kind, value, _, _ in tokenize(text)]
+
+class LiteralTest(unittest.TestCase):
+    def test_raw_string_hides_items_and_braces(self):
+        lexed = lex_file(SOURCE)
+        self.assertEqual([s.name for s in lexed.structs], ["Holder"])
+        self.assertEqual([e.name for e in lexed.enums], ["Mode"])
+
+    def test_raw_string_ends_at_matching_hashes(self):
+        self.assertEqual(kinds('r##"a "# b"## x'), [(LITERAL, ''), ("ident", "x")])
+        self.assertEqual(kinds('br"{"}'), [(LITERAL, ''), ("punct", "}")])
+
+    def test_unterminated_raw_string_runs_to_the_end(self):
+        self.assertEqual(lex_file('r#"pub struct A { }\n').structs, [])
+
+    def test_nested_block_comments(self):
+        self.assertEqual(kinds("/* a /* b */ pub struct X {} */ y"), [(COMMENT, ''), ("ident", "y")])
+        lexed = lex_file("/* /* */ pub struct Hidden { a: u8 } */\npub struct Shown { b: u8 }\n")
+        self.assertEqual([s.name for s in lexed.structs], ["Shown"])
+
+    def test_comment_inside_enum_body(self):
+        mode = lex_file(SOURCE).enums[0]
+        self.assertEqual([(v.name, v.attrs) for v in mode.variants], [("Plain", ["pick"]), ("Sized", [])])
+
+class LifetimeTest(unittest.TestCase):
+    def test_lifetimes_and_char_literals(self):
+        self.assertEqual(kinds(r"'a' 'b 'static '\n' b'x' '}'"),
+                         [(LITERAL, ''), (LIFETIME, "'b"), (LIFETIME, "'static"),
+                          (LITERAL, ''), (LITERAL, ''), (LITERAL, '')])
+
+    def test_fields_keep_lifetimes_and_char_attrs(self):
+        holder = lex_file(SOURCE).structs[0]
+        self.assertEqual([(f.name, f.ty, f.attrs) for f in holder.fields],
+                         [("name", "&'a str", ["live"]),
+                          ("brace", "char", ["live('{')"]),
+                          ("quote", "Quote<'static>", ["rust"])])
+        self.assertEqual(holder.fields[0].docs, ["The name"])
+        self.assertEqual(holder.derives, ["Live", "Widget"])
+        self.assertEqual([text for _, text in holder.docs], [" Holds a borrowed name."])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Tests for scripts/symbol_store.py: an incrementally updated store must hold
+the same rows as one written from scratch, and open_store() must never
+modify a database it did not create.
+
+Run from the repository root with `python -m unittest discover tests` (or
+pytest).
+"""
+
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from benchmark import generate_corpus  # noqa: E402
+from makepad_index import build_index, refresh_index  # noqa: E402
+from symbol_store import (STORE_VERSION, fields_of_type, open_store, search_docs, widgets_with,  # noqa: E402
+                          write_version)
+from workspace_index import touch  # noqa: E402
+
+CRATES = ["widgets", "draw"]
+
+# Every row of a version, without the ids assigned on insert
+CONTENT_QUERIES = [
+    "SELECT path, crate, size, mtime_ns FROM files WHERE version_id = ?",
+    "SELECT kind, name, parent, path, line, column FROM locations WHERE version_id = ?",
+    "SELECT fl.name, fl.kind, fl.type, fl.base_type, fl.default_value, fl.doc FROM fields fl "
+    "JOIN structs s ON s.id = fl.struct_id JOIN files f ON f.id = s.file_id WHERE f.version_id = ?",
+    "SELECT w.name, s.name, f.path, s.line, w.digest FROM widgets w JOIN structs s ON s.id = w.struct_id "
+    "JOIN files f ON f.id = s.file_id WHERE w.version_id = ?",
+    "SELECT widget, name, type, origin, via FROM widget_properties WHERE version_id = ?",
+    "SELECT d.name, d.doc, d.kind, f.path, d.line FROM docs d JOIN files f ON f.id = d.file_id WHERE d.version_id = ?",
+]
+
+EDITED_WIDGET = """
+/// Added in an edit
+#[derive(Live, LiveHook, Widget)]
+pub struct EditedPanel { #[deref] view: View, #[live] edited_margin: Margin }
+"""
+
+def content(conn: sqlite3.Connection, version: str) -> list:
+    (version_id,) = conn.execute("SELECT id FROM versions WHERE name = ?", (version,)).fetchone()
+    return [sorted(conn.execute(query, (version_id,)), key=repr) for query in CONTENT_QUERIES]
+
+class IncrementalStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.work = Path(tempfile.mkdtemp(prefix="makepad-store-test-"))
+        self.root = self.work / "v1"
+        generate_corpus(self.root, 10, 3, 5, 2, 2, False, seed=2)
+        self.index = build_index(root=self.root, crates=CRATES, io_workers=0)
+        self.conn = open_store(self.work / "symbols.sqlite")
+        write_version(self.conn, "1.0.0", self.index)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def fresh_content(self) -> list:
+        fresh = open_store(self.work / "fresh.sqlite")
+        write_version(fresh, "1.0.0", self.index)
+        try:
+            return content(fresh, "1.0.0")
+        finally:
+            fresh.close()
+
+    def test_unchanged_version_writes_nothing(self):
+        before = content(self.conn, "1.0.0")
+        update = write_version(self.conn, "1.0.0", self.index)
+        self.assertEqual((update['written'], update['removed']), (0, 0))
+        self.assertEqual(content(self.conn, "1.0.0"), before)
+
+    def test_update_matches_fresh_build(self):
+        paths = sorted(f.path for f in self.index.files if "/widgets/" in f.path)
+        touch(Path(paths[0]), EDITED_WIDGET)
+        touch(Path(paths[1]), "\n// only a comment\n")
+        Path(paths[2]).unlink()
+        (Path(paths[3]).parent / "added.rs").write_text(EDITED_WIDGET.replace("EditedPanel", "AddedPanel"))
+        refresh_index(self.index)
+
+        update = write_version(self.conn, "1.0.0", self.index)
+        self.assertEqual((update['written'], update['removed']), (3, 1))
+        self.assertEqual(content(self.conn, "1.0.0"), self.fresh_content())
+        self.assertIn(("1.0.0", "EditedPanel", "Margin", "EditedPanel", ""),
+                      widgets_with(self.conn, "edited_margin"))
+
+    def test_inherited_sets_follow_base_edits(self):
+        # Only turtle.rs is rewritten, but every widget with a #[walk] field inherits the new property
+        walk = next(f.path for f in self.index.files for s in f.structs if s.name == "Walk")
+        touch(Path(walk), "\n#[derive(Live, LiveHook)]\npub struct Walk { #[live] late_prop: f64 }\n")
+        refresh_index(self.index)
+        self.assertEqual(write_version(self.conn, "1.0.0", self.index)['written'], 1)
+        self.assertEqual(content(self.conn, "1.0.0"), self.fresh_content())
+        inherited = widgets_with(self.conn, "late_prop")
+        self.assertGreater(len(inherited), 1)
+        self.assertTrue(all(row[3] == "Walk" and row[4] for row in inherited))
+
+    def test_versions_are_independent(self):
+        before = content(self.conn, "1.0.0")
+        other = self.work / "v2"
+        generate_corpus(other, 6, 2, 4, 1, 1, False, seed=5)
+        write_version(self.conn, "2.0.0", build_index(root=other, crates=CRATES, io_workers=0))
+        self.assertEqual(content(self.conn, "1.0.0"), before)
+        self.assertEqual({row[0] for row in fields_of_type(self.conn, "DrawColor")}, {"1.0.0", "2.0.0"})
+        self.assertTrue(all(row[0] == "2.0.0" for row in search_docs(self.conn, "documentation", "2.0.0")))
+
+class OpenStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.work = Path(tempfile.mkdtemp(prefix="makepad-store-test-"))
+        self.path = self.work / "symbols.sqlite"
+
+    def tearDown(self):
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def test_foreign_database_is_left_alone(self):
+        foreign = sqlite3.connect(self.path)
+        foreign.execute("CREATE TABLE notes (body TEXT)")
+        foreign.execute("INSERT INTO notes VALUES ('keep me')")
+        foreign.commit()
+        foreign.close()
+        with self.assertRaises(ValueError):
+            open_store(self.path)
+        with self.assertRaises(ValueError):
+            open_store(self.path, readonly=True)
+        check = sqlite3.connect(self.path)
+        self.assertEqual(check.execute("SELECT body FROM notes").fetchall(), [("keep me",)])
+        check.close()
+
+    def test_old_version_is_recreated(self):
+        conn = open_store(self.path)
+        conn.execute("INSERT INTO versions (name, root, fingerprint) VALUES ('old', '/', '')")
+        conn.execute(f"PRAGMA user_version = {STORE_VERSION + 1}")
+        conn.commit()
+        conn.close()
+        with self.assertRaises(ValueError):
+            open_store(self.path, readonly=True)
+        conn = open_store(self.path)
+        self.assertEqual(conn.execute("SELECT count(*) FROM versions").fetchone()[0], 0)
+        conn.close()
+
+    def test_readonly_queries(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            open_store(self.path, readonly=True)
+        open_store(self.path).close()
+        conn = open_store(self.path, readonly=True)
+        self.assertEqual(widgets_with(conn, "anything"), [])
+        with self.assertRaises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO versions (name, root, fingerprint) VALUES ('x', '/', '')")
+        conn.close()
+
+if __name__ == "__main__":
+    unittest.main()
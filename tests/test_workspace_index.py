@@ -0,0 +1,154 @@
+"""
+Tests for scripts/workspace_index.py and the live_design! scan shared with
+scripts/index_server.py.
+
+Run from the repository root with `python -m unittest discover tests` (or
+pytest).
+"""
+
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from index_server import Document  # noqa: E402
+from workspace_index import (WorkspaceCache, WorkspaceIndex, build_workspace_output,  # noqa: E402
+                             extract_components, generate_workspace, touch)
+
+# A block written by the "Live Design Block" snippet in snippets/makepad.json
+SNIPPET_BLOCK = """use makepad_widgets::*;
+
+live_design!(
+    use link::widgets::*;
+    use link::theme::*;
+
+    pub MyCard = {{MyCard}} {
+        width: Fill
+        size: vec2(100, 50)
+        title = <Label> { text: "Card" }
+    }
+
+    MyHeader = <View> { padding: 10 }
+);
+
+#[derive(Live, LiveHook, Widget)]
+pub struct MyCard {
+    #[deref] view: View,
+    #[live] title_text: String,
+}
+
+fn layout() -> (f64, f64) { (1.0, 2.0) }
+"""
+
+def components_of(text: str) -> dict:
+    return {c.name: c for c in extract_components(text)}
+
+class LiveDesignDelimiterTest(unittest.TestCase):
+    def test_paren_block_components(self):
+        components = components_of(SNIPPET_BLOCK)
+        self.assertEqual(sorted(components), ["MyCard", "MyHeader"])
+        card = components["MyCard"]
+        self.assertTrue(card.backed and card.is_pub)
+        self.assertEqual(card.properties, ["width", "size"])
+        self.assertEqual(card.children, [["title", "Label"]])
+        self.assertEqual(components["MyHeader"].base, "View")
+        self.assertEqual(components["MyHeader"].properties, ["padding"])
+
+    def test_every_delimiter_finds_the_same_components(self):
+        braces = SNIPPET_BLOCK.replace("live_design!(", "live_design!{").replace("\n);\n", "\n}\n")
+        brackets = SNIPPET_BLOCK.replace("live_design!(", "live_design![").replace("\n);\n", "\n];\n")
+        expected = extract_components(braces)
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(extract_components(SNIPPET_BLOCK), expected)
+        self.assertEqual(extract_components(brackets), expected)
+
+    def test_macro_ends_at_its_closing_delimiter(self):
+        # Parens and braces after the macro must not be read as components
+        text = SNIPPET_BLOCK + "\nfn later() { let x = Other = <View> { }; }\n"
+        self.assertEqual(sorted(components_of(text)), ["MyCard", "MyHeader"])
+
+    def test_document_context_in_paren_block(self):
+        document = Document(SNIPPET_BLOCK)
+        inside = document.context(SNIPPET_BLOCK.index("padding"))
+        self.assertTrue(inside["live_design"])
+        self.assertEqual(inside["widget"], "View")
+        self.assertEqual(inside["name"], "MyHeader")
+        nested = document.context(SNIPPET_BLOCK.index('text: "Card"'))
+        self.assertEqual(nested["widgets"], ["MyCard", "Label"])
+        top = document.context(SNIPPET_BLOCK.index("use link::theme"))
+        self.assertTrue(top["live_design"])
+        self.assertEqual(top["widgets"], [])
+        self.assertFalse(document.context(SNIPPET_BLOCK.index("fn layout"))["live_design"])
+
+class IncrementalIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="makepad-workspace-test-"))
+        generate_workspace(self.root, 120, seed=1)
+        self.caches = []
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        for cache in self.caches:
+            cache.path.unlink(missing_ok=True)
+
+    def rebuilt(self) -> dict:
+        index = WorkspaceIndex(self.root)
+        index.refresh()
+        return build_workspace_output(index)
+
+    def test_update_matches_rebuild(self):
+        index = WorkspaceIndex(self.root)
+        index.refresh()
+        paths = sorted(index.files)
+
+        touch(Path(paths[3]), "live_design! { pub Added3 = <Button> { text: \"new\" } }\n")
+        self.assertTrue(index.update(paths[3]))
+        self.assertFalse(index.update(paths[3]))
+
+        added = Path(paths[0]).parent / "snippet_block.rs"
+        added.write_text(SNIPPET_BLOCK)
+        self.assertTrue(index.update(added))
+
+        Path(paths[7]).unlink()
+        self.assertTrue(index.update(paths[7]))
+
+        self.assertIn("Added3", index.components)
+        self.assertIn("MyCard", index.components)
+        self.assertEqual(index.components["MyCard"][0].path, str(added))
+        self.assertEqual(build_workspace_output(index), self.rebuilt())
+
+    def test_refresh_reparses_only_changed_files(self):
+        index = WorkspaceIndex(self.root)
+        index.refresh()
+        parsed = index.parsed
+        self.assertEqual(index.refresh(), ([], []))
+
+        paths = sorted(index.files)
+        touch(Path(paths[10]), "// edited\n")
+        touch(Path(paths[20]), "// edited\n")
+        Path(paths[30]).unlink()
+        changed, removed = index.refresh()
+        self.assertEqual(sorted(changed), [paths[10], paths[20]])
+        self.assertEqual(removed, [paths[30]])
+        self.assertEqual(index.parsed, parsed + 2)
+        self.assertEqual(build_workspace_output(index), self.rebuilt())
+
+    def test_warm_cache_matches_rebuild(self):
+        cache = WorkspaceCache(self.root, rebuild=True)
+        self.caches.append(cache)
+        cold = WorkspaceIndex(self.root, cache)
+        cold.refresh()
+        cache.save()
+
+        paths = sorted(cold.files)
+        touch(Path(paths[5]), "// edited\n")
+        warm = WorkspaceIndex(self.root, WorkspaceCache(self.root))
+        warm.refresh()
+        self.assertEqual(warm.parsed, 1)
+        self.assertEqual(build_workspace_output(warm), self.rebuilt())
+
+if __name__ == "__main__":
+    unittest.main()